@@ -109,6 +109,7 @@ tests_require = [
     "pytest-cov==4.1.0",
     "pytest-django==4.7.0",
     "freezegun==1.4.0",
+    "moto[s3]==5.2.4",
 ]
 # Combine all dependencies into a single list for install_requires
 install_requires = (
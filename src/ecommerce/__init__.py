@@ -105,7 +105,7 @@ OSCAR_APPS = [
 SHARED_APPS = [
     "django_tenants",
     "django_celery_beat",
-    "ecommerce.core.tenants",
+    "ecommerce.core.tenants.apps.TenantConfig",
     "ecommerce.apps.users.apps.UserConfig",
     # "django.contrib.admin",
     "django.contrib.contenttypes",
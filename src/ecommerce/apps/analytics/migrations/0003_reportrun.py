@@ -0,0 +1,37 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(max_length=128, verbose_name='Report type')),
+                ('date_from', models.DateField(blank=True, null=True, verbose_name='Date from')),
+                ('date_to', models.DateField(blank=True, null=True, verbose_name='Date to')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Running', 'Running'), ('Complete', 'Complete'), ('Failed', 'Failed')], default='Pending', max_length=32, verbose_name='Status')),
+                ('done', models.PositiveIntegerField(default=0, verbose_name='Done')),
+                ('total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total')),
+                ('file', models.CharField(blank=True, max_length=255, verbose_name='File')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('date_created', models.DateTimeField(auto_now_add=True, verbose_name='Date created')),
+                ('date_updated', models.DateTimeField(auto_now=True, verbose_name='Date updated')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Report run',
+                'verbose_name_plural': 'Report runs',
+                'ordering': ['-date_created'],
+                'indexes': [models.Index(fields=['report_type', 'date_from', 'date_to', 'date_created'], name='analytics_reportrun_lookup')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+import uuid
+
+from django.db import migrations, models
+
+
+def set_uuids(apps, schema_editor):
+    ReportRun = apps.get_model("analytics", "ReportRun")
+    for run in ReportRun.objects.filter(uuid=None).only("pk"):
+        ReportRun.objects.filter(pk=run.pk).update(uuid=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_reportrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportrun',
+            name='uuid',
+            field=models.UUIDField(editable=False, null=True, verbose_name='UUID'),
+        ),
+        migrations.RunPython(set_uuids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='reportrun',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='UUID'),
+        ),
+    ]
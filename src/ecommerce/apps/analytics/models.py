@@ -1,3 +1,4 @@
+import uuid
 from decimal import Decimal
 
 from django.db import models
@@ -69,3 +70,57 @@ class UserSearch(AbstractUserSearch):
     )
     query = models.CharField(_("Search term"), max_length=255, db_index=True)
     date_created = models.DateTimeField(_("Date Created"), auto_now_add=True)
+
+
+class ReportRun(models.Model):
+    """
+    A dashboard report generated in the background and written to the
+    storage of the tenant, see ``ecommerce.apps.dashboard.reports.runs``.
+    """
+
+    # Identifies the run in URLs, where the sequential primary key would let
+    # anyone enumerate the reports of others
+    uuid = models.UUIDField(_("UUID"), default=uuid.uuid4, unique=True, editable=False)
+    report_type = models.CharField(_("Report type"), max_length=128)
+    date_from = models.DateField(_("Date from"), null=True, blank=True)
+    date_to = models.DateField(_("Date to"), null=True, blank=True)
+    user = models.ForeignKey(
+        AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        verbose_name=_("User"),
+    )
+
+    PENDING, RUNNING, COMPLETE, FAILED = "Pending", "Running", "Complete", "Failed"
+    STATUS_CHOICES = (
+        (PENDING, _(PENDING)),
+        (RUNNING, _(RUNNING)),
+        (COMPLETE, _(COMPLETE)),
+        (FAILED, _(FAILED)),
+    )
+    status = models.CharField(
+        _("Status"), max_length=32, default=PENDING, choices=STATUS_CHOICES
+    )
+    # Rows written so far, out of total
+    done = models.PositiveIntegerField(_("Done"), default=0)
+    total = models.PositiveIntegerField(_("Total"), null=True, blank=True)
+    file = models.CharField(_("File"), max_length=255, blank=True)
+    error = models.TextField(_("Error"), blank=True)
+    date_created = models.DateTimeField(_("Date created"), auto_now_add=True)
+    date_updated = models.DateTimeField(_("Date updated"), auto_now=True)
+
+    class Meta:
+        ordering = ["-date_created"]
+        indexes = [
+            models.Index(
+                fields=["report_type", "date_from", "date_to", "date_created"],
+                name="analytics_reportrun_lookup",
+            )
+        ]
+        verbose_name = _("Report run")
+        verbose_name_plural = _("Report runs")
+
+    def __str__(self):
+        return f"{self.report_type}: {self.date_from} - {self.date_to} ({self.status})"
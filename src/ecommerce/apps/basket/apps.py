@@ -13,6 +13,8 @@ class BasketConfig(OscarConfig):
     namespace = "basket"
 
     def ready(self):
+        from ecommerce.apps.basket import receivers  # noqa
+
         BASKET_VIEWS = "basket.views"
         APP_PATH = "ecommerce.apps"
         self.summary_view = get_class(BASKET_VIEWS, "BasketView", APP_PATH)
@@ -1,5 +1,7 @@
+from django.core.exceptions import PermissionDenied
 from django.core.serializers.json import DjangoJSONEncoder
-from django.db import models
+from django.db import models, transaction
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from oscar.apps.basket.abstract_models import (
     AbstractBasket,
@@ -41,9 +43,129 @@ class Basket(AbstractBasket):
     # Only if a basket is in one of these statuses can it be edited
     editable_statuses = (OPEN, SAVED)
 
+    # Upsell messages of the partially satisfied offers, recorded by the offer
+    # applicator for the requests that ask for them. None otherwise.
+    upsell_messages = None
+
     class Meta(AbstractBasket.Meta):
         ordering = ["-id"]
 
+    def reset_offer_applications(self):
+        super().reset_offer_applications()
+        self.upsell_messages = None
+
+    def merge(self, basket, add_quantities=True):
+        """
+        Merges another basket with this one.
+
+        :basket: The basket to merge into this one.
+        :add_quantities: Whether to add line quantities when they are merged.
+        """
+        self.merge_many([basket], add_quantities)
+
+    merge.alters_data = True
+
+    def merge_many(self, baskets, add_quantities=True):
+        """
+        Merge several baskets into this one in a single transaction.
+
+        Lines are moved across, or combined with the line that has the same
+        ``line_reference``, with a fixed number of bulk queries instead of
+        saving every line. The baskets are processed in the given order.
+        """
+        baskets = [basket for basket in baskets if basket.pk != self.pk]
+        if not baskets:
+            return
+        if not self.can_be_edited:
+            raise PermissionDenied(
+                _("You cannot modify a %s basket") % (self.status.lower(),)
+            )
+
+        Line = self.lines.model
+        basket_ids = [basket.pk for basket in baskets]
+        position = {basket_id: index for index, basket_id in enumerate(basket_ids)}
+        merged_at = now()
+
+        with transaction.atomic():
+            if self.pk is None:
+                self.save()
+
+            # line_reference -> [pk, quantity] of the line that is kept
+            kept = {
+                reference: [pk, quantity]
+                for pk, reference, quantity in self.lines.values_list(
+                    "pk", "line_reference", "quantity"
+                )
+            }
+            moved, changed, deleted = [], set(), []
+            incoming = sorted(
+                Line.objects.filter(basket_id__in=basket_ids).values_list(
+                    "basket_id", "pk", "line_reference", "quantity"
+                ),
+                key=lambda line: (position[line[0]], line[1]),
+            )
+            for __, pk, reference, quantity in incoming:
+                if reference not in kept:
+                    kept[reference] = [pk, quantity]
+                    moved.append(pk)
+                    continue
+                existing = kept[reference]
+                if add_quantities:
+                    existing[1] += quantity
+                else:
+                    existing[1] = max(existing[1], quantity)
+                changed.add(existing[0])
+                deleted.append(pk)
+
+            if moved:
+                Line.objects.filter(pk__in=moved).update(
+                    basket=self, date_updated=merged_at
+                )
+            if changed:
+                Line.objects.bulk_update(
+                    [
+                        Line(pk=pk, quantity=quantity, date_updated=merged_at)
+                        for pk, quantity in kept.values()
+                        if pk in changed
+                    ],
+                    ["quantity", "date_updated"],
+                )
+            if deleted:
+                Line.objects.filter(pk__in=deleted).delete()
+
+            Basket.objects.filter(pk__in=basket_ids).update(
+                status=self.MERGED, date_merged=merged_at
+            )
+            self.merge_vouchers(basket_ids)
+
+        for basket in baskets:
+            basket.status = self.MERGED
+            basket.date_merged = merged_at
+            basket._lines = None
+        self._lines = None
+
+    merge_many.alters_data = True
+
+    def merge_vouchers(self, basket_ids):
+        """
+        Move the vouchers of the given baskets to this basket.
+        """
+        Through = self.vouchers.through
+        incoming = Through.objects.filter(basket_id__in=basket_ids)
+        voucher_ids = set(incoming.values_list("voucher_id", flat=True))
+        if not voucher_ids:
+            return
+        voucher_ids.difference_update(self.vouchers.values_list("pk", flat=True))
+        incoming.delete()
+        Through.objects.bulk_create(
+            [
+                Through(basket_id=self.pk, voucher_id=voucher_id)
+                for voucher_id in sorted(voucher_ids)
+            ]
+        )
+
+    merge_vouchers.alters_data = True
+
 
 class Line(AbstractLine):
     basket = models.ForeignKey(
@@ -0,0 +1,32 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.apps.basket.snapshot import basket_snapshots
+
+ConditionalOffer = get_model("offer", "ConditionalOffer")
+Condition = get_model("offer", "Condition")
+Benefit = get_model("offer", "Benefit")
+Range = get_model("offer", "Range")
+RangeProduct = get_model("offer", "RangeProduct")
+Voucher = get_model("voucher", "Voucher")
+
+# Models that decide which offers apply to a basket, and how
+OFFER_MODELS = (ConditionalOffer, Condition, Benefit, Range, RangeProduct, Voucher)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_basket_snapshots(sender, **kwargs):
+    # Conditions and benefits are often saved through proxy models, which
+    # are sent as the sender, so compare the concrete models.
+    if sender._meta.concrete_model in OFFER_MODELS:
+        basket_snapshots.invalidate_offers()
+
+
+@receiver(m2m_changed)
+def invalidate_basket_snapshots_on_m2m_change(instance, model, action, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, OFFER_MODELS) or issubclass(model, OFFER_MODELS):
+        basket_snapshots.invalidate_offers()
@@ -0,0 +1,291 @@
+"""
+Versioned snapshots of the offers applied to a basket.
+
+Applying offers runs the condition and benefit of every active offer against
+the basket, which is by far the most expensive part of loading
+``request.basket``. Most requests (e.g. pages that only render the
+mini-basket) see a basket that hasn't changed since the previous request, so
+the result of the last application is stored in the cache together with a
+version of everything it depends on:
+
+* the lines (quantity, stockrecord, prices and modification dates),
+* the vouchers of the basket and whether they are active,
+* the user the offers were applied for and the active language (the
+  descriptions of the applications are translated),
+* the offers themselves. Saving or deleting an offer, condition, benefit,
+  range or voucher invalidates every snapshot of the tenant (see
+  ``receivers.py``), and so does the next start or end of an offer.
+
+If the version still matches, the discounts are copied onto the lines and the
+offers aren't evaluated at all. So are the upsell messages recorded with the
+application, for the requests that ask for them (see
+``records_upsell_messages``): a snapshot taken without them isn't used for
+such a request, which applies the offers again and records them.
+
+The snapshots live in ``BASKET_SNAPSHOT_CACHE``, which has to be shared by all
+servers so that invalidating the offers reaches every one of them. They only
+hold offer ids and amounts: the offers are loaded again when a snapshot is
+restored, so that their counters are never older than the request. Checkout
+and placing an order don't trust a snapshot and apply the offers again (see
+``refresh``).
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Min, Q
+from django.utils import timezone, translation
+from oscar.apps.offer import results
+from oscar.core.loading import get_model
+
+DEFAULT_TIMEOUT = 300
+
+
+def records_upsell_messages(request):
+    """
+    Return whether applying offers for ``request`` records the upsell
+    messages of the basket, which the pages showing them ask for by setting
+    ``request.record_upsell_messages``.
+    """
+    return getattr(request, "record_upsell_messages", False)
+
+
+class BasketSnapshotCache:
+    def __init__(self, timeout=None):
+        self._timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, "BASKET_SNAPSHOT_TIMEOUT", DEFAULT_TIMEOUT)
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "BASKET_SNAPSHOT_CACHE", "default")]
+
+    def make_key(self, *parts):
+        # Include the schema so tenants never share snapshots, whatever the
+        # key function of the cache is.
+        return ":".join(["basket_snapshot", connection.schema_name, *map(str, parts)])
+
+    def apply(self, basket, user, request, applicator):
+        """
+        Apply the offers to ``basket`` with ``applicator``, or restore the
+        discounts of the previous application if nothing changed since.
+
+        Returns ``True`` if the discounts came from the cache.
+        """
+        if self.timeout <= 0:
+            applicator.apply(basket, user, request)
+            return False
+
+        key = self.make_key(basket.pk, getattr(user, "pk", None))
+        version = self.get_version(basket, user)
+        entry = self.cache.get(key)
+        if (
+            entry is not None
+            and entry[0] == version
+            and self.restore(
+                basket, entry[1], upsell_messages=records_upsell_messages(request)
+            )
+        ):
+            self.hits += 1
+            basket.offers_from_snapshot = True
+            return True
+
+        self.misses += 1
+        applicator.apply(basket, user, request)
+        basket.offers_from_snapshot = False
+        self.cache.set(key, (version, self.take_snapshot(basket)), self.timeout)
+        return False
+
+    def refresh(self, basket, user, request, applicator):
+        """
+        Apply the offers to ``basket`` again if its discounts were restored
+        from a snapshot, for the steps that must not rely on one.
+        """
+        if not getattr(basket, "offers_from_snapshot", False):
+            return
+        basket.reset_offer_applications()
+        applicator.apply(basket, user, request)
+        basket.offers_from_snapshot = False
+
+    def get_version(self, basket, user):
+        now = timezone.now()
+        lines = [
+            (
+                line.pk,
+                line.quantity,
+                line.stockrecord_id,
+                line.price_excl_tax,
+                line.price_incl_tax,
+                line.date_updated,
+                line.stockrecord.date_updated,
+            )
+            for line in basket.all_lines()
+        ]
+        vouchers = sorted(
+            (voucher.pk, voucher.is_active(now)) for voucher in basket.vouchers.all()
+        )
+        data = repr(
+            (
+                self.get_offers_version(),
+                getattr(user, "pk", None),
+                # Descriptions of the applications are translated
+                translation.get_language(),
+                lines,
+                vouchers,
+            )
+        )
+        return hashlib.md5(data.encode(), usedforsecurity=False).hexdigest()
+
+    def get_offers_version(self):
+        """
+        Return a token that changes whenever the set of active offers may
+        have changed.
+        """
+        key = self.make_key("offers")
+        version = self.cache.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            self.cache.add(key, version, self.get_offers_version_timeout())
+            # Another process may have been faster
+            version = self.cache.get(key) or version
+        return version
+
+    def get_offers_version_timeout(self):
+        """
+        Keep the offers version until the next offer starts or ends.
+        """
+        ConditionalOffer = get_model("offer", "ConditionalOffer")
+        now = timezone.now()
+        boundaries = ConditionalOffer.objects.filter(
+            status=ConditionalOffer.OPEN
+        ).aggregate(
+            next_start=Min("start_datetime", filter=Q(start_datetime__gt=now)),
+            next_end=Min("end_datetime", filter=Q(end_datetime__gt=now)),
+        )
+        timeout = self.timeout
+        for boundary in boundaries.values():
+            if boundary is not None:
+                timeout = min(timeout, (boundary - now).total_seconds())
+        return max(1, int(timeout))
+
+    def invalidate_offers(self):
+        """
+        Invalidate the snapshots of every basket of the current tenant.
+        """
+        self.cache.delete(self.make_key("offers"))
+
+    def take_snapshot(self, basket):
+        return {
+            "lines": {
+                line.pk: (
+                    line._discount_excl_tax,
+                    line._discount_incl_tax,
+                    line.consumer._affected_quantity,
+                    dict(line.consumer._consumptions),
+                    list(line.consumer._offers),
+                )
+                for line in basket.all_lines()
+            },
+            "offer_applications": [
+                (
+                    offer_id,
+                    application["result"].affects,
+                    application["description"],
+                    application["freq"],
+                    application["discount"],
+                    getattr(application["voucher"], "pk", None),
+                )
+                for (
+                    offer_id,
+                    application,
+                ) in basket.offer_applications.applications.items()
+            ],
+            "upsell_messages": None
+            if basket.upsell_messages is None
+            else [
+                (data["offer"].pk, str(data["message"]))
+                for data in basket.upsell_messages
+            ],
+        }
+
+    def restore(self, basket, snapshot, upsell_messages=False):
+        """
+        Copy the discounts of ``snapshot`` onto ``basket``, and its upsell
+        messages if there are any.
+
+        Returns ``False`` and leaves the basket alone if one of the offers of
+        the snapshot doesn't exist anymore, or if ``upsell_messages`` are
+        asked for and the snapshot has none.
+        """
+        ConditionalOffer = get_model("offer", "ConditionalOffer")
+
+        upsells = snapshot.get("upsell_messages")
+        if upsell_messages and upsells is None:
+            return False
+        offer_ids = {offer_id for offer_id, *__ in snapshot["offer_applications"]}
+        for line_snapshot in snapshot["lines"].values():
+            offer_ids.update(line_snapshot[4])
+        offer_ids.update(offer_id for offer_id, __ in upsells or ())
+        offers = ConditionalOffer.objects.select_related(
+            "condition", "benefit"
+        ).in_bulk(offer_ids)
+        if len(offers) != len(offer_ids):
+            return False
+
+        vouchers = {voucher.pk: voucher for voucher in basket.vouchers.all()}
+        for line in basket.all_lines():
+            (
+                line._discount_excl_tax,
+                line._discount_incl_tax,
+                line.consumer._affected_quantity,
+                consumptions,
+                line_offer_ids,
+            ) = snapshot["lines"][line.pk]
+            line.consumer._consumptions.update(consumptions)
+            line.consumer._offers = {pk: offers[pk] for pk in line_offer_ids}
+
+        applications = basket.offer_applications.applications
+        for (
+            offer_id,
+            affects,
+            description,
+            freq,
+            discount,
+            voucher_id,
+        ) in snapshot["offer_applications"]:
+            offer = offers[offer_id]
+            voucher = vouchers.get(voucher_id)
+            if voucher is not None:
+                offer.set_voucher(voucher)
+            if affects == results.ApplicationResult.SHIPPING:
+                result = results.SHIPPING_DISCOUNT
+            elif affects == results.ApplicationResult.POST_ORDER:
+                result = results.PostOrderAction(description)
+            else:
+                result = results.BasketDiscount(discount)
+            applications[offer_id] = {
+                "offer": offer,
+                "result": result,
+                "name": offer.name,
+                "description": description,
+                "voucher": voucher,
+                "freq": freq,
+                "discount": discount,
+            }
+        if upsells is not None:
+            basket.upsell_messages = [
+                {"message": message, "offer": offers[offer_id]}
+                for offer_id, message in upsells
+            ]
+        return True
+
+
+basket_snapshots = BasketSnapshotCache()
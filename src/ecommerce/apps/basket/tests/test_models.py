@@ -295,6 +295,71 @@ class TestMergingTwoBaskets(TestCase):
         self.assertEqual(Basket.MERGED, self.merge_basket.status)
 
 
+class TestMergingSeveralBaskets(TestCase):
+    def setUp(self):
+        self.products = [factories.create_product(num_in_stock=10) for __ in range(3)]
+        self.main_basket = self.create_basket({0: 2})
+        self.first_basket = self.create_basket({0: 3, 1: 1})
+        self.second_basket = self.create_basket({1: 4, 2: 1})
+
+    def create_basket(self, quantities):
+        basket = Basket()
+        basket.strategy = strategy.Default()
+        for index, quantity in quantities.items():
+            basket.add(self.products[index], quantity=quantity)
+        return basket
+
+    def get_quantities(self):
+        return dict(self.main_basket.lines.values_list("product_id", "quantity"))
+
+    def test_takes_max_quantities(self):
+        self.main_basket.merge_many(
+            [self.first_basket, self.second_basket], add_quantities=False
+        )
+
+        self.assertEqual(
+            self.get_quantities(),
+            {self.products[0].pk: 3, self.products[1].pk: 4, self.products[2].pk: 1},
+        )
+
+    def test_adds_quantities(self):
+        self.main_basket.merge_many([self.first_basket, self.second_basket])
+
+        self.assertEqual(
+            self.get_quantities(),
+            {self.products[0].pk: 5, self.products[1].pk: 5, self.products[2].pk: 1},
+        )
+
+    def test_merged_baskets_are_emptied_and_marked_merged(self):
+        self.main_basket.merge_many([self.first_basket, self.second_basket])
+
+        for basket in (self.first_basket, self.second_basket):
+            self.assertEqual(basket.status, Basket.MERGED)
+            basket.refresh_from_db()
+            self.assertEqual(basket.status, Basket.MERGED)
+            self.assertIsNotNone(basket.date_merged)
+            self.assertEqual(basket.lines.count(), 0)
+
+    def test_uses_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(11):
+            self.main_basket.merge_many([self.first_basket, self.second_basket])
+
+    def test_moves_vouchers_without_duplicates(self):
+        voucher = factories.VoucherFactory()
+        other_voucher = factories.VoucherFactory(name="Other voucher", code="OTHER")
+        self.main_basket.vouchers.add(voucher)
+        self.first_basket.vouchers.add(voucher, other_voucher)
+        self.second_basket.vouchers.add(other_voucher)
+
+        self.main_basket.merge_many([self.first_basket, self.second_basket])
+
+        self.assertEqual(
+            set(self.main_basket.vouchers.all()), {voucher, other_voucher}
+        )
+        self.assertFalse(self.first_basket.vouchers.exists())
+        self.assertFalse(self.second_basket.vouchers.exists())
+
+
 class TestASubmittedBasket(TestCase):
     def setUp(self):
         self.basket = Basket()
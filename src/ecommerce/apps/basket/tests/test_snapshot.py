@@ -0,0 +1,109 @@
+from decimal import Decimal as D
+from unittest import mock
+
+from django.core.cache import cache
+from oscar.apps.offer.applicator import Applicator
+
+from ecommerce.apps.basket.models import Basket
+from ecommerce.apps.basket.snapshot import BasketSnapshotCache
+from ecommerce.apps.offer.models import ConditionalOffer
+from ecommerce.test.factories import create_basket, create_offer
+from ecommerce.test.testcases import TestCase
+
+
+class TestBasketSnapshotCache(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.snapshots = BasketSnapshotCache(timeout=300)
+        self.offer = create_offer()
+        self.basket = create_basket()
+
+    def load_basket(self):
+        basket = Basket.objects.get(pk=self.basket.pk)
+        basket.strategy = self.basket.strategy
+        return basket
+
+    def apply(self, basket):
+        applicator = Applicator()
+        with mock.patch.object(
+            applicator, "apply", wraps=applicator.apply
+        ) as apply:
+            cached = self.snapshots.apply(basket, None, None, applicator)
+        return cached, apply.called
+
+    def test_reuses_discounts_of_unchanged_basket(self):
+        first = self.load_basket()
+        self.assertEqual(self.apply(first), (False, True))
+
+        second = self.load_basket()
+        self.assertEqual(self.apply(second), (True, False))
+        self.assertEqual(second.total_discount, first.total_discount)
+        self.assertGreater(second.total_discount, D("0.00"))
+        self.assertEqual(second.applied_offers(), first.applied_offers())
+        line = second.all_lines()[0]
+        self.assertTrue(line.has_offer_discount(self.offer))
+        self.assertEqual(line.quantity_with_discount, 1)
+
+    def test_restores_current_offers(self):
+        self.apply(self.load_basket())
+        ConditionalOffer.objects.filter(pk=self.offer.pk).update(num_applications=5)
+
+        basket = self.load_basket()
+        self.assertEqual(self.apply(basket), (True, False))
+        self.assertTrue(basket.offers_from_snapshot)
+        offer = basket.applied_offers()[self.offer.pk]
+        self.assertEqual(offer.num_applications, 5)
+        self.assertIs(basket.all_lines()[0].consumer._offers[self.offer.pk], offer)
+
+    def test_applies_offers_when_offer_is_gone(self):
+        self.apply(self.load_basket())
+        ConditionalOffer.objects.filter(pk=self.offer.pk).delete()
+        # Deleting through the queryset doesn't invalidate the snapshots
+        self.assertEqual(self.apply(self.load_basket()), (False, True))
+
+    def test_refresh_applies_offers_of_restored_basket(self):
+        self.apply(self.load_basket())
+        basket = self.load_basket()
+        self.apply(basket)
+        applicator = Applicator()
+
+        with mock.patch.object(applicator, "apply", wraps=applicator.apply) as apply:
+            self.snapshots.refresh(basket, None, None, applicator)
+            self.snapshots.refresh(basket, None, None, applicator)
+
+        apply.assert_called_once()
+        self.assertFalse(basket.offers_from_snapshot)
+        self.assertGreater(basket.total_discount, D("0.00"))
+
+    def test_line_changes_invalidate_snapshot(self):
+        self.apply(self.load_basket())
+        line = self.basket.all_lines()[0]
+        line.quantity = 2
+        line.save()
+
+        self.assertEqual(self.apply(self.load_basket()), (False, True))
+
+    def test_offer_changes_invalidate_snapshot(self):
+        self.apply(self.load_basket())
+        self.offer.priority = 10
+        self.offer.save()
+
+        self.assertEqual(self.apply(self.load_basket()), (False, True))
+
+    def test_snapshots_are_per_user(self):
+        self.apply(self.load_basket())
+        applicator = mock.Mock()
+        user = mock.Mock(pk=123)
+
+        self.assertFalse(
+            self.snapshots.apply(self.load_basket(), user, None, applicator)
+        )
+        applicator.apply.assert_called_once()
+
+    def test_disabled_without_timeout(self):
+        snapshots = BasketSnapshotCache(timeout=0)
+        applicator = mock.Mock()
+
+        snapshots.apply(self.load_basket(), None, None, applicator)
+        snapshots.apply(self.load_basket(), None, None, applicator)
+        self.assertEqual(applicator.apply.call_count, 2)
@@ -22,7 +22,6 @@ from oscar.apps.basket.formsets import BasketLineFormSet, SavedLineFormSet
 from oscar.apps.basket.signals import basket_addition, voucher_addition, voucher_removal
 from oscar.apps.checkout.applicator import SurchargeApplicator
 from oscar.apps.checkout.calculators import OrderTotalCalculator
-from oscar.apps.offer.applicator import Applicator
 from oscar.apps.shipping.repository import Repository
 from oscar.core import ajax
 from oscar.core.utils import is_ajax, redirect_to_referrer, safe_referrer
@@ -30,6 +29,7 @@ from oscar.core.utils import is_ajax, redirect_to_referrer, safe_referrer
 from ecommerce.apps.basket.models import Basket, Line
 from ecommerce.apps.basket.utils import BasketMessageGenerator
 from ecommerce.apps.catalogue.models import Product
+from ecommerce.apps.offer.applicator import Applicator, get_upsell_messages
 from ecommerce.apps.voucher.models import Voucher
 
 
@@ -41,6 +41,12 @@ class BasketView(ModelFormSetView):
     factory_kwargs = {"extra": 0, "can_delete": True}
     template_name = "eta/basket/basket.html"
 
+    def dispatch(self, request, *args, **kwargs):
+        # Record the upsell messages while the offers are applied to the
+        # basket, which happens when it is first used
+        request.record_upsell_messages = True
+        return super().dispatch(request, *args, **kwargs)
+
     def get_formset_kwargs(self):
         kwargs = super().get_formset_kwargs()
         kwargs["strategy"] = self.request.strategy
@@ -83,17 +89,7 @@ class BasketView(ModelFormSetView):
         return warnings
 
     def get_upsell_messages(self, basket):
-        offers = Applicator().get_offers(basket, self.request.user, self.request)
-        applied_offers = list(basket.offer_applications.offers.values())
-        msgs = []
-        for offer in offers:
-            if (
-                offer.is_condition_partially_satisfied(basket)
-                and offer not in applied_offers
-            ):
-                data = {"message": offer.get_upsell_message(basket), "offer": offer}
-                msgs.append(data)
-        return msgs
+        return get_upsell_messages(basket, self.request)
 
     def get_basket_voucher_form(self):
         """
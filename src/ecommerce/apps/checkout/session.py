@@ -9,13 +9,19 @@ from oscar.apps.checkout.applicator import SurchargeApplicator
 from oscar.apps.checkout.calculators import OrderTotalCalculator
 from oscar.apps.shipping.repository import Repository
 from oscar.core import prices
+from oscar.core.loading import get_class
 
 from ecommerce.apps.address.models import UserAddress
+from ecommerce.apps.basket.snapshot import basket_snapshots
 from ecommerce.apps.checkout.utils import CheckoutSessionData
 from ecommerce.apps.order.models import BillingAddress, ShippingAddress
+from ecommerce.apps.partner import reservations
+from ecommerce.apps.partner.exceptions import InsufficientStock
 
 from . import exceptions
 
+Applicator = get_class("offer.applicator", "Applicator")
+
 
 class CheckoutSessionMixin(object):
     """
@@ -47,6 +53,8 @@ class CheckoutSessionMixin(object):
         # Assign the checkout session manager so it's available in all checkout
         # views.
         self.checkout_session = CheckoutSessionData(request)
+        # The totals the customer pays must not come from a snapshot
+        basket_snapshots.refresh(request.basket, request.user, request, Applicator())
 
         # Check if this view should be skipped
         try:
@@ -128,6 +136,26 @@ class CheckoutSessionMixin(object):
                 url=reverse("basket:summary"), messages=messages_list
             )
 
+    def check_basket_stock_is_reserved(self, request):
+        """
+        Reserve the stock of the basket for the rest of the checkout, so that
+        the order doesn't fail after the payment because the stock ran out.
+        """
+        try:
+            reservations.reserve(request.basket)
+        except InsufficientStock as e:
+            raise exceptions.FailedPreCondition(
+                url=reverse("basket:summary"),
+                messages=[
+                    _(
+                        "'%(title)s' is no longer available to buy. "
+                        "Please adjust your basket to continue"
+                    )
+                    % {"title": stockrecord.product.get_title()}
+                    for stockrecord in e.stockrecords
+                ],
+            )
+
     def check_user_email_is_captured(self, request):
         if (
             not request.user.is_authenticated
@@ -38,7 +38,10 @@ from ecommerce.apps.payment.models import Bankcard, Source, SourceType
 from ecommerce.apps.shipping.methods import NoShippingRequired
 from ecommerce.apps.shipping.repository import Repository
 from ecommerce.core import signals
-from ecommerce.core.celery.tasks.order import send_confirmation_message
+from ecommerce.core.celery.tasks.order import (
+    SEND_CONFIRMATION_MESSAGE,
+    queue_order_processing,
+)
 
 # Standard logger for checkout events
 logger = logging.getLogger("ecommerce.checkout")
@@ -438,6 +441,7 @@ class PaymentDetailsView(OrderPlacementMixin, generic.FormView):
         "check_basket_is_valid",
         "check_user_email_is_captured",
         "check_shipping_data_is_captured",
+        "check_basket_stock_is_reserved",
     ]
 
     # If preview=True, then we render a preview template that shows all order
@@ -600,7 +604,7 @@ class PaymentDetailsView(OrderPlacementMixin, generic.FormView):
         return intent
 
     def send_order_placed_email(self, order):
-        send_confirmation_message.delay(order.number)
+        queue_order_processing(order, [SEND_CONFIRMATION_MESSAGE])
 
     def handle_successful_order(self, order):
         """
@@ -21,6 +21,7 @@ class OrdersDashboardConfig(OscarDashboardConfig):
         "order-detail-note": (["is_staff"], [PERMISSION_PARTNER_DASHBOARD_ACCESS]),
         "order-line-detail": (["is_staff"], [PERMISSION_PARTNER_DASHBOARD_ACCESS]),
         "order-shipping-address": (["is_staff"], [PERMISSION_PARTNER_DASHBOARD_ACCESS]),
+        "order-bulk-action": (["is_staff"], [PERMISSION_PARTNER_DASHBOARD_ACCESS]),
     }
 
     def ready(self):
@@ -41,11 +42,19 @@ class OrdersDashboardConfig(OscarDashboardConfig):
         self.order_stats_view = get_class(
             DASHBOARD_ORDERS_VIEWS, "OrderStatsView", DASHBOARD_APPS
         )
+        self.order_bulk_action_view = get_class(
+            DASHBOARD_ORDERS_VIEWS, "OrderBulkActionView", DASHBOARD_APPS
+        )
 
     def get_urls(self):
         urls = [
             path("", self.order_list_view.as_view(), name="order-list"),
             path("statistics/", self.order_stats_view.as_view(), name="order-stats"),
+            path(
+                "bulk-actions/<str:task_id>/",
+                self.order_bulk_action_view.as_view(),
+                name="order-bulk-action",
+            ),
             path(
                 "<str:number>/", self.order_detail_view.as_view(), name="order-detail"
             ),
@@ -61,6 +61,19 @@ class OrderStatsForm(forms.Form):
             self._determine_filter_metadata()
         return self._description
 
+    def get_day_filters(self):
+        """
+        Return the filters of the daily order rollups, both dates included.
+        """
+        if self.errors:
+            return {}
+        filters = {}
+        if self.cleaned_data["date_from"]:
+            filters["day__gte"] = self.cleaned_data["date_from"]
+        if self.cleaned_data["date_to"]:
+            filters["day__lte"] = self.cleaned_data["date_to"]
+        return filters
+
 
 class OrderSearchForm(forms.Form):
     order_number = forms.CharField(required=False, label=_("Order number"))
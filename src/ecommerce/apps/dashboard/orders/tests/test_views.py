@@ -1,14 +1,33 @@
+from datetime import timedelta
 from http import client as http_client
+from unittest import mock
 
 from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.timezone import localdate
 from oscar.core.loading import get_model
 
-from ecommerce.apps.order.models import Order, OrderNote, PaymentEvent, PaymentEventType
+from ecommerce.apps.order import rollups
+from ecommerce.apps.order.models import (
+    Order,
+    OrderNote,
+    PaymentEvent,
+    PaymentEventType,
+    ShippingEventType,
+)
+from ecommerce.core.celery.tasks.order import (
+    PROGRESS,
+    bulk_change_order_statuses,
+    export_orders,
+)
 from ecommerce.test.factories import (
     PartnerFactory,
     ShippingAddressFactory,
     SourceTypeFactory,
+    UserFactory,
     create_basket,
     create_order,
 )
@@ -38,6 +57,42 @@ class TestOrderListDashboard(WebTestCase):
         form["selected_order"].checked = True
         form.submit("download_selected")
 
+    def test_streams_csv_export(self):
+        url = reverse("dashboard:order-list")
+        orders = [
+            create_order(shipping_address=ShippingAddressFactory(first_name="Bob"))
+        ]
+        self.get(url, params={"response_format": "csv"})
+        with CaptureQueriesContext(connection) as queries:
+            self.get(url, params={"response_format": "csv"})
+        orders += [create_order() for __ in range(2)]
+
+        # The number of queries doesn't grow with the number of orders
+        with self.assertNumQueries(len(queries)):
+            response = self.get(url, params={"response_format": "csv"})
+        self.assertTrue(response.headers["Content-Disposition"].endswith("orders.csv"))
+        lines = response.text.splitlines()
+        self.assertEqual(lines[0].split(",")[0], "Order number")
+        self.assertEqual(
+            [line.split(",")[0] for line in lines[1:]],
+            [str(order.number) for order in reversed(orders)],
+        )
+        self.assertIn("Bob", lines[3])
+
+    @override_settings(ORDER_EXPORT_ASYNC_THRESHOLD=1)
+    def test_large_csv_export_runs_in_background(self):
+        orders = [create_order() for __ in range(2)]
+        url = reverse("dashboard:order-list")
+
+        with mock.patch.object(export_orders, "delay") as delay:
+            delay.return_value.id = "task-id"
+            response = self.get(url, params={"response_format": "csv"})
+
+        self.assertRedirectsTo(response, "dashboard:order-list")
+        delay.assert_called_once_with(
+            self.user.pk, [order.pk for order in reversed(orders)]
+        )
+
     def test_allows_order_number_search(self):
         page = self.get(reverse("dashboard:order-list"))
         form = page.forms["search_form"]
@@ -118,6 +173,17 @@ class PermissionBasedDashboardOrderTestsNoStaff(PermissionBasedDashboardOrderTes
         )
         self.assertNoAccess(self.get(url, status="*"))
 
+    def test_non_staff_stats_only_count_her_lines(self):
+        rollups.rebuild(localdate(), localdate())
+
+        response = self.get(reverse("dashboard:order-stats"))
+        self.assertEqual(response.context["total_orders"], 1)
+        self.assertEqual(response.context["total_lines"], 1)
+        self.assertEqual(
+            response.context["total_revenue"],
+            self.order_in.lines.get().line_price_incl_tax,
+        )
+
 
 class PermissionBasedDashboardOrderTestsStaff(PermissionBasedDashboardOrderTestsBase):
     is_staff = True
@@ -133,6 +199,27 @@ class PermissionBasedDashboardOrderTestsStaff(PermissionBasedDashboardOrderTests
             url = reverse("dashboard:order-detail", kwargs={"number": order.number})
             self.assertIsOk(self.get(url))
 
+    def test_stats_are_read_from_rollups(self):
+        today = localdate()
+        url = reverse("dashboard:order-stats")
+        self.assertEqual(self.get(url).context["total_orders"], 0)
+        rollups.rebuild(today, today)
+
+        response = self.get(url)
+        self.assertEqual(response.context["total_orders"], 2)
+        self.assertEqual(
+            response.context["total_revenue"],
+            self.order_in.total_incl_tax + self.order_out.total_incl_tax,
+        )
+        self.assertEqual(
+            list(response.context["order_status_breakdown"]),
+            [{"status": self.order_in.status, "freq": 2}],
+        )
+        response = self.get(url, params={"date_to": today - timedelta(days=1)})
+        self.assertEqual(response.context["total_orders"], 0)
+        response = self.get(url, params={"date_from": today, "date_to": today})
+        self.assertEqual(response.context["total_orders"], 2)
+
 
 class TestOrderListSearch(WebTestCase):
     is_staff = True
@@ -202,6 +289,18 @@ class TestOrderListSearch(WebTestCase):
             ]
             self.assertEqual(applied_filters, expected_filters)
 
+    def test_search_matches_search_documents(self):
+        order = create_order(
+            shipping_address=ShippingAddressFactory(first_name="Bob", last_name="Smith")
+        )
+        create_order()
+        url = reverse("dashboard:order-list")
+
+        response = self.get(url, params={"name": "bob smi", "order_number": ""})
+        self.assertEqual(list(response.context["orders"]), [order])
+        response = self.get(url, params={"name": "bob", "upc": "missing"})
+        self.assertEqual(list(response.context["orders"]), [])
+
 
 class TestOrderDetailPage(WebTestCase):
     is_staff = True
@@ -317,6 +416,93 @@ class TestChangingOrderStatusFromFormOnOrderListView(WebTestCase):
         self.assertEqual(OrderNote.SYSTEM, notes[0].note_type)
 
 
+class TestBulkOrderActionsOnOrderListView(WebTestCase):
+    is_staff = True
+
+    def setUp(self):
+        super().setUp()
+        self.orders = [create_order(), create_order()]
+        self.shipped = ShippingEventType.objects.create(name="Shipped")
+
+    def submit(self, action, **fields):
+        page = self.get(reverse("dashboard:order-list"))
+        form = page.forms["orders_form"]
+        form["selected_order"] = [order.pk for order in self.orders]
+        for name, value in fields.items():
+            # Other tests change the statuses of the pipeline
+            form[name].force_value(value)
+        return form.submit(name="action", value=action)
+
+    def test_creates_shipping_events(self):
+        response = self.submit(
+            "create_shipping_events", shipping_event_type="shipped", reference="run"
+        )
+
+        self.assertIsRedirect(response)
+        for order in self.orders:
+            event = order.shipping_events.get()
+            self.assertEqual((event.event_type, event.notes), (self.shipped, "run"))
+            self.assertEqual(event.line_quantities.count(), order.lines.count())
+
+    @override_settings(ORDER_BULK_ACTION_ASYNC_THRESHOLD=1)
+    def test_large_selections_run_in_the_background(self):
+        with mock.patch.object(bulk_change_order_statuses, "delay") as delay:
+            delay.return_value.id = "task-id"
+            response = self.submit("change_order_statuses", new_status="Complete")
+
+        self.assertIsRedirect(response)
+        user_id, order_ids, new_status, note_msg = delay.call_args.args
+        self.assertEqual(user_id, self.user.pk)
+        self.assertEqual(sorted(order_ids), [order.pk for order in self.orders])
+        self.assertEqual(new_status, "Complete")
+        self.assertIn("%(old_status)s", note_msg)
+        self.assertFalse(OrderNote.objects.exists())
+
+    def get_progress(self, info):
+        with mock.patch("ecommerce.apps.dashboard.orders.views.AsyncResult") as result:
+            result.return_value.state = PROGRESS
+            result.return_value.info = info
+            return self.get(
+                reverse("dashboard:order-bulk-action", kwargs={"task_id": "task-id"}),
+                expect_errors=True,
+            )
+
+    def test_reports_progress_of_background_actions(self):
+        response = self.get_progress(
+            {"user_id": self.user.pk, "done": 500, "total": 1000}
+        )
+
+        self.assertEqual(
+            response.json,
+            {
+                "state": PROGRESS,
+                "progress": {"done": 500, "total": 1000},
+                "error": None,
+            },
+        )
+
+    def test_progress_is_only_reported_to_requesting_user(self):
+        other = UserFactory()
+        response = self.get_progress({"user_id": other.pk, "done": 500, "total": 1000})
+
+        self.assertEqual(response.status_code, http_client.NOT_FOUND)
+
+    def test_exports_link_to_signed_urls(self):
+        with mock.patch(
+            "ecommerce.apps.dashboard.orders.views.private_storage"
+        ) as storage:
+            storage.url.return_value = "https://example.com/export.csv?Signature=x"
+            response = self.get_progress(
+                {"user_id": self.user.pk, "done": 1, "total": 1, "file": "export.csv"}
+            )
+
+        storage.url.assert_called_once_with("export.csv")
+        self.assertEqual(
+            response.json["progress"]["url"],
+            "https://example.com/export.csv?Signature=x",
+        )
+
+
 class LineDetailTests(WebTestCase):
     is_staff = True
 
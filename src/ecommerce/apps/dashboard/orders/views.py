@@ -2,19 +2,24 @@ import datetime
 from decimal import Decimal as D
 from decimal import InvalidOperation
 
+from celery.result import AsyncResult
 from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count, Q, Sum, fields
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.db.models import QuerySet, fields
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import DetailView, FormView, ListView, UpdateView
+from django.views.generic import DetailView, FormView, ListView, UpdateView, View
 from oscar.apps.order import exceptions as order_exceptions
 from oscar.apps.payment.exceptions import PaymentError
-from oscar.core.compat import UnicodeCSVWriter
-from oscar.core.utils import datetime_combine, format_datetime
+from oscar.core.utils import datetime_combine
 from oscar.views import sort_queryset
 from oscar.views.generic import BulkEditMixin
 
@@ -25,10 +30,12 @@ from ecommerce.apps.dashboard.orders.forms import (
     OrderStatusForm,
     ShippingAddressForm,
 )
+from ecommerce.apps.order import exports, rollups, search
 from ecommerce.apps.order.mixins import EventHandlerMixin
 from ecommerce.apps.order.models import (
     Line,
     Order,
+    OrderDailyRollup,
     OrderNote,
     PaymentEventType,
     ShippingAddress,
@@ -36,6 +43,13 @@ from ecommerce.apps.order.models import (
 )
 from ecommerce.apps.partner.models import Partner
 from ecommerce.apps.payment.models import SourceType, Transaction
+from ecommerce.core.celery.celery import app
+from ecommerce.core.celery.tasks.order import (
+    bulk_change_order_statuses,
+    bulk_create_shipping_events,
+    export_orders,
+)
+from ecommerce.core.storages.private import private_storage
 
 
 def queryset_orders_for_user(user):
@@ -69,6 +83,9 @@ class OrderStatsView(FormView):
     """
     Dashboard view for order statistics.
     Supports the permission-based dashboard.
+
+    The stats are read from the daily order rollups, partners only see the
+    totals of their own lines.
     """
 
     template_name = "eta/dashboard/orders/statistics.html"
@@ -78,7 +95,7 @@ class OrderStatsView(FormView):
         return self.post(request, *args, **kwargs)
 
     def form_valid(self, form):
-        ctx = self.get_context_data(form=form, filters=form.get_filters())
+        ctx = self.get_context_data(form=form, filters=form.get_day_filters())
         return self.render_to_response(ctx)
 
     def get_form_kwargs(self):
@@ -94,17 +111,19 @@ class OrderStatsView(FormView):
         return ctx
 
     def get_stats(self, filters):
-        orders = queryset_orders_for_user(self.request.user).filter(**filters)
+        partner_ids = None
+        if not self.request.user.is_staff:
+            partner_ids = list(
+                Partner._default_manager.filter(users=self.request.user).values_list(
+                    "pk", flat=True
+                )
+            )
+        daily = rollups.filter_rollups(
+            OrderDailyRollup.objects.filter(**filters), partner_ids
+        )
         return {
-            "total_orders": orders.count(),
-            "total_lines": Line.objects.filter(order__in=orders).count(),
-            "total_revenue": orders.aggregate(Sum("total_incl_tax"))[
-                "total_incl_tax__sum"
-            ]
-            or D("0.00"),
-            "order_status_breakdown": orders.order_by("status")
-            .values("status")
-            .annotate(freq=Count("id")),
+            **rollups.get_totals(daily),
+            "order_status_breakdown": rollups.get_status_breakdown(daily),
         }
 
 
@@ -119,17 +138,15 @@ class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
     template_name = "eta/dashboard/orders/order_list.html"
     form_class = OrderSearchForm
     paginate_by = settings.OSCAR_DASHBOARD_ITEMS_PER_PAGE
-    actions = ("download_selected_orders", "change_order_statuses")
-    CSV_COLUMNS = {
-        "number": _("Order number"),
-        "value": _("Order value"),
-        "date": _("Date of purchase"),
-        "num_items": _("Number of items"),
-        "status": _("Order status"),
-        "customer": _("Customer email address"),
-        "shipping_address_name": _("Deliver to name"),
-        "billing_address_name": _("Bill to name"),
-    }
+    actions = (
+        "download_selected_orders",
+        "change_order_statuses",
+        "create_shipping_events",
+    )
+    status_change_note = _(
+        "Order status changed from '%(old_status)s' to '%(new_status)s'"
+    )
+    CSV_COLUMNS = exports.CSV_COLUMNS
 
     def dispatch(self, request, *args, **kwargs):
         # base_queryset is equal to all orders the user is allowed to access
@@ -166,42 +183,33 @@ class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
 
         data = self.form.cleaned_data
 
+        # The text filters are matched against the search documents, see
+        # ecommerce.apps.order.search
+        terms = []
         if data["order_number"]:
-            queryset = self.base_queryset.filter(
-                number__istartswith=data["order_number"]
+            terms.append(
+                search.get_term(search.NUMBER, data["order_number"], prefix=True)
             )
 
         if data["name"]:
-            # If the value is two words, then assume they are first name and
-            # last name
-            parts = data["name"].split()
-            allow_anon = getattr(settings, "OSCAR_ALLOW_ANON_CHECKOUT", False)
-
-            if len(parts) == 1:
-                parts = [data["name"], data["name"]]
-            else:
-                parts = [parts[0], parts[1:]]
-
-            filter = Q(user__first_name__istartswith=parts[0])
-            filter |= Q(user__last_name__istartswith=parts[1])
-            if allow_anon:
-                filter |= Q(billing_address__first_name__istartswith=parts[0])
-                filter |= Q(shipping_address__first_name__istartswith=parts[0])
-                filter |= Q(billing_address__last_name__istartswith=parts[1])
-                filter |= Q(shipping_address__last_name__istartswith=parts[1])
-
-            queryset = queryset.filter(filter).distinct()
+            terms.append(search.get_words_term(search.CUSTOMER, data["name"]))
 
         if data["product_title"]:
-            queryset = queryset.filter(
-                lines__title__istartswith=data["product_title"]
-            ).distinct()
+            terms.append(
+                search.get_words_term(search.TITLE, data["product_title"])
+            )
 
         if data["upc"]:
-            queryset = queryset.filter(lines__upc=data["upc"])
+            terms.append(search.get_term(search.UPC, data["upc"]))
 
         if data["partner_sku"]:
-            queryset = queryset.filter(lines__partner_sku=data["partner_sku"])
+            terms.append(search.get_term(search.SKU, data["partner_sku"]))
+
+        if data["voucher"]:
+            terms.append(search.get_term(search.VOUCHER, data["voucher"]))
+
+        if terms:
+            queryset = search.filter_orders(queryset, terms)
 
         if data["date_from"] and data["date_to"]:
             date_to = datetime_combine(data["date_to"], datetime.time.max)
@@ -216,11 +224,6 @@ class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
             date_to = datetime_combine(data["date_to"], datetime.time.max)
             queryset = queryset.filter(date_placed__lt=date_to)
 
-        if data["voucher"]:
-            queryset = queryset.filter(
-                discounts__voucher_code=data["voucher"]
-            ).distinct()
-
         if data["payment_method"]:
             queryset = queryset.filter(
                 sources__source_type__code=data["payment_method"]
@@ -352,6 +355,7 @@ class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
         ctx = super().get_context_data(**kwargs)
         ctx["form"] = self.form
         ctx["order_statuses"] = Order.all_statuses()
+        ctx["shipping_event_types"] = ShippingEventType._default_manager.all()
         ctx["search_filters"] = self.get_search_filter_descriptions()
         return ctx
 
@@ -370,67 +374,144 @@ class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
         return "orders.csv"
 
     def get_row_values(self, order):
-        row = {
-            "number": order.number,
-            "customer": order.email,
-            "num_items": order.num_items,
-            "date": format_datetime(order.date_placed, "DATETIME_FORMAT"),
-            "value": order.total_incl_tax,
-            "status": order.status,
-        }
-        if order.shipping_address:
-            row["shipping_address_name"] = order.shipping_address.name
-        if order.billing_address:
-            row["billing_address_name"] = order.billing_address.name
-        return row
+        return exports.get_row_values(order)
+
+    def is_export_async(self, orders):
+        # Exports of more orders are written to storage by a background task
+        threshold = getattr(settings, "ORDER_EXPORT_ASYNC_THRESHOLD", None)
+        return (
+            threshold is not None
+            and isinstance(orders, QuerySet)
+            and orders.count() > threshold
+        )
 
     def download_selected_orders(self, request, orders):
-        response = HttpResponse(content_type="text/csv")
+        if self.is_export_async(orders):
+            result = export_orders.delay(
+                request.user.pk, list(orders.values_list("pk", flat=True))
+            )
+            messages.info(
+                request,
+                _(
+                    "The orders are being exported in the background, follow the"
+                    " progress at %s"
+                )
+                % reverse("dashboard:order-bulk-action", kwargs={"task_id": result.id}),
+            )
+            return redirect("dashboard:order-list")
+
+        rows = exports.iter_rows(orders, self.get_row_values, self.CSV_COLUMNS)
+        response = StreamingHttpResponse(
+            exports.iter_csv(rows), content_type="text/csv"
+        )
         response[
             "Content-Disposition"
         ] = f"attachment; filename={self.get_download_filename(request)}"
-        writer = UnicodeCSVWriter(open_file=response)
-
-        writer.writerow(self.CSV_COLUMNS.values())
-        for order in orders:
-            row_values = self.get_row_values(order)
-            writer.writerow([row_values.get(column, "") for column in self.CSV_COLUMNS])
         return response
 
-    def change_order_statuses(self, request, orders):
-        for order in orders:
-            self.change_order_status(request, order)
-        return redirect("dashboard:order-list")
+    def is_bulk_action_async(self, orders):
+        # Larger selections are handled by a background task
+        threshold = getattr(settings, "ORDER_BULK_ACTION_ASYNC_THRESHOLD", 500)
+        return len(orders) > threshold
+
+    def queue_bulk_action(self, request, task, *args):
+        result = task.delay(request.user.pk, *args)
+        messages.info(
+            request,
+            _(
+                "The orders are being updated in the background, follow the"
+                " progress at %s"
+            )
+            % reverse("dashboard:order-bulk-action", kwargs={"task_id": result.id}),
+        )
 
-    def change_order_status(self, request, order):
-        # This method is pretty similar to what
-        # OrderDetailView.change_order_status does. Ripe for refactoring.
+    def change_order_statuses(self, request, orders):
         new_status = request.POST["new_status"].strip()
         if not new_status:
             messages.error(request, _("The new status '%s' is not valid") % new_status)
-        elif new_status not in order.available_statuses():
-            messages.error(
+        elif self.is_bulk_action_async(orders):
+            self.queue_bulk_action(
                 request,
-                _("The new status '%s' is not valid for" " this order") % new_status,
+                bulk_change_order_statuses,
+                [order.pk for order in orders],
+                new_status,
+                str(self.status_change_note),
             )
         else:
             handler = self.get_handler(user=request.user)
-            old_status = order.status
-            try:
-                handler.handle_order_status_change(order, new_status)
-            except PaymentError as e:
-                messages.error(
+            changed, invalid = handler.handle_bulk_order_status_change(
+                orders, new_status, note_msg=self.status_change_note
+            )
+            if changed:
+                messages.info(
                     request,
-                    _("Unable to change order status due" " to payment error: %s") % e,
+                    _("Status of %(count)d orders changed to '%(new_status)s'")
+                    % {"count": len(changed), "new_status": new_status},
                 )
-            else:
-                msg = _(
-                    "Order status changed from '%(old_status)s' to" " '%(new_status)s'"
-                ) % {"old_status": old_status, "new_status": new_status}
-                messages.info(request, msg)
-                order.notes.create(
-                    user=request.user, message=msg, note_type=OrderNote.SYSTEM
+            if invalid:
+                messages.error(
+                    request,
+                    _(
+                        "The new status '%(new_status)s' is not valid for orders"
+                        " %(numbers)s"
+                    )
+                    % {
+                        "new_status": new_status,
+                        "numbers": ", ".join(order.number for order in invalid),
+                    },
                 )
+        return redirect("dashboard:order-list")
+
+    def create_shipping_events(self, request, orders):
+        code = request.POST.get("shipping_event_type", "")
+        try:
+            event_type = ShippingEventType._default_manager.get(code=code)
+        except ShippingEventType.DoesNotExist:
+            messages.error(request, _("The event type '%s' is not valid") % code)
+            return redirect("dashboard:order-list")
+
+        reference = request.POST.get("reference", "")
+        if self.is_bulk_action_async(orders):
+            self.queue_bulk_action(
+                request,
+                bulk_create_shipping_events,
+                [order.pk for order in orders],
+                event_type.pk,
+                reference,
+            )
+        else:
+            events = self.get_handler(user=request.user).handle_bulk_shipping_event(
+                orders, event_type, reference
+            )
+            messages.info(
+                request,
+                _("Created %(count)d '%(event_type)s' shipping events")
+                % {"count": len(events), "event_type": event_type.name},
+            )
+        return redirect("dashboard:order-list")
+
+
+class OrderBulkActionView(View):
+    """
+    Progress of a bulk order action that runs in the background, as JSON.
+
+    Only the user who asked for the action may follow it.
+    """
+
+    def get(self, request, *args, **kwargs):
+        result = AsyncResult(kwargs["task_id"], app=app)
+        data = {"state": result.state, "progress": None, "error": None}
+        if isinstance(result.info, dict):
+            progress = dict(result.info)
+            if progress.pop("user_id", None) != request.user.pk:
+                raise Http404()
+            data["progress"] = progress
+            if "file" in progress:
+                # Finished export, see export_orders
+                progress["url"] = private_storage.url(progress["file"])
+        elif result.failed():
+            data["error"] = str(result.info)
+        return JsonResponse(data)
 
 
 class OrderDetailView(EventHandlerMixin, DetailView):
@@ -17,9 +17,17 @@ class ReportsDashboardConfig(OscarDashboardConfig):
         self.index_view = get_class(
             "dashboard.reports.views", "IndexView", "ecommerce.apps"
         )
+        self.report_run_view = get_class(
+            "dashboard.reports.views", "ReportRunView", "ecommerce.apps"
+        )
 
     def get_urls(self):
         urls = [
             path("", self.index_view.as_view(), name="reports-index"),
+            path(
+                "runs/<uuid:uuid>/",
+                self.report_run_view.as_view(),
+                name="report-run",
+            ),
         ]
         return self.post_process_urls(urls)
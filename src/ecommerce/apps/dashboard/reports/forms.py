@@ -29,6 +29,11 @@ class ReportForm(forms.Form):
                               required=False,
                               widget=DatePickerInput)
     download = forms.BooleanField(label=_("Download"), required=False)
+    background = forms.BooleanField(
+        label=_("Generate in the background"),
+        required=False,
+        help_text=_("Writes the CSV of the report to a file, for long date"
+                    " ranges"))
 
     def clean(self):
         date_from = self.cleaned_data.get('date_from', None)
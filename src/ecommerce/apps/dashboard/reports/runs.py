@@ -0,0 +1,135 @@
+"""
+Reports generated in the background.
+
+Reports over long date ranges take too long to generate within a request.
+Instead, a ``ReportRun`` records the report asked for and a Celery task
+writes its CSV to the storage of the tenant (see
+``ecommerce.core.celery.tasks.reports``), updating the progress of the run
+as it goes, so that the dashboard can poll it and link to the file once it
+is complete. The files are kept in the private storage, under names that
+can't be guessed.
+
+Asking for the same report over the same dates again within
+``REPORT_RUN_MAX_AGE`` seconds returns the run that completed already, or
+the one still being generated unless it made no progress for
+``REPORT_RUN_STALE_AFTER`` seconds, rather than generating the report again.
+"""
+import io
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from oscar.core.loading import get_class, get_model
+
+from ecommerce.core.storages.private import get_private_name, private_storage
+
+GeneratorRepository = get_class(
+    "dashboard.reports.utils", "GeneratorRepository", "ecommerce.apps"
+)
+
+CHUNK_SIZE = 1000
+
+
+def get_recent_run(report_type, date_from, date_to):
+    """
+    Return the latest run of the report that completed, or is still making
+    progress, and can still be reused, if any.
+    """
+    ReportRun = get_model("analytics", "ReportRun")
+
+    max_age = getattr(settings, "REPORT_RUN_MAX_AGE", 3600)
+    stale_after = getattr(settings, "REPORT_RUN_STALE_AFTER", 600)
+    now = timezone.now()
+    return ReportRun.objects.filter(
+        Q(status=ReportRun.COMPLETE)
+        | Q(
+            status__in=[ReportRun.PENDING, ReportRun.RUNNING],
+            date_updated__gte=now - timedelta(seconds=stale_after),
+        ),
+        report_type=report_type,
+        date_from=date_from,
+        date_to=date_to,
+        date_created__gte=now - timedelta(seconds=max_age),
+    ).first()
+
+
+def get_or_create_run(report_type, date_from, date_to, user=None):
+    """
+    Return a run of the report and whether it was created, in which case it
+    still has to be generated.
+    """
+    ReportRun = get_model("analytics", "ReportRun")
+
+    run = get_recent_run(report_type, date_from, date_to)
+    if run is not None:
+        return run, False
+    run = ReportRun.objects.create(
+        report_type=report_type, date_from=date_from, date_to=date_to, user=user
+    )
+    return run, True
+
+
+def iter_objects(run, objects):
+    """
+    Iterate over the ``objects`` of the report in chunks, recording the
+    progress of ``run`` after each chunk.
+    """
+    ReportRun = get_model("analytics", "ReportRun")
+
+    # Updating date_updated too tells the run is still making progress
+    if isinstance(objects, QuerySet):
+        run.total = objects.count()
+        ReportRun.objects.filter(pk=run.pk).update(
+            total=run.total, date_updated=timezone.now()
+        )
+        objects = objects.iterator(chunk_size=CHUNK_SIZE)
+    for obj in objects:
+        yield obj
+        run.done += 1
+        if run.done % CHUNK_SIZE == 0:
+            ReportRun.objects.filter(pk=run.pk).update(
+                done=run.done, date_updated=timezone.now()
+            )
+
+
+def write_report(run):
+    """
+    Write the CSV of the report of ``run`` to the private storage and return
+    the name it was saved under.
+    """
+    generator_cls = GeneratorRepository().get_generator(run.report_type)
+    generator = generator_cls(
+        start_date=run.date_from, end_date=run.date_to, formatter="CSV"
+    )
+    name = get_private_name(
+        "reports",
+        "{}-{:%Y%m%d-%H%M%S}.csv".format(run.report_type, run.date_created),
+    )
+    with tempfile.TemporaryFile("w+b") as temp:
+        text = io.TextIOWrapper(temp, encoding="utf-8", newline="")
+        generator.formatter.generate_csv(text, iter_objects(run, generator.queryset))
+        text.flush()
+        temp.seek(0)
+        return private_storage.save(name, File(temp, name=name))
+
+
+def run_report(run):
+    """
+    Generate the report of ``run`` and record its outcome.
+    """
+    ReportRun = get_model("analytics", "ReportRun")
+
+    run.status = ReportRun.RUNNING
+    run.save(update_fields=["status", "date_updated"])
+    try:
+        run.file = write_report(run)
+    except Exception as e:
+        run.status = ReportRun.FAILED
+        run.error = repr(e)
+        run.save(update_fields=["status", "error", "done", "date_updated"])
+        raise
+    run.status = ReportRun.COMPLETE
+    run.save(update_fields=["status", "file", "done", "total", "date_updated"])
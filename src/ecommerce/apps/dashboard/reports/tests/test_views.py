@@ -1,5 +1,11 @@
+from datetime import date, timedelta
+from unittest import mock
+
 from django.urls import reverse
+from django.utils import timezone
 
+from ecommerce.apps.analytics.models import ReportRun
+from ecommerce.apps.dashboard.reports import views
 from ecommerce.test.testcases import WebTestCase
 
 
@@ -39,3 +45,79 @@ class ReportsDashboardTests(WebTestCase):
         response.form['download'] = 'true'
         response.form.submit()
         self.assertIsOk(response)
+
+
+class ReportRunTests(WebTestCase):
+    is_staff = True
+
+    def submit_in_background(self, report_type='order_report'):
+        response = self.get(reverse('dashboard:reports-index'))
+        response.form['report_type'] = report_type
+        response.form['date_from'] = '2017-01-01'
+        response.form['date_to'] = '2017-12-31'
+        response.form['background'] = 'true'
+        with mock.patch.object(views.generate_report, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = response.form.submit()
+        return response, delay
+
+    def test_report_is_generated_in_background(self):
+        response, delay = self.submit_in_background()
+
+        self.assertRedirectsTo(response, 'dashboard:reports-index')
+        run = ReportRun.objects.get()
+        self.assertEqual(
+            (run.report_type, run.date_from, run.date_to, run.user),
+            ('order_report', date(2017, 1, 1), date(2017, 12, 31), self.user),
+        )
+        delay.assert_called_once_with(run.pk)
+        self.assertIn(str(run.uuid), response.follow().text)
+
+    def test_identical_requests_reuse_recent_run(self):
+        self.submit_in_background()
+        __, delay = self.submit_in_background()
+        self.submit_in_background(report_type='conditional-offers')
+
+        delay.assert_not_called()
+        self.assertEqual(ReportRun.objects.count(), 2)
+
+    def test_failed_and_old_runs_are_not_reused(self):
+        self.submit_in_background()
+        ReportRun.objects.update(status=ReportRun.FAILED)
+        self.submit_in_background()
+        ReportRun.objects.update(date_created=timezone.now() - timedelta(days=1))
+        __, delay = self.submit_in_background()
+
+        self.assertEqual(delay.call_count, 1)
+        self.assertEqual(ReportRun.objects.count(), 3)
+
+    def test_stuck_runs_are_not_reused(self):
+        self.submit_in_background()
+        ReportRun.objects.update(
+            status=ReportRun.RUNNING, date_updated=timezone.now() - timedelta(hours=1))
+        __, delay = self.submit_in_background()
+        ReportRun.objects.filter(status=ReportRun.PENDING).update(
+            status=ReportRun.COMPLETE, date_updated=timezone.now() - timedelta(hours=1))
+        __, other_delay = self.submit_in_background()
+
+        self.assertEqual(delay.call_count, 1)
+        other_delay.assert_not_called()
+        self.assertEqual(ReportRun.objects.count(), 2)
+
+    def test_run_progress(self):
+        run = ReportRun.objects.create(
+            report_type='order_report', status=ReportRun.COMPLETE, done=3, total=3,
+            file='reports/order_report.csv')
+        url = reverse('dashboard:report-run', kwargs={'uuid': run.uuid})
+
+        with mock.patch.object(views, 'private_storage') as storage:
+            storage.url.return_value = '/media/reports/order_report.csv'
+            response = self.get(url)
+
+        self.assertEqual(response.json, {
+            'status': ReportRun.COMPLETE,
+            'progress': {'done': 3, 'total': 3},
+            'url': '/media/reports/order_report.csv',
+            'error': None,
+        })
+        storage.url.assert_called_once_with('reports/order_report.csv')
@@ -1,9 +1,21 @@
+from functools import partial
+
 from django.conf import settings
-from django.http import Http404, HttpResponseForbidden
+from django.contrib import messages
+from django.db import transaction
+from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import ListView
-from oscar.core.loading import get_class
+from django.views.generic import ListView, View
+from oscar.core.loading import get_class, get_model
+
+from ecommerce.apps.dashboard.reports import runs
+from ecommerce.core.celery.tasks.reports import generate_report
+from ecommerce.core.storages.private import private_storage
+
+ReportRun = get_model("analytics", "ReportRun")
 
 ReportForm = get_class("dashboard.reports.forms", "ReportForm")
 GeneratorRepository = get_class(
@@ -45,6 +57,9 @@ class IndexView(ListView):
                         _("You do not have access to", " this report")  # Add a comma between the strings
                     )
 
+                if form.cleaned_data["background"]:
+                    return self.generate_in_background(request, form)
+
                 report = generator.generate()
 
                 if form.cleaned_data["download"]:
@@ -55,6 +70,25 @@ class IndexView(ListView):
             form = self.report_form_class()
         return TemplateResponse(request, self.template_name, {"form": form})
 
+    def generate_in_background(self, request, form):
+        run, created = runs.get_or_create_run(
+            form.cleaned_data["report_type"],
+            form.cleaned_data["date_from"],
+            form.cleaned_data["date_to"],
+            request.user,
+        )
+        if created:
+            transaction.on_commit(partial(generate_report.delay, run.pk))
+        messages.info(
+            request,
+            _(
+                "The report is being generated in the background, follow the"
+                " progress at %s"
+            )
+            % reverse("dashboard:report-run", kwargs={"uuid": run.uuid}),
+        )
+        return redirect("dashboard:reports-index")
+
     # Rename this method here and in `get`
     def _extracted_from_get(self, generator, form):
         self.template_name = generator.filename()
@@ -63,3 +97,24 @@ class IndexView(ListView):
         context["form"] = form
         context["description"] = generator.report_description()
         return self.render_to_response(context)
+
+
+class ReportRunView(View):
+    """
+    Progress of a report generated in the background, as JSON.
+    """
+
+    def get(self, request, *args, **kwargs):
+        run = get_object_or_404(ReportRun, uuid=kwargs["uuid"])
+        generator_cls = GeneratorRepository().get_generator(run.report_type)
+        if not generator_cls or not generator_cls().is_available_to(request.user):
+            raise Http404()
+        data = {
+            "status": run.status,
+            "progress": {"done": run.done, "total": run.total},
+            "url": None,
+            "error": run.error or None,
+        }
+        if run.status == ReportRun.COMPLETE:
+            data["url"] = private_storage.url(run.file)
+        return JsonResponse(data)
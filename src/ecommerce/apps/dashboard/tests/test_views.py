@@ -1,11 +1,19 @@
+from datetime import timedelta
 from decimal import Decimal as D
 
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.timezone import localdate, now
 from oscar.apps.dashboard.views import IndexView
 from oscar.core import prices
 from oscar.core.loading import get_model
 
-from ecommerce.apps.order.models import Order
+from ecommerce.apps.dashboard import views
+from ecommerce.apps.order import rollups
+from ecommerce.apps.order.models import Order, OrderHourlyRollup
 from ecommerce.test.factories import (
     UserFactory,
     create_basket,
@@ -190,3 +198,67 @@ class TestDashboardIndexStatsForNonStaffUser(WebTestCase):
         self.assertEqual(context["total_orders"], 9)
         self.assertEqual(context["total_lines"], 9)
         self.assertEqual(context["total_revenue"], D(90))
+
+
+class TestDashboardIndexStats(WebTestCase):
+    is_staff = True
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(cache.clear)
+
+    def create_order(self, excl_tax, hours_ago=0):
+        order = create_order(
+            total=prices.Price("GBP", excl_tax=D(excl_tax), tax=D("0.00"))
+        )
+        Order.objects.filter(pk=order.pk).update(
+            date_placed=now() - timedelta(hours=hours_ago)
+        )
+        return order
+
+    def test_queries_dont_grow_with_the_data(self):
+        self.create_order("10.00")
+        with CaptureQueriesContext(connection) as queries:
+            views.IndexView().compute_stats()
+        self.create_order("20.00", hours_ago=3)
+        self.create_order("40.00", hours_ago=30)
+
+        with self.assertNumQueries(len(queries)):
+            stats = views.IndexView().compute_stats()
+        self.assertEqual(stats["total_orders"], 3)
+        self.assertEqual(stats["total_revenue"], D("70.00"))
+        self.assertEqual(stats["total_orders_last_day"], 2)
+        self.assertEqual(stats["total_revenue_last_day"], D("30.00"))
+        self.assertEqual(stats["average_order_costs"], D("15.00"))
+        self.assertEqual(stats["total_lines"], 3)
+        self.assertEqual(stats["total_lines_last_day"], 2)
+
+    def test_hourly_report(self):
+        self.create_order("10.00")
+        self.create_order("20.00", hours_ago=3)
+        self.create_order("40.00", hours_ago=30)
+        today = localdate()
+        rollups.rebuild(today - timedelta(days=2), today)
+
+        report = views.IndexView().get_hourly_report(
+            OrderHourlyRollup.objects.filter(partner=None)
+        )
+
+        totals = [item["total_incl_tax"] for item in report["order_total_hourly"]]
+        self.assertEqual(len(totals), 12)
+        self.assertEqual(totals[-1], D("10.00"))
+        self.assertEqual(sum(totals), D("30.00"))
+        self.assertEqual(report["max_revenue"], D("20"))
+
+    @override_settings(DASHBOARD_STATS_CACHE_TIMEOUT=60)
+    def test_stats_are_cached(self):
+        self.create_order("10.00")
+        self.get(reverse("dashboard:index"))
+        self.create_order("10.00")
+
+        response = self.get(reverse("dashboard:index"))
+        self.assertEqual(response.context["total_orders"], 1)
+
+        cache.clear()
+        response = self.get(reverse("dashboard:index"))
+        self.assertEqual(response.context["total_orders"], 2)
@@ -3,8 +3,11 @@ from datetime import timedelta
 from decimal import ROUND_UP
 from decimal import Decimal as D
 
+from django.conf import settings
 from django.contrib.auth import views as auth_views
-from django.db.models import Avg, Count, Sum
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Sum
 from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
 from django.utils.timezone import now
@@ -12,11 +15,13 @@ from django.views.generic import TemplateView
 from oscar.core.compat import get_user_model
 
 from ecommerce.apps.basket.models import Basket
+from ecommerce.apps.basket.models import Line as BasketLine
 from ecommerce.apps.catalogue.models import Product
 from ecommerce.apps.dashboard.widgets import RelatedFieldWidgetWrapper
 from ecommerce.apps.offer.models import ConditionalOffer
-from ecommerce.apps.order.models import Line, Order
-from ecommerce.apps.partner.models import StockAlert
+from ecommerce.apps.order import rollups
+from ecommerce.apps.order.models import Line, Order, OrderHourlyRollup
+from ecommerce.apps.partner.models import StockAlert, StockRecord
 from ecommerce.apps.users.forms import AuthenticationForm
 from ecommerce.apps.voucher.models import Voucher
 
@@ -54,10 +59,11 @@ class IndexView(TemplateView):
         """
         return Voucher.objects.filter(end_datetime__gt=now())
 
-    def get_hourly_report(self, orders, hours=24, segments=10):
+    def get_hourly_report(self, rollups, hours=24, segments=10):
         """
         Get report of order revenue split up in hourly chunks. A report is
-        generated for the last *hours* (default=24) from the current time.
+        generated for the last *hours* (default=24) from the current time,
+        from the hourly order *rollups*.
         The report provides ``max_revenue`` of the hourly order revenue sum,
         ``y-range`` as the labelling for the y-axis in a template and
         ``order_total_hourly``, a list of properties for hourly chunks.
@@ -65,20 +71,30 @@ class IndexView(TemplateView):
         when generating the y-axis labels (default=10).
         """
         # Get datetime for 24 hours ago
-        time_now = now().replace(minute=0, second=0)
+        time_now = now().replace(minute=0, second=0, microsecond=0)
         start_time = time_now - timedelta(hours=hours - 1)
 
-        order_total_hourly = []
-        for _ in range(0, hours, 2):
-            end_time = start_time + timedelta(hours=2)
-            hourly_orders = orders.filter(
-                date_placed__gte=start_time, date_placed__lt=end_time
+        order_total_hourly = [
+            {
+                "end_time": start_time + timedelta(hours=hour + 2),
+                "total_incl_tax": D("0.0"),
+            }
+            for hour in range(0, hours, 2)
+        ]
+        # A single query for the revenue of every hour, added up in chunks of
+        # two hours
+        hourly_totals = (
+            rollups.filter(
+                hour__gte=start_time, hour__lt=order_total_hourly[-1]["end_time"]
             )
-            total = hourly_orders.aggregate(Sum("total_incl_tax"))[
-                "total_incl_tax__sum"
-            ] or D("0.0")
-            order_total_hourly.append({"end_time": end_time, "total_incl_tax": total})
-            start_time = end_time
+            .order_by()
+            .values("hour")
+            .annotate(total=Sum("revenue"))
+            .values_list("hour", "total")
+        )
+        for hour, total in hourly_totals:
+            index = int((hour - start_time) / timedelta(hours=2))
+            order_total_hourly[index]["total_incl_tax"] += total
 
         max_value = max(x["total_incl_tax"] for x in order_total_hourly)
         divisor = 1
@@ -104,72 +120,126 @@ class IndexView(TemplateView):
             "y_range": y_range,
         }
 
+    def get_stats_cache_key(self, partner_ids):
+        scope = "all" if partner_ids is None else ",".join(map(str, partner_ids))
+        return f"dashboard-stats:{connection.schema_name}:{scope}"
+
     def get_stats(self):
+        """
+        Return the stats of the partners of the user, or of the whole shop for
+        staff, cached for ``DASHBOARD_STATS_CACHE_TIMEOUT`` seconds.
+        """
+        user = self.request.user
+        partner_ids = None
+        if not user.is_staff:
+            partner_ids = sorted(user.partners.values_list("id", flat=True))
+
+        timeout = getattr(settings, "DASHBOARD_STATS_CACHE_TIMEOUT", 0)
+        if not timeout:
+            return self.compute_stats(partner_ids)
+        cache = caches[getattr(settings, "DASHBOARD_STATS_CACHE", "default")]
+        key = self.get_stats_cache_key(partner_ids)
+        stats = cache.get(key)
+        if stats is None:
+            stats = self.compute_stats(partner_ids)
+            cache.set(key, stats, timeout)
+        return stats
+
+    def compute_stats(self, partner_ids=None):
+        """
+        Compute the stats of the partners ``partner_ids``, or of the whole
+        shop when it is None.
+
+        Every model is counted with one aggregate query. Partners are matched
+        with ``EXISTS`` subqueries rather than joins, so that no ``DISTINCT``
+        is needed and sums aren't counted once per matching line.
+        """
         datetime_24hrs_ago = now() - timedelta(hours=24)
+        last_day = Q(date_placed__gt=datetime_24hrs_ago)
 
         orders = Order.objects.all()
         alerts = StockAlert.objects.all()
         baskets = Basket.objects.filter(status=Basket.OPEN)
-        customers = User.objects.filter(orders__isnull=False).distinct()
-        lines = Line.objects.filter()
+        lines = Line.objects.all()
         products = Product.objects.all()
 
-        user = self.request.user
-        if not user.is_staff:
-            partners_ids = tuple(user.partners.values_list("id", flat=True))
-            orders = orders.filter(lines__partner_id__in=partners_ids).distinct()
-            alerts = alerts.filter(stockrecord__partner_id__in=partners_ids)
+        if partner_ids is not None:
+            orders = orders.filter(
+                Exists(
+                    Line.objects.filter(
+                        order=OuterRef("pk"), partner_id__in=partner_ids
+                    )
+                )
+            )
+            alerts = alerts.filter(stockrecord__partner_id__in=partner_ids)
             baskets = baskets.filter(
-                lines__stockrecord__partner_id__in=partners_ids
-            ).distinct()
-            customers = customers.filter(
-                orders__lines__partner_id__in=partners_ids
-            ).distinct()
-            lines = lines.filter(partner_id__in=partners_ids)
-            products = products.filter(stockrecords__partner_id__in=partners_ids)
-
-        orders_last_day = orders.filter(date_placed__gt=datetime_24hrs_ago)
-
-        open_alerts = alerts.filter(status=StockAlert.OPEN)
-        closed_alerts = alerts.filter(status=StockAlert.CLOSED)
-
-        total_lines_last_day = lines.filter(order__in=orders_last_day).count()
+                Exists(
+                    BasketLine.objects.filter(
+                        basket=OuterRef("pk"),
+                        stockrecord__partner_id__in=partner_ids,
+                    )
+                )
+            )
+            lines = lines.filter(partner_id__in=partner_ids)
+            products = products.filter(
+                Exists(
+                    StockRecord.objects.filter(
+                        product=OuterRef("pk"), partner_id__in=partner_ids
+                    )
+                )
+            )
+        customers = User.objects.filter(Exists(orders.filter(user=OuterRef("pk"))))
+
+        order_stats = orders.aggregate(
+            total_orders=Count("id"),
+            total_revenue=Sum("total_incl_tax"),
+            total_orders_last_day=Count("id", filter=last_day),
+            total_revenue_last_day=Sum("total_incl_tax", filter=last_day),
+            average_order_costs=Avg("total_incl_tax", filter=last_day),
+        )
         stats = {
-            "total_orders_last_day": orders_last_day.count(),
-            "total_lines_last_day": total_lines_last_day,
-            "average_order_costs": orders_last_day.aggregate(Avg("total_incl_tax"))[
-                "total_incl_tax__avg"
-            ]
-            or D("0.00"),
-            "total_revenue_last_day": orders_last_day.aggregate(Sum("total_incl_tax"))[
-                "total_incl_tax__sum"
-            ]
-            or D("0.00"),
-            "hourly_report_dict": self.get_hourly_report(orders),
-            "total_customers_last_day": customers.filter(
-                date_joined__gt=datetime_24hrs_ago,
-            ).count(),
-            "total_open_baskets_last_day": baskets.filter(
-                date_created__gt=datetime_24hrs_ago
-            ).count(),
+            **order_stats,
+            **lines.aggregate(
+                total_lines=Count("id"),
+                total_lines_last_day=Count(
+                    "id", filter=Q(order__date_placed__gt=datetime_24hrs_ago)
+                ),
+            ),
+            **customers.aggregate(
+                total_customers=Count("id"),
+                total_customers_last_day=Count(
+                    "id", filter=Q(date_joined__gt=datetime_24hrs_ago)
+                ),
+            ),
+            **baskets.aggregate(
+                total_open_baskets=Count("id"),
+                total_open_baskets_last_day=Count(
+                    "id", filter=Q(date_created__gt=datetime_24hrs_ago)
+                ),
+            ),
+            **alerts.aggregate(
+                total_open_stock_alerts=Count(
+                    "id", filter=Q(status=StockAlert.OPEN)
+                ),
+                total_closed_stock_alerts=Count(
+                    "id", filter=Q(status=StockAlert.CLOSED)
+                ),
+            ),
             "total_products": products.count(),
-            "total_open_stock_alerts": open_alerts.count(),
-            "total_closed_stock_alerts": closed_alerts.count(),
-            "total_customers": customers.count(),
-            "total_open_baskets": baskets.count(),
-            "total_orders": orders.count(),
-            "total_lines": lines.count(),
-            "total_revenue": orders.aggregate(Sum("total_incl_tax"))[
-                "total_incl_tax__sum"
-            ]
-            or D("0.00"),
-            "order_status_breakdown": orders.order_by("status")
-            .values("status")
-            .annotate(freq=Count("id")),
+            "hourly_report_dict": self.get_hourly_report(
+                rollups.filter_rollups(OrderHourlyRollup.objects.all(), partner_ids)
+            ),
+            "order_status_breakdown": list(
+                orders.order_by("status").values("status").annotate(freq=Count("id"))
+            ),
         }
-        if user.is_staff:
+        for key in ("total_revenue", "total_revenue_last_day", "average_order_costs"):
+            if stats[key] is None:
+                stats[key] = D("0.00")
+
+        if partner_ids is None:
             stats.update(
-                offer_maps=(
+                offer_maps=list(
                     ConditionalOffer.objects.filter(end_datetime__gt=now())
                     .values("offer_type")
                     .annotate(count=Count("id"))
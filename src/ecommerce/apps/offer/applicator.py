@@ -0,0 +1,122 @@
+"""
+Offer applicator that only evaluates the offers which can apply to a basket.
+
+Oscar's applicator runs the condition of every active offer against the
+basket, so the cost of applying offers grows with the number of offers. The
+standard conditions (count, value and coverage with a positive value) can
+only be satisfied by lines from the condition range, though. The range of
+every such offer is kept in an index, and offers whose range doesn't contain
+any product of the basket (according to the range index, see
+``range_index.py``) are skipped without evaluating them.
+
+Offers with a custom condition, or whose range isn't indexed, are always
+evaluated. Skipped offers can't be partially satisfied either, so the upsell
+messages are the same as if every offer had been evaluated. They are only
+recorded (in ``basket.upsell_messages``) when the request asks for them, as
+checking partial satisfaction costs another look at every candidate offer,
+and they are kept in the basket snapshots with the discounts (see
+``get_upsell_messages``).
+
+The index is stored in the cache under the offers version of the
+basket snapshots, so it is rebuilt whenever an offer, condition, benefit,
+range or voucher changes and whenever an offer starts or ends.
+"""
+from django.db import connection
+from oscar.apps.offer import applicator
+from oscar.core.loading import get_model
+
+from ecommerce.apps.basket.snapshot import basket_snapshots, records_upsell_messages
+from ecommerce.apps.offer import range_index
+
+
+def get_upsell_messages(basket, request):
+    """
+    Return the upsell messages of ``basket``.
+
+    They are recorded when the offers are applied to the basket for a request
+    that asks for them. A basket whose offers were applied without them (e.g.
+    not ``request.basket``) gets its offers applied again, or restored from
+    its snapshot.
+    """
+    if basket.is_empty:
+        return []
+    if basket.upsell_messages is None:
+        request.record_upsell_messages = True
+        if not basket.has_strategy:
+            basket.strategy = request.strategy
+        basket.reset_offer_applications()
+        basket_snapshots.apply(basket, request.user, request, Applicator())
+    return basket.upsell_messages
+
+
+class Applicator(applicator.Applicator):
+    def apply(self, basket, user=None, request=None):
+        offers = self.get_candidate_offers(
+            basket, self.get_offers(basket, user, request)
+        )
+        self.apply_offers(basket, offers)
+        if records_upsell_messages(request):
+            self.record_upsell_messages(basket, offers)
+        else:
+            basket.upsell_messages = None
+
+    def record_upsell_messages(self, basket, offers):
+        """
+        Store the upsell messages of the ``offers`` that didn't apply to
+        ``basket`` but whose condition is partially satisfied on it.
+        """
+        applied_offers = basket.offer_applications.offers
+        basket.upsell_messages = [
+            {"message": offer.get_upsell_message(basket), "offer": offer}
+            for offer in offers
+            if offer.pk not in applied_offers
+            and offer.is_condition_partially_satisfied(basket)
+        ]
+
+    def get_candidate_offers(self, basket, offers):
+        """
+        Return the offers of ``offers`` that could possibly apply to
+        ``basket``, in the same order.
+        """
+        offer_ranges = self.get_offer_ranges()
+        if not offer_ranges:
+            return offers
+
+        basket_range_ids = set()
+        for range_ids in range_index.get_basket_memberships(basket).values():
+            basket_range_ids.update(range_ids)
+        return [
+            offer
+            for offer in offers
+            if offer.pk not in offer_ranges
+            or offer_ranges[offer.pk] in basket_range_ids
+        ]
+
+    def get_offer_ranges(self):
+        """
+        Return a dict of offer id -> id of the indexed range the condition of
+        the offer needs at least one basket line from, for all active offers
+        that can be pruned.
+        """
+        key = ":".join(
+            [
+                "offer_ranges",
+                connection.schema_name,
+                basket_snapshots.get_offers_version(),
+            ]
+        )
+        offer_ranges = basket_snapshots.cache.get(key)
+        if offer_ranges is None:
+            offer_ranges = dict(self.get_prunable_offers())
+            basket_snapshots.cache.set(key, offer_ranges, basket_snapshots.timeout)
+        return offer_ranges
+
+    def get_prunable_offers(self):
+        ConditionalOffer = get_model("offer", "ConditionalOffer")
+        Condition = get_model("offer", "Condition")
+        return ConditionalOffer.active.filter(
+            condition__proxy_class__isnull=True,
+            condition__type__in=[Condition.COUNT, Condition.VALUE, Condition.COVERAGE],
+            condition__value__gt=0,
+            condition__range__in=range_index.get_indexed_ranges(),
+        ).values_list("pk", "condition__range_id")
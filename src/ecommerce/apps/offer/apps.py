@@ -14,6 +14,8 @@ class OfferConfig(OscarConfig):
     def ready(self):
         from oscar.apps.offer import receivers  # noqa
 
+        from ecommerce.apps.offer import receivers as range_index_receivers  # noqa
+
         self.detail_view = get_class("offer.views", "OfferDetailView", "ecommerce.apps")
         self.list_view = get_class("offer.views", "OfferListView", "ecommerce.apps")
 
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0004_attributeoption_code_attributeoptiongroup_code_and_more'),
+        ('offer', '0003_range_excluded_categories'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='range',
+            name='date_indexed',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Date Indexed'),
+        ),
+        migrations.CreateModel(
+            name='RangeMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='range_memberships', to='catalogue.product')),
+                ('range', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='offer.range')),
+            ],
+            options={
+                'verbose_name': 'Range membership',
+                'verbose_name_plural': 'Range memberships',
+                'unique_together': {('range', 'product')},
+            },
+        ),
+    ]
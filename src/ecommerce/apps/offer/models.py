@@ -33,7 +33,12 @@ from oscar.core.compat import AUTH_USER_MODEL
 from oscar.core.loading import get_class
 from oscar.models import fields
 
-from ecommerce.apps.offer.utils import range_anchor, unit_price
+from ecommerce.apps.offer import range_index
+from ecommerce.apps.offer.utils import (
+    memoise_applicable_lines,
+    range_anchor,
+    unit_price,
+)
 from ecommerce.templatetags.currency_filters import currency
 
 __all__ = [
@@ -311,6 +316,45 @@ class Benefit(AbstractBenefit):
     def description(self):
         return self.name
 
+    # pylint: disable=W0622
+    def get_applicable_lines(self, offer, basket, range=None):
+        """
+        Return the basket lines that are available to be discounted
+
+        :basket: The basket
+        :range: The range of products to use for filtering.  The fixed-price
+                benefit ignores its range and uses the condition range
+
+        The lines are computed once per offer while the basket lines stay the
+        same, override ``find_applicable_lines`` to change them.
+        """
+        if range is None:
+            range = self.range
+        if self.pk is None:
+            return self.find_applicable_lines(offer, basket, range)
+        key = ("benefit", offer.pk, type(self), self.pk, getattr(range, "pk", None))
+        return memoise_applicable_lines(
+            basket, key, lambda: self.find_applicable_lines(offer, basket, range)
+        )
+
+    # pylint: disable=W0622
+    def find_applicable_lines(self, offer, basket, range):
+        line_tuples = []
+        for line in basket.all_lines():
+            if not range_index.range_contains_line(
+                range, line
+            ) or not self.can_apply_benefit(line):
+                continue
+
+            price = unit_price(offer, line)
+            if not price:
+                # Avoid zero price products
+                continue
+            line_tuples.append((price, line))
+
+        # We sort lines to be cheapest first to ensure consistent applications
+        return sorted(line_tuples, key=operator.itemgetter(0))
+
 
 class Condition(AbstractCondition):
     name = "Condition"
@@ -420,12 +464,29 @@ class Condition(AbstractCondition):
         if not line.stockrecord_id:
             return False
         product = line.product
-        return self.range.contains_product(product) and product.is_discountable
+        return (
+            range_index.range_contains_line(self.range, line)
+            and product.is_discountable
+        )
 
     def get_applicable_lines(self, offer, basket, most_expensive_first=True):
         """
         Return line data for the lines that can be consumed by this condition
+
+        The lines are computed once per offer while the basket lines stay the
+        same, so custom conditions should override ``find_applicable_lines``
+        (or ``can_apply_condition``) rather than this method.
         """
+        if self.pk is None:
+            return self.find_applicable_lines(offer, basket, most_expensive_first)
+        key = ("condition", offer.pk, type(self), self.pk, most_expensive_first)
+        return memoise_applicable_lines(
+            basket,
+            key,
+            lambda: self.find_applicable_lines(offer, basket, most_expensive_first),
+        )
+
+    def find_applicable_lines(self, offer, basket, most_expensive_first=True):
         line_tuples = []
         for line in basket.all_lines():
             if not self.can_apply_condition(line):
@@ -490,10 +551,20 @@ class Range(AbstractRange):
     )
 
     date_created = models.DateTimeField(_("Date Created"), auto_now_add=True)
+    # When the products of this range were last written to RangeMembership,
+    # empty while the range isn't indexed (see range_index.py)
+    date_indexed = models.DateTimeField(
+        _("Date Indexed"), null=True, blank=True, editable=False
+    )
 
     objects = RangeManager()
     browsable = BrowsableRangeManager()
 
+    def contains_product(self, product):
+        if self.date_indexed is None or not range_index.is_indexable(self):
+            return super().contains_product(product)
+        return self.memberships.filter(product=product).exists()
+
 
 class RangeProduct(AbstractRangeProduct):
     range = models.ForeignKey("offer.Range", on_delete=models.CASCADE)
@@ -501,6 +572,25 @@ class RangeProduct(AbstractRangeProduct):
     display_order = models.IntegerField(default=0)
 
 
+class RangeMembership(models.Model):
+    """
+    A product that is in a range, maintained by ``range_index``.
+    """
+
+    range = models.ForeignKey(
+        "offer.Range", on_delete=models.CASCADE, related_name="memberships"
+    )
+    product = models.ForeignKey(
+        "catalogue.Product", on_delete=models.CASCADE, related_name="range_memberships"
+    )
+
+    class Meta:
+        app_label = "offer"
+        unique_together = ("range", "product")
+        verbose_name = _("Range membership")
+        verbose_name_plural = _("Range memberships")
+
+
 class RangeProductFileUpload(AbstractRangeProductFileUpload):
     range = models.ForeignKey(
         "offer.Range",
@@ -0,0 +1,241 @@
+"""
+Materialised range membership.
+
+Working out whether a product is in a ``Range`` means joining the included
+products, classes and (expanded) categories of the range, which is done for
+every basket line and every offer while offers are applied. Instead, the
+products of every range are stored in ``RangeMembership`` rows and the
+memberships of all products of a basket are loaded with a single query, so
+that checking a line against a range is a set lookup.
+
+The index is maintained incrementally when transactions commit (see
+``receivers.py``):
+
+* saving a range, or changing its classes or categories, rebuilds the range;
+* adding or removing products to/from a range, re-categorising a product or
+  saving a product updates the memberships of those products only.
+
+Changing any membership invalidates the basket snapshots of the tenant, as
+the offers of a range may no longer apply to the same lines.
+
+Ranges that include all products or use a custom proxy class are not indexed
+and neither are ranges whose index hasn't been built yet (``date_indexed``
+is empty). Those use ``Range.contains_product`` as before. Run
+``rebuild_range_index`` to build the index of existing ranges.
+"""
+import threading
+
+from django.db import connection, transaction
+from django.utils import timezone
+from oscar.core.loading import get_model
+
+from ecommerce.apps.basket.snapshot import basket_snapshots
+
+# Attribute the memberships of the basket's products are cached in
+BASKET_MEMBERSHIP_ATTR = "_range_memberships"
+
+BATCH_SIZE = 1000
+
+
+def is_indexable(product_range):
+    return not (product_range.proxy_class or product_range.includes_all_products)
+
+
+def get_indexed_ranges():
+    Range = get_model("offer", "Range")
+    return Range.objects.filter(
+        proxy_class__isnull=True, includes_all_products=False
+    ).exclude(date_indexed=None)
+
+
+def rebuild_range(product_range):
+    """
+    Bring the memberships of ``product_range`` up to date and return whether
+    any of them changed.
+    """
+    Range = get_model("offer", "Range")
+    RangeMembership = get_model("offer", "RangeMembership")
+
+    if not is_indexable(product_range):
+        with transaction.atomic():
+            deleted, __ = RangeMembership.objects.filter(range=product_range).delete()
+            Range.objects.filter(pk=product_range.pk).update(date_indexed=None)
+        return bool(deleted)
+
+    product_range.invalidate_cached_queryset()
+    with transaction.atomic():
+        wanted = set(product_range.product_queryset.values_list("id", flat=True))
+        existing = set(
+            RangeMembership.objects.filter(range=product_range).values_list(
+                "product_id", flat=True
+            )
+        )
+        changed = apply_changes(product_range.pk, wanted - existing, existing - wanted)
+        Range.objects.filter(pk=product_range.pk).update(date_indexed=timezone.now())
+    return changed
+
+
+def update_products(product_ids, ranges=None):
+    """
+    Bring the memberships of the given products (and their children) up to
+    date in ``ranges``, or in every indexed range, and return whether any of
+    them changed.
+    """
+    Product = get_model("catalogue", "Product")
+    RangeMembership = get_model("offer", "RangeMembership")
+
+    if ranges is None:
+        ranges = get_indexed_ranges()
+    ranges = list(ranges)
+    product_ids = set(product_ids)
+    if not ranges or not product_ids:
+        return False
+    product_ids.update(
+        Product.objects.filter(parent_id__in=product_ids).values_list("id", flat=True)
+    )
+
+    changed = False
+    with transaction.atomic():
+        for product_range in ranges:
+            product_range.invalidate_cached_queryset()
+            wanted = set(
+                product_range.product_queryset.filter(
+                    id__in=product_ids
+                ).values_list("id", flat=True)
+            )
+            existing = set(
+                RangeMembership.objects.filter(
+                    range=product_range, product_id__in=product_ids
+                ).values_list("product_id", flat=True)
+            )
+            if apply_changes(
+                product_range.pk, wanted - existing, existing - wanted
+            ):
+                changed = True
+    return changed
+
+
+def apply_changes(range_id, added, removed):
+    RangeMembership = get_model("offer", "RangeMembership")
+    RangeMembership.objects.bulk_create(
+        [
+            RangeMembership(range_id=range_id, product_id=product_id)
+            for product_id in added
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    removed = list(removed)
+    for start in range(0, len(removed), BATCH_SIZE):
+        RangeMembership.objects.filter(
+            range_id=range_id, product_id__in=removed[start : start + BATCH_SIZE]
+        ).delete()
+    return bool(added or removed)
+
+
+def get_basket_memberships(basket):
+    """
+    Return a dict of product id -> ids of the indexed ranges that contain it,
+    for all products of the basket.
+
+    The result is cached on the basket until its lines are reloaded.
+    """
+    lines = basket.all_lines()
+    cached = getattr(basket, BASKET_MEMBERSHIP_ATTR, None)
+    if cached is not None and cached[0] is lines:
+        return cached[1]
+
+    RangeMembership = get_model("offer", "RangeMembership")
+    memberships = {line.product_id: set() for line in lines}
+    for product_id, range_id in RangeMembership.objects.filter(
+        product_id__in=list(memberships)
+    ).values_list("product_id", "range_id"):
+        memberships[product_id].add(range_id)
+    setattr(basket, BASKET_MEMBERSHIP_ATTR, (lines, memberships))
+    return memberships
+
+
+def range_contains_line(product_range, line):
+    """
+    Test whether the product of a basket line is in ``product_range``.
+    """
+    Line = get_model("basket", "Line")
+    if (
+        product_range.date_indexed is None
+        or not is_indexable(product_range)
+        or not Line.basket.is_cached(line)
+    ):
+        return product_range.contains_product(line.product)
+
+    memberships = get_basket_memberships(line.basket)
+    if line.product_id not in memberships:
+        # The line isn't one of the basket's current lines
+        return product_range.contains_product(line.product)
+    return product_range.id in memberships[line.product_id]
+
+
+class PendingUpdates(threading.local):
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.schema_name = connection.schema_name
+        self.range_ids = set()
+        # range id (or None for all indexed ranges) -> product ids
+        self.product_ids = {}
+
+
+pending = PendingUpdates()
+
+
+def get_pending():
+    # Changes of a rolled back transaction of another tenant don't apply here
+    if pending.schema_name != connection.schema_name:
+        pending.reset()
+    return pending
+
+
+def schedule_range_rebuild(range_ids):
+    get_pending().range_ids.update(range_ids)
+    schedule()
+
+
+def schedule_product_update(product_ids, range_id=None):
+    get_pending().product_ids.setdefault(range_id, set()).update(product_ids)
+    schedule()
+
+
+def schedule():
+    # Every change registers the callback so that nothing is lost when a
+    # transaction is rolled back; the first callback to run does the work.
+    transaction.on_commit(flush)
+
+
+def flush():
+    Range = get_model("offer", "Range")
+    range_ids, product_ids = get_pending().range_ids, pending.product_ids
+    if not range_ids and not product_ids:
+        return
+    pending.reset()
+
+    changed = False
+    for product_range in Range.objects.filter(pk__in=range_ids):
+        if rebuild_range(product_range):
+            changed = True
+
+    indexed_ranges = {
+        product_range.pk: product_range
+        for product_range in get_indexed_ranges().exclude(pk__in=range_ids)
+    }
+    for range_id, ids in product_ids.items():
+        if range_id is None:
+            ranges = indexed_ranges.values()
+        elif range_id in indexed_ranges:
+            ranges = [indexed_ranges[range_id]]
+        else:
+            continue
+        if update_products(ids, ranges):
+            changed = True
+
+    if changed:
+        basket_snapshots.invalidate_offers()
@@ -0,0 +1,103 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.apps.offer import range_index
+
+Range = get_model("offer", "Range")
+RangeProduct = get_model("offer", "RangeProduct")
+Product = get_model("catalogue", "Product")
+ProductCategory = get_model("catalogue", "ProductCategory")
+Category = get_model("catalogue", "Category")
+
+
+@receiver(post_save, sender=Range)
+def rebuild_range_index_on_range_save(instance, **kwargs):
+    range_index.schedule_range_rebuild([instance.pk])
+
+
+@receiver(m2m_changed, sender=Range.classes.through)
+@receiver(m2m_changed, sender=Range.included_categories.through)
+def rebuild_range_index_on_range_change(instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        range_index.schedule_range_rebuild([instance.pk])
+    elif pk_set:
+        range_index.schedule_range_rebuild(pk_set)
+    else:
+        # Cleared from the other side, the ranges are unknown by now
+        range_index.schedule_range_rebuild(
+            range_index.get_indexed_ranges().values_list("pk", flat=True)
+        )
+
+
+@receiver(m2m_changed, sender=Range.included_products.through)
+@receiver(m2m_changed, sender=Range.excluded_products.through)
+def update_range_index_on_products_change(
+    instance, action, reverse, pk_set, **kwargs
+):
+    if not action.startswith("post_"):
+        return
+    if action == "post_clear":
+        if reverse:
+            range_index.schedule_product_update([instance.pk])
+        else:
+            range_index.schedule_range_rebuild([instance.pk])
+    elif not reverse:
+        range_index.schedule_product_update(pk_set, range_id=instance.pk)
+    else:
+        for range_id in pk_set:
+            range_index.schedule_product_update([instance.pk], range_id=range_id)
+
+
+@receiver(post_save, sender=RangeProduct)
+@receiver(post_delete, sender=RangeProduct)
+def update_range_index_on_range_product_change(instance, **kwargs):
+    range_index.schedule_product_update(
+        [instance.product_id], range_id=instance.range_id
+    )
+
+
+@receiver(post_save, sender=Product)
+def update_range_index_on_product_save(instance, created, **kwargs):
+    # New products only belong to ranges through their class (or parent),
+    # existing ones may have changed either.
+    range_index.schedule_product_update([instance.pk])
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def update_range_index_on_product_category_change(instance, **kwargs):
+    range_index.schedule_product_update([instance.product_id])
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def update_range_index_on_categories_change(
+    instance, action, reverse, pk_set, **kwargs
+):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        range_index.schedule_product_update([instance.pk])
+    elif pk_set:
+        range_index.schedule_product_update(pk_set)
+    else:
+        rebuild_category_ranges()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def rebuild_range_index_on_category_change(**kwargs):
+    # Moving a category changes the products of every range that includes
+    # one of its ancestors.
+    rebuild_category_ranges()
+
+
+def rebuild_category_ranges():
+    range_index.schedule_range_rebuild(
+        range_index.get_indexed_ranges()
+        .filter(included_categories__isnull=False)
+        .distinct()
+        .values_list("pk", flat=True)
+    )
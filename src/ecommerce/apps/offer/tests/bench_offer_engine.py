@@ -0,0 +1,173 @@
+"""
+Benchmarks of the offer engine.
+
+Every scenario builds a basket of N lines and M site offers, cycling through
+the conditions and benefits of ``ecommerce.apps.offer.models``, and records
+the time and queries of ``Applicator.apply``, with and without recording the
+upsell messages of the basket page, and of ``consume_items``.
+
+The module isn't collected by the normal test run. Run it explicitly, in a
+single process::
+
+    pytest ecommerce/apps/offer/tests/bench_offer_engine.py -n 0
+
+The scenarios are set with ``OFFER_BENCHMARK_LINES`` and
+``OFFER_BENCHMARK_OFFERS`` (comma separated sizes) and the results are
+written to ``OFFER_BENCHMARK_OUTPUT`` (``offer-benchmark.json`` by default).
+"""
+import itertools
+import os
+from decimal import Decimal as D
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory
+
+from ecommerce.apps.offer import models, range_index
+from ecommerce.apps.offer.applicator import Applicator
+from ecommerce.test import factories
+from ecommerce.test.benchmark import BenchmarkRecorder
+from ecommerce.test.testcases import TestCase
+
+# Ranges the offers are spread over, each one holds every NUM_RANGES-th
+# product so that only some offers apply to small baskets.
+NUM_RANGES = 10
+
+CONDITIONS = [
+    (models.CountConditionModify, models.Condition.COUNT, D("2")),
+    (models.ValueConditionModify, models.Condition.VALUE, D("20.00")),
+    (models.CoverageConditionModify, models.Condition.COVERAGE, D("2")),
+]
+BENEFITS = [
+    (models.PercentageDiscountBenefitModify, models.Benefit.PERCENTAGE, D("10")),
+    (models.AbsoluteDiscountBenefitModify, models.Benefit.FIXED, D("5.00")),
+    (models.FixedUnitDiscountBenefitModify, models.Benefit.FIXED, D("1.00")),
+    (models.FixedPriceBenefitModify, models.Benefit.FIXED_PRICE, D("15.00")),
+    (models.MultibuyDiscountBenefitModify, models.Benefit.MULTIBUY, None),
+    (
+        models.ShippingPercentageDiscountBenefitModify,
+        models.Benefit.SHIPPING_PERCENTAGE,
+        D("50"),
+    ),
+]
+
+
+def get_sizes(name, default):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return [int(size) for size in value.split(",")]
+
+
+def get_class_path(klass):
+    return f"{klass.__module__}.{klass.__name__}"
+
+
+class OfferEngineBenchmark(TestCase):
+    lines = get_sizes("OFFER_BENCHMARK_LINES", [1, 10, 50])
+    offers = get_sizes("OFFER_BENCHMARK_OFFERS", [1, 10, 100])
+    output = os.environ.get("OFFER_BENCHMARK_OUTPUT", "offer-benchmark.json")
+
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.addCleanup(range_index.pending.reset)
+        self.recorder = BenchmarkRecorder("offer-engine")
+        self.request = RequestFactory().get("/basket/")
+        self.request.user = AnonymousUser()
+        self.request.record_upsell_messages = True
+
+    def test_offer_engine(self):
+        for num_lines, num_offers in itertools.product(self.lines, self.offers):
+            with self.subTest(lines=num_lines, offers=num_offers):
+                sid = transaction.savepoint()
+                try:
+                    self.run_scenario(num_lines, num_offers)
+                finally:
+                    transaction.savepoint_rollback(sid)
+                    cache.clear()
+        self.recorder.write(self.output)
+
+    def run_scenario(self, num_lines, num_offers):
+        basket = self.create_basket(num_lines)
+        offers = self.create_offers(basket, num_offers)
+        params = {"lines": num_lines, "offers": num_offers}
+        applicator = Applicator()
+
+        self.recorder.measure(
+            "Applicator.apply",
+            lambda: applicator.apply(basket),
+            setup=basket.reset_offer_applications,
+            **params,
+        )
+
+        # What the basket page pays, which records the upsell messages too
+        self.recorder.measure(
+            "Applicator.apply with upsell messages",
+            lambda: applicator.apply(basket, request=self.request),
+            setup=basket.reset_offer_applications,
+            **params,
+        )
+
+        def consume_items():
+            for offer in offers:
+                offer.condition.proxy().consume_items(offer, basket, ())
+
+        self.recorder.measure(
+            "Condition.consume_items",
+            consume_items,
+            setup=basket.reset_offer_applications,
+            **params,
+        )
+
+    def create_basket(self, num_lines):
+        basket = factories.create_basket(empty=True)
+        for index in range(num_lines):
+            product = factories.create_product(
+                title=f"Product {index}",
+                price=D("5.00") + index,
+                num_in_stock=100,
+            )
+            basket.add_product(product, quantity=1 + index % 3)
+        return basket
+
+    def create_offers(self, basket, num_offers):
+        products = [line.product for line in basket.all_lines()]
+        ranges = []
+        for index in range(NUM_RANGES):
+            product_range = models.Range.objects.create(name=f"Range {index}")
+            for product in products[index::NUM_RANGES]:
+                product_range.add_product(product)
+            range_index.rebuild_range(product_range)
+            ranges.append(product_range)
+
+        offers = []
+        for index in range(num_offers):
+            product_range = ranges[index % NUM_RANGES]
+            condition_class, condition_type, condition_value = CONDITIONS[
+                index % len(CONDITIONS)
+            ]
+            benefit_class, benefit_type, benefit_value = BENEFITS[
+                index % len(BENEFITS)
+            ]
+            condition = models.Condition.objects.create(
+                range=product_range,
+                type=condition_type,
+                value=condition_value,
+                proxy_class=get_class_path(condition_class),
+            )
+            benefit = models.Benefit.objects.create(
+                range=product_range,
+                type=benefit_type,
+                value=benefit_value,
+                proxy_class=get_class_path(benefit_class),
+            )
+            offers.append(
+                factories.create_offer(
+                    name=f"Offer {index}",
+                    condition=condition,
+                    benefit=benefit,
+                    priority=index % 5,
+                )
+            )
+        return offers
@@ -0,0 +1,180 @@
+from decimal import Decimal as D
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory
+from oscar.core.loading import get_model
+
+from ecommerce.apps.basket.models import Basket
+from ecommerce.apps.basket.snapshot import basket_snapshots
+from ecommerce.apps.basket.views import BasketView
+from ecommerce.apps.offer import range_index
+from ecommerce.apps.offer.applicator import Applicator, get_upsell_messages
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+Condition = get_model("offer", "Condition")
+ConditionalOffer = get_model("offer", "ConditionalOffer")
+Range = get_model("offer", "Range")
+
+
+class TestApplicator(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        range_index.pending.reset()
+        self.product = factories.create_product(price=D("10.00"))
+        self.other = factories.create_product(price=D("10.00"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range = factories.RangeFactory(products=[self.product])
+            self.other_range = factories.RangeFactory(products=[self.other])
+        self.offer = self.create_offer(self.range, "Matching")
+        self.other_offer = self.create_offer(self.other_range, "Other")
+        self.basket = factories.create_basket(empty=True)
+        self.basket.add_product(self.product)
+        self.applicator = Applicator()
+
+    def create_offer(self, product_range, name, value=1):
+        condition = Condition.objects.create(
+            range=product_range, type=Condition.COUNT, value=value
+        )
+        return factories.create_offer(name=name, range=product_range, condition=condition)
+
+    def get_candidate_offers(self):
+        offers = self.applicator.get_offers(self.basket)
+        return self.applicator.get_candidate_offers(self.basket, offers)
+
+    def test_skips_offers_of_ranges_outside_basket(self):
+        self.assertEqual(self.get_candidate_offers(), [self.offer])
+
+    def test_applies_candidate_offers(self):
+        self.applicator.apply(self.basket)
+
+        self.assertEqual(list(self.basket.applied_offers()), [self.offer.pk])
+        self.assertEqual(self.basket.total_discount, D("2.00"))
+
+    def test_keeps_offers_of_unindexed_ranges(self):
+        Range.objects.filter(pk=self.other_range.pk).update(date_indexed=None)
+        self.other_range.save()
+
+        self.assertCountEqual(
+            self.get_candidate_offers(), [self.offer, self.other_offer]
+        )
+
+    def test_keeps_offers_with_custom_conditions(self):
+        Condition.objects.filter(pk=self.other_offer.condition_id).update(
+            proxy_class="ecommerce.apps.offer.models.CountConditionModify"
+        )
+        self.other_offer.save()
+
+        self.assertCountEqual(
+            self.get_candidate_offers(), [self.offer, self.other_offer]
+        )
+
+    def test_new_offers_invalidate_index(self):
+        self.get_candidate_offers()
+        with self.captureOnCommitCallbacks(execute=True):
+            third_range = factories.RangeFactory(products=[self.product])
+        third_offer = self.create_offer(third_range, "Third")
+        self.basket = Basket.objects.get(pk=self.basket.pk)
+
+        self.assertCountEqual(self.get_candidate_offers(), [self.offer, third_offer])
+
+    def create_upsell_offer(self):
+        product = factories.create_product(price=D("10.00"))
+        with self.captureOnCommitCallbacks(execute=True):
+            product_range = factories.RangeFactory(products=[product])
+        self.basket.add_product(product)
+        return self.create_offer(product_range, "Upsell", value=3)
+
+    def get_request(self):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        request.strategy = self.basket.strategy
+        request.record_upsell_messages = True
+        return request
+
+    def load_basket(self):
+        basket = Basket.objects.get(pk=self.basket.pk)
+        basket.strategy = self.basket.strategy
+        return basket
+
+    def test_records_upsell_messages_when_asked(self):
+        upsell_offer = self.create_upsell_offer()
+        self.applicator.apply(self.basket, request=self.get_request())
+
+        messages = self.basket.upsell_messages
+        self.assertEqual([data["offer"] for data in messages], [upsell_offer])
+        self.assertIn("2 more", str(messages[0]["message"]))
+
+    def test_applying_offers_doesnt_evaluate_upsell_messages(self):
+        self.create_upsell_offer()
+        with mock.patch.object(
+            ConditionalOffer, "is_condition_partially_satisfied"
+        ) as partially_satisfied:
+            self.applicator.apply(self.basket)
+
+        partially_satisfied.assert_not_called()
+        self.assertIsNone(self.basket.upsell_messages)
+
+    def test_basket_view_reads_recorded_upsell_messages(self):
+        self.create_upsell_offer()
+        request = self.get_request()
+        self.applicator.apply(self.basket, request=request)
+        view = BasketView()
+        view.request = request
+
+        with mock.patch.object(
+            ConditionalOffer, "is_condition_partially_satisfied"
+        ) as partially_satisfied:
+            messages = view.get_upsell_messages(self.basket)
+
+        partially_satisfied.assert_not_called()
+        self.assertEqual(len(messages), 1)
+
+    def test_snapshots_keep_upsell_messages(self):
+        upsell_offer = self.create_upsell_offer()
+        request = self.get_request()
+        basket_snapshots.apply(self.load_basket(), None, request, self.applicator)
+
+        basket = self.load_basket()
+        with mock.patch.object(
+            ConditionalOffer, "is_condition_partially_satisfied"
+        ) as partially_satisfied:
+            self.assertTrue(
+                basket_snapshots.apply(basket, None, request, self.applicator)
+            )
+
+        partially_satisfied.assert_not_called()
+        self.assertEqual(
+            [data["offer"] for data in basket.upsell_messages], [upsell_offer]
+        )
+        self.assertIn("2 more", basket.upsell_messages[0]["message"])
+
+    def test_snapshots_without_upsell_messages_are_applied_again(self):
+        upsell_offer = self.create_upsell_offer()
+        basket_snapshots.apply(self.load_basket(), None, None, self.applicator)
+
+        basket = self.load_basket()
+        self.assertFalse(
+            basket_snapshots.apply(basket, None, self.get_request(), self.applicator)
+        )
+        self.assertEqual(
+            [data["offer"] for data in basket.upsell_messages], [upsell_offer]
+        )
+
+    def test_upsell_messages_of_basket_applied_without_them(self):
+        upsell_offer = self.create_upsell_offer()
+        self.applicator.apply(self.basket)
+
+        messages = get_upsell_messages(self.basket, self.get_request())
+
+        self.assertEqual([data["offer"] for data in messages], [upsell_offer])
+        self.assertEqual(list(self.basket.applied_offers()), [self.offer.pk])
+
+    def test_resetting_offers_drops_upsell_messages(self):
+        self.applicator.apply(self.basket)
+        self.basket.upsell_messages = []
+        self.basket.reset_offer_applications()
+
+        self.assertIsNone(self.basket.upsell_messages)
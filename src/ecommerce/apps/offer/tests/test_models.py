@@ -920,3 +920,64 @@ class TestAnOfferChangesStatusWhen(TestCase):
         self.offer.num_applications += 10
         self.offer.save()
         self.assertFalse(self.offer.is_open)
+
+
+class TestApplicableLinesAreMemoised(TestCase):
+    def setUp(self):
+        range = models.Range.objects.create(
+            name="All products", includes_all_products=True
+        )
+        self.condition = models.CountConditionModify.objects.create(
+            range=range, type=models.Condition.COUNT, value=2
+        )
+        self.benefit = models.PercentageDiscountBenefitModify.objects.create(
+            range=range, type=models.Benefit.PERCENTAGE, value=20
+        )
+        self.offer = factories.create_offer(
+            condition=self.condition, benefit=self.benefit
+        )
+        self.basket = factories.create_basket(empty=True)
+        add_products(self.basket, [(D("12.00"), 2), (D("20.00"), 1)])
+
+    def test_condition_lines_are_computed_once(self):
+        with mock.patch.object(
+            models.CountConditionModify,
+            "can_apply_condition",
+            autospec=True,
+            return_value=True,
+        ) as can_apply_condition:
+            first = self.condition.get_applicable_lines(self.offer, self.basket)
+            second = self.condition.get_applicable_lines(self.offer, self.basket)
+
+        self.assertEqual(can_apply_condition.call_count, 2)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual([price for price, __ in first], [D("20.00"), D("12.00")])
+
+    def test_sort_order_is_part_of_the_key(self):
+        cheapest_first = self.condition.get_applicable_lines(
+            self.offer, self.basket, most_expensive_first=False
+        )
+        most_expensive_first = self.condition.get_applicable_lines(
+            self.offer, self.basket
+        )
+        self.assertEqual(cheapest_first, most_expensive_first[::-1])
+
+    def test_reloading_lines_invalidates_lines(self):
+        self.condition.get_applicable_lines(self.offer, self.basket)
+        add_product(self.basket, D("5.00"))
+
+        lines = self.condition.get_applicable_lines(self.offer, self.basket)
+        self.assertEqual(len(lines), 3)
+
+    def test_benefit_lines_are_computed_once(self):
+        with mock.patch.object(
+            models.PercentageDiscountBenefitModify,
+            "can_apply_benefit",
+            autospec=True,
+            return_value=True,
+        ) as can_apply_benefit:
+            self.benefit.get_applicable_lines(self.offer, self.basket)
+            self.benefit.get_applicable_lines(self.offer, self.basket)
+
+        self.assertEqual(can_apply_benefit.call_count, 2)
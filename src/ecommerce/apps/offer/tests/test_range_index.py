@@ -0,0 +1,120 @@
+from decimal import Decimal as D
+from unittest import mock
+
+from django.core.management import call_command
+from oscar.core.loading import get_model
+
+from ecommerce.apps.offer import range_index
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+Range = get_model("offer", "Range")
+RangeMembership = get_model("offer", "RangeMembership")
+
+
+class TestRangeIndex(TestCase):
+    def setUp(self):
+        range_index.pending.reset()
+        self.category = factories.CategoryFactory(name="Shoes")
+        self.in_category = factories.create_product(title="In category")
+        factories.ProductCategoryFactory(
+            product=self.in_category, category=self.category
+        )
+        self.included = factories.create_product(title="Included")
+        self.other = factories.create_product(title="Other")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range = factories.RangeFactory()
+            self.range.included_categories.add(self.category)
+            self.range.add_product(self.included)
+        self.range.refresh_from_db()
+
+    def get_member_ids(self):
+        return set(
+            RangeMembership.objects.filter(range=self.range).values_list(
+                "product_id", flat=True
+            )
+        )
+
+    def test_range_is_indexed_on_save(self):
+        self.assertIsNotNone(self.range.date_indexed)
+        self.assertEqual(
+            self.get_member_ids(), {self.in_category.pk, self.included.pk}
+        )
+
+    def test_index_matches_range_queryset(self):
+        self.range.invalidate_cached_queryset()
+        self.assertEqual(
+            self.get_member_ids(),
+            set(self.range.product_queryset.values_list("id", flat=True)),
+        )
+
+    def test_removing_a_product_updates_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range.remove_product(self.included)
+
+        self.assertEqual(self.get_member_ids(), {self.in_category.pk})
+
+    def test_categorising_a_product_updates_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            factories.ProductCategoryFactory(
+                product=self.other, category=self.category
+            )
+
+        self.assertIn(self.other.pk, self.get_member_ids())
+
+    def test_excluding_a_product_updates_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range.excluded_products.add(self.in_category)
+
+        self.assertEqual(self.get_member_ids(), {self.included.pk})
+
+    def test_product_leaving_a_range_invalidates_basket_snapshots(self):
+        with mock.patch.object(
+            range_index.basket_snapshots, "invalidate_offers"
+        ) as invalidate_offers:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.in_category.categories.clear()
+
+        self.assertEqual(self.get_member_ids(), {self.included.pk})
+        invalidate_offers.assert_called_once_with()
+
+    def test_unchanged_memberships_keep_basket_snapshots(self):
+        with mock.patch.object(
+            range_index.basket_snapshots, "invalidate_offers"
+        ) as invalidate_offers:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.other.save()
+
+        invalidate_offers.assert_not_called()
+
+    def test_contains_product_uses_index(self):
+        self.assertTrue(self.range.contains_product(self.included))
+        self.assertFalse(self.range.contains_product(self.other))
+
+    def test_unindexed_ranges_fall_back_to_queryset(self):
+        Range.objects.filter(pk=self.range.pk).update(date_indexed=None)
+        RangeMembership.objects.all().delete()
+        self.range.refresh_from_db()
+
+        self.assertTrue(self.range.contains_product(self.included))
+
+    def test_basket_lines_are_checked_with_one_query(self):
+        basket = factories.create_basket(empty=True)
+        for product in (self.in_category, self.included, self.other):
+            factories.create_stockrecord(product, price=D("10.00"), num_in_stock=5)
+            basket.add_product(product)
+        condition = factories.ConditionFactory(range=self.range)
+        lines = list(basket.all_lines())
+
+        with self.assertNumQueries(1):
+            contained = [condition.can_apply_condition(line) for line in lines]
+            contained += [condition.can_apply_condition(line) for line in lines]
+        self.assertEqual(contained, [True, True, False] * 2)
+
+    def test_rebuild_command(self):
+        RangeMembership.objects.all().delete()
+        call_command("rebuild_range_index", verbosity=0)
+
+        self.assertEqual(
+            self.get_member_ids(), {self.in_category.pk, self.included.pk}
+        )
@@ -21,6 +21,30 @@ def unit_price(offer, line):
     return line.unit_effective_price
 
 
+# Attribute the applicable lines of the offers are memoised in
+APPLICABLE_LINES_ATTR = "_applicable_lines"
+
+
+def memoise_applicable_lines(basket, key, compute):
+    """
+    Return a copy of ``compute()``, a list of ``(price, line)`` tuples of the
+    basket, memoised on ``basket`` under ``key``.
+
+    The tuples only depend on the lines and their prices, not on quantities
+    or on what offers have consumed, so they are kept until the lines of the
+    basket are reloaded (e.g. by ``reset_offer_applications`` after lines
+    are added, changed or removed).
+    """
+    lines = basket.all_lines()
+    cached = getattr(basket, APPLICABLE_LINES_ATTR, None)
+    if cached is None or cached[0] is not lines:
+        cached = (lines, {})
+        setattr(basket, APPLICABLE_LINES_ATTR, cached)
+    if key not in cached[1]:
+        cached[1][key] = compute()
+    return list(cached[1][key])
+
+
 def load_proxy(proxy_class):
     module, classname = proxy_class.rsplit(".", 1)
     try:
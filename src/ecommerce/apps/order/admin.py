@@ -10,6 +10,7 @@ from .models import (
     Order,
     OrderDiscount,
     OrderNote,
+    OrderProcessingStep,
     OrderStatusChange,
     PaymentEvent,
     PaymentEventType,
@@ -99,6 +100,12 @@ class SurchargeAdmin(admin.ModelAdmin):
     raw_id_fields = ("order",)
 
 
+class OrderProcessingStepAdmin(admin.ModelAdmin):
+    raw_id_fields = ("order",)
+    list_display = ("order", "name", "status", "attempts", "date_updated")
+    list_filter = ("name", "status")
+
+
 admin.site.register(Order, OrderAdmin)
 admin.site.register(OrderNote)
 admin.site.register(OrderStatusChange)
@@ -114,3 +121,4 @@ admin.site.register(OrderDiscount, OrderDiscountAdmin)
 admin.site.register(CommunicationEvent)
 admin.site.register(BillingAddress)
 admin.site.register(Surcharge, SurchargeAdmin)
+admin.site.register(OrderProcessingStep, OrderProcessingStepAdmin)
@@ -6,3 +6,6 @@ class OrderConfig(OscarConfig):
     label = "order"
     name = "ecommerce.apps.order"
     verbose_name = _("Order")
+
+    def ready(self):
+        from ecommerce.apps.order import receivers  # noqa
@@ -0,0 +1,115 @@
+"""
+CSV exports of orders.
+
+Exports are written row by row from chunked queries, so the memory they
+take doesn't grow with the number of orders: ``iter_csv`` yields the lines
+of a ``StreamingHttpResponse`` and ``save_csv`` writes exports that are too
+big for a request to the private storage of the tenant from a background
+task.
+"""
+import csv
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Prefetch, QuerySet
+from django.utils.translation import gettext_lazy as _
+from oscar.core.loading import get_model
+from oscar.core.utils import format_datetime
+
+from ecommerce.core.storages.private import private_storage
+
+CSV_COLUMNS = {
+    "number": _("Order number"),
+    "value": _("Order value"),
+    "date": _("Date of purchase"),
+    "num_items": _("Number of items"),
+    "status": _("Order status"),
+    "customer": _("Customer email address"),
+    "shipping_address_name": _("Deliver to name"),
+    "billing_address_name": _("Bill to name"),
+}
+
+CHUNK_SIZE = 1000
+
+
+class Echo:
+    """
+    File-like object handing back what is written to it, for ``csv.writer``
+    to return the lines it formats.
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_export_queryset(orders):
+    """
+    Return ``orders`` with what the rows need fetched along.
+    """
+    Line = get_model("order", "Line")
+
+    return (
+        orders.select_related("user", "shipping_address", "billing_address")
+        .prefetch_related(None)
+        .prefetch_related(
+            Prefetch("lines", queryset=Line.objects.only("order_id", "quantity"))
+        )
+    )
+
+
+def get_row_values(order):
+    row = {
+        "number": order.number,
+        "customer": order.email,
+        "num_items": order.num_items,
+        "date": format_datetime(order.date_placed, "DATETIME_FORMAT"),
+        "value": order.total_incl_tax,
+        "status": order.status,
+    }
+    if order.shipping_address:
+        row["shipping_address_name"] = order.shipping_address.name
+    if order.billing_address:
+        row["billing_address_name"] = order.billing_address.name
+    return row
+
+
+def iter_orders(orders):
+    """
+    Iterate over the ``orders`` queryset in chunks, without caching them on
+    the queryset. Other iterables of orders are iterated as they are.
+    """
+    if not isinstance(orders, QuerySet):
+        return iter(orders)
+    return get_export_queryset(orders).iterator(chunk_size=CHUNK_SIZE)
+
+
+def iter_rows(orders, get_row_values=get_row_values, columns=CSV_COLUMNS):
+    yield list(columns.values())
+    for order in iter_orders(orders):
+        row_values = get_row_values(order)
+        yield [row_values.get(column, "") for column in columns]
+
+
+def iter_csv(rows):
+    """
+    Yield the CSV lines of ``rows``.
+    """
+    # Excel needs a byte order mark to read UTF-8, see UnicodeCSVWriter
+    if getattr(settings, "OSCAR_CSV_INCLUDE_BOM", False):
+        yield "\ufeff"
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def save_csv(name, rows):
+    """
+    Write the CSV of ``rows`` to the private storage and return the name it
+    was saved under.
+    """
+    with tempfile.TemporaryFile("w+b") as temp:
+        for line in iter_csv(rows):
+            temp.write(line.encode("utf-8"))
+        temp.seek(0)
+        return private_storage.save(name, File(temp, name=name))
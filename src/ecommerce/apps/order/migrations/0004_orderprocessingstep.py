@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0003_line_allocation_cancelled_line_num_allocated_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderProcessingStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, verbose_name='Name')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Complete', 'Complete'), ('Failed', 'Failed')], default='Pending', max_length=32, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('error', models.TextField(blank=True, verbose_name='Last error')),
+                ('date_created', models.DateTimeField(auto_now_add=True, verbose_name='Date created')),
+                ('date_updated', models.DateTimeField(auto_now=True, verbose_name='Date updated')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='processing_steps', to='order.order', verbose_name='Order')),
+            ],
+            options={
+                'verbose_name': 'Order processing step',
+                'verbose_name_plural': 'Order processing steps',
+                'ordering': ['pk'],
+                'unique_together': {('order', 'name')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner', '0002_initial'),
+        ('order', '0005_order_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(blank=True, max_length=100, verbose_name='Status')),
+                ('order_count', models.PositiveIntegerField(default=0, verbose_name='Orders')),
+                ('line_count', models.PositiveIntegerField(default=0, verbose_name='Lines')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Revenue (inc. tax)')),
+                ('discount', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Discount (inc. tax)')),
+                ('day', models.DateField(db_index=True, verbose_name='Day')),
+                ('partner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='partner.partner', verbose_name='Partner')),
+            ],
+            options={
+                'verbose_name': 'Daily order rollup',
+                'verbose_name_plural': 'Daily order rollups',
+                'ordering': ['day', 'pk'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(blank=True, max_length=100, verbose_name='Status')),
+                ('order_count', models.PositiveIntegerField(default=0, verbose_name='Orders')),
+                ('line_count', models.PositiveIntegerField(default=0, verbose_name='Lines')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Revenue (inc. tax)')),
+                ('discount', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Discount (inc. tax)')),
+                ('hour', models.DateTimeField(db_index=True, verbose_name='Hour')),
+                ('partner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='partner.partner', verbose_name='Partner')),
+            ],
+            options={
+                'verbose_name': 'Hourly order rollup',
+                'verbose_name_plural': 'Hourly order rollups',
+                'ordering': ['hour', 'pk'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+from ecommerce.apps.order import search
+
+
+def build_search_documents(apps, schema_editor):
+    Order = apps.get_model("order", "Order")
+    orders = Order.objects.filter(search_document__isnull=True).order_by("pk")
+    last_id = 0
+    while True:
+        order_ids = list(
+            orders.filter(pk__gt=last_id).values_list("pk", flat=True)[
+                : search.BATCH_SIZE
+            ]
+        )
+        if not order_ids:
+            break
+        search.update_documents(order_ids, apps=apps)
+        last_id = order_ids[-1]
+
+
+class Migration(migrations.Migration):
+    # Every batch is committed on its own rather than locking all orders
+    atomic = False
+
+    dependencies = [
+        ('order', '0006_orderdailyrollup_orderhourlyrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -118,6 +120,14 @@ class Order(AbstractOrder):
     #: status
     cascade = getattr(settings, "OSCAR_ORDER_STATUS_CASCADE", {})
 
+    # Searched by the dashboard, see ecommerce.apps.order.search
+    search_document = SearchVectorField(null=True, editable=False)
+
+    class Meta(AbstractOrder.Meta):
+        indexes = [
+            GinIndex(fields=["search_document"], name="order_search_document_idx")
+        ]
+
 
 class OrderNote(AbstractOrderNote):  # noqa: F405
     order = models.ForeignKey(
@@ -389,3 +399,91 @@ class Surcharge(AbstractSurcharge):
     excl_tax = models.DecimalField(
         _("Surcharge (excl. tax)"), decimal_places=2, max_digits=12, default=0
     )
+
+
+class OrderProcessingStep(models.Model):
+    """
+    A step of the work done in the background once an order is placed, see
+    ``ecommerce.core.celery.tasks.order``. Every step runs once per order.
+    """
+
+    order = models.ForeignKey(
+        "order.Order",
+        on_delete=models.CASCADE,
+        related_name="processing_steps",
+        verbose_name=_("Order"),
+    )
+    name = models.CharField(_("Name"), max_length=64)
+
+    PENDING, COMPLETE, FAILED = "Pending", "Complete", "Failed"
+    STATUS_CHOICES = (
+        (PENDING, _(PENDING)),
+        (COMPLETE, _(COMPLETE)),
+        (FAILED, _(FAILED)),
+    )
+    status = models.CharField(
+        _("Status"), max_length=32, default=PENDING, choices=STATUS_CHOICES
+    )
+    attempts = models.PositiveIntegerField(_("Attempts"), default=0)
+    error = models.TextField(_("Last error"), blank=True)
+    date_created = models.DateTimeField(_("Date created"), auto_now_add=True)
+    date_updated = models.DateTimeField(_("Date updated"), auto_now=True)
+
+    class Meta:
+        ordering = ["pk"]
+        unique_together = ("order", "name")
+        verbose_name = _("Order processing step")
+        verbose_name_plural = _("Order processing steps")
+
+    def __str__(self):
+        return f"{self.order.number}: {self.name} ({self.status})"
+
+
+class AbstractOrderRollup(models.Model):
+    """
+    Totals of the orders placed in a period, by status and partner, see
+    ``ecommerce.apps.order.rollups``.
+
+    The rows without a partner hold the totals of the whole shop. The rows
+    of a partner only count the lines of that partner, so they don't add up
+    to the shop's.
+    """
+
+    partner = models.ForeignKey(
+        "partner.Partner",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name=_("Partner"),
+    )
+    status = models.CharField(_("Status"), max_length=100, blank=True)
+    order_count = models.PositiveIntegerField(_("Orders"), default=0)
+    line_count = models.PositiveIntegerField(_("Lines"), default=0)
+    revenue = models.DecimalField(
+        _("Revenue (inc. tax)"), decimal_places=2, max_digits=16, default=0
+    )
+    discount = models.DecimalField(
+        _("Discount (inc. tax)"), decimal_places=2, max_digits=16, default=0
+    )
+
+    class Meta:
+        abstract = True
+
+
+class OrderHourlyRollup(AbstractOrderRollup):
+    hour = models.DateTimeField(_("Hour"), db_index=True)
+
+    class Meta:
+        ordering = ["hour", "pk"]
+        verbose_name = _("Hourly order rollup")
+        verbose_name_plural = _("Hourly order rollups")
+
+
+class OrderDailyRollup(AbstractOrderRollup):
+    day = models.DateField(_("Day"), db_index=True)
+
+    class Meta:
+        ordering = ["day", "pk"]
+        verbose_name = _("Daily order rollup")
+        verbose_name_plural = _("Daily order rollups")
@@ -1,8 +1,17 @@
 from decimal import Decimal as D
 
+from django.db import transaction
+from django.db.models import Sum, prefetch_related_objects
 from django.utils.translation import gettext_lazy as _
 
 from oscar.apps.order import exceptions
+from oscar.apps.order.models import ShippingEventQuantity
+from oscar.apps.order.signals import (
+    order_line_status_changed, order_status_changed)
+
+from ecommerce.apps.order.models import (
+    Line, Order, OrderNote, OrderStatusChange, ShippingEvent)
+from ecommerce.apps.partner import allocation
 
 
 class EventHandler(object):
@@ -65,6 +74,137 @@ class EventHandler(object):
         if note_msg:
             self.create_note(order, note_msg)
 
+    # Bulk API
+    # --------
+    # These handle the same events for many orders at once, with a query per
+    # table rather than per order.
+
+    def handle_bulk_order_status_change(self, orders, new_status,
+                                        note_msg=None):
+        """
+        Change the status of many orders, like handle_order_status_change.
+
+        The transitions are checked against the current status of the orders
+        in ``Order.pipeline`` and the line statuses are cascaded like
+        ``Order.set_status`` does. ``note_msg`` is formatted with the
+        ``old_status`` and ``new_status`` of every order.
+
+        Returns the list of (order, old status) pairs of the orders that were
+        changed and the list of orders that can't move to ``new_status``.
+        Orders that already have ``new_status`` are in neither.
+        """
+        orders = list(orders)
+        changed, invalid = [], []
+        with transaction.atomic():
+            # Lock the orders so that their status can't change in between
+            statuses = dict(
+                Order._default_manager.select_for_update()
+                .filter(pk__in=[order.pk for order in orders])
+                .order_by('pk').values_list('pk', 'status'))
+            for order in orders:
+                if order.pk not in statuses:
+                    continue
+                # Every order is only handled once
+                order.status = statuses.pop(order.pk)
+                if order.status == new_status:
+                    continue
+                if new_status in order.available_statuses():
+                    changed.append((order, order.status))
+                else:
+                    invalid.append(order)
+            if not changed:
+                return changed, invalid
+
+            order_ids = [order.pk for order, __ in changed]
+            Order._default_manager.filter(pk__in=order_ids).update(
+                status=new_status)
+            if new_status in Order.cascade:
+                self.bulk_set_line_status(order_ids, Order.cascade[new_status])
+            OrderStatusChange._default_manager.bulk_create([
+                OrderStatusChange(
+                    order=order, old_status=old_status, new_status=new_status)
+                for order, old_status in changed])
+            if note_msg:
+                self.bulk_create_notes([
+                    (order, note_msg % {'old_status': old_status,
+                                        'new_status': new_status})
+                    for order, old_status in changed])
+
+            for order, old_status in changed:
+                order.status = new_status
+                order_status_changed.send(
+                    sender=order, order=order, old_status=old_status,
+                    new_status=new_status)
+        return changed, invalid
+
+    def bulk_set_line_status(self, order_ids, new_status):
+        """
+        Move the lines of the orders that can move to ``new_status`` to it.
+        """
+        old_statuses = [
+            status for status, next_statuses in Line.pipeline.items()
+            if new_status in next_statuses]
+        lines = Line._default_manager.filter(
+            order_id__in=order_ids, status__in=old_statuses)
+        # Only fetch the lines when someone listens to their changes
+        changed_lines = []
+        if order_line_status_changed.has_listeners():
+            changed_lines = list(lines.order_by('pk').select_for_update())
+        lines.update(status=new_status)
+        for line in changed_lines:
+            old_status, line.status = line.status, new_status
+            order_line_status_changed.send(
+                sender=line, line=line, old_status=old_status,
+                new_status=new_status)
+
+    def handle_bulk_shipping_event(self, orders, event_type, reference=''):
+        """
+        Create a shipping event of ``event_type`` for every order, for the
+        quantity of its lines that hasn't been through such an event yet.
+
+        Returns the created events. Orders whose lines have all been through
+        the event are skipped.
+        """
+        with transaction.atomic():
+            order_ids = list(
+                Order._default_manager.select_for_update()
+                .filter(pk__in=[order.pk for order in orders])
+                .order_by('pk').values_list('pk', flat=True))
+            passed = dict(
+                ShippingEventQuantity._default_manager.filter(
+                    line__order_id__in=order_ids,
+                    event__event_type=event_type)
+                .order_by().values('line')
+                .annotate(quantity=Sum('quantity'))
+                .values_list('line', 'quantity'))
+            # The remaining quantity is what Line.is_shipping_event_permitted
+            # allows
+            line_quantities = {}
+            for line_id, order_id, quantity in Line._default_manager.filter(
+                    order_id__in=order_ids).order_by('pk').values_list(
+                        'pk', 'order_id', 'quantity'):
+                remaining = quantity - passed.get(line_id, 0)
+                if remaining > 0:
+                    line_quantities.setdefault(order_id, []).append(
+                        (line_id, remaining))
+
+            events = ShippingEvent._default_manager.bulk_create([
+                ShippingEvent(order_id=order_id, event_type=event_type,
+                              notes=reference)
+                for order_id in order_ids if order_id in line_quantities])
+            ShippingEventQuantity._default_manager.bulk_create([
+                ShippingEventQuantity(
+                    event=event, line_id=line_id, quantity=quantity)
+                for event in events
+                for line_id, quantity in line_quantities[event.order_id]])
+        return events
+
+    def bulk_create_notes(self, order_messages, note_type='System'):
+        return OrderNote._default_manager.bulk_create([
+            OrderNote(order=order, message=message, note_type=note_type,
+                      user=self.user)
+            for order, message in order_messages])
+
     # Validation methods
     # ------------------
 
@@ -206,9 +346,7 @@ class EventHandler(object):
             lines = order.lines.all()
         if not line_quantities:
             line_quantities = [line.quantity for line in lines]
-        for line, qty in zip(lines, line_quantities):
-            if line.stockrecord:
-                line.stockrecord.consume_allocation(qty)
+        allocation.consume(self.get_stock_adjustments(lines, line_quantities))
 
     def cancel_stock_allocations(self, order, lines=None, line_quantities=None):
         """
@@ -220,9 +358,24 @@ class EventHandler(object):
             lines = order.lines.all()
         if not line_quantities:
             line_quantities = [line.quantity for line in lines]
-        for line, qty in zip(lines, line_quantities):
-            if line.stockrecord:
-                line.stockrecord.cancel_allocation(qty)
+        allocation.cancel(self.get_stock_adjustments(lines, line_quantities))
+
+    def get_stock_adjustments(self, lines, line_quantities):
+        """
+        Return the (stock record, quantity) pairs of the passed lines, for
+        ``partner.allocation``.
+        """
+        lines = list(lines)
+        prefetch_related_objects(
+            lines,
+            "stockrecord__product__product_class",
+            "stockrecord__product__parent__product_class",
+        )
+        return [
+            (line.stockrecord, qty)
+            for line, qty in zip(lines, line_quantities)
+            if line.stockrecord
+        ]
 
     # Model instance creation
     # -----------------------
@@ -0,0 +1,50 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from oscar.apps.order.signals import order_placed, order_status_changed
+from oscar.core.compat import get_user_model
+from oscar.core.loading import get_model
+
+from ecommerce.apps.order import rollups, search
+
+Order = get_model("order", "Order")
+Line = get_model("order", "Line")
+BillingAddress = get_model("order", "BillingAddress")
+ShippingAddress = get_model("order", "ShippingAddress")
+User = get_user_model()
+
+# Fields of the user that are part of the search documents of their orders
+USER_SEARCH_FIELDS = {"first_name", "last_name", "email"}
+
+
+@receiver(post_save, sender=BillingAddress)
+@receiver(post_save, sender=ShippingAddress)
+def update_search_documents_on_address_save(sender, instance, created, **kwargs):
+    # Addresses are saved before the order they belong to
+    if created:
+        return
+    field = "billing_address" if sender is BillingAddress else "shipping_address"
+    search.schedule_update(
+        Order.objects.filter(**{field: instance}).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_save, sender=Line)
+def update_search_document_on_line_save(instance, created, **kwargs):
+    # New lines are part of the document written when the order is placed
+    if not created:
+        search.schedule_update([instance.order_id])
+
+
+@receiver(post_save, sender=User)
+def update_search_documents_on_user_save(instance, created, update_fields, **kwargs):
+    if created or (update_fields and not USER_SEARCH_FIELDS & set(update_fields)):
+        return
+    search.schedule_update(
+        Order.objects.filter(user=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(order_placed)
+@receiver(order_status_changed)
+def update_rollups(sender, order, **kwargs):
+    rollups.schedule_refresh(order.date_placed)
@@ -0,0 +1,258 @@
+"""
+Hourly and daily rollups of orders.
+
+The order statistics of the dashboard add up ``OrderHourlyRollup`` and
+``OrderDailyRollup`` rows instead of aggregating the orders and lines they
+cover, so that the stats of a year read a few hundred rows.
+
+A period is refreshed by aggregating its orders again and replacing its
+rows, which makes a refresh idempotent and leaves nothing to drift. The
+hour and day of an order are refreshed once it is placed or its status
+changes (see ``receivers.py``): once the transaction commits, a refresh of
+each period is queued to run ``ORDER_ROLLUP_REFRESH_DELAY`` seconds later,
+unless one is already waiting, so that a busy period is aggregated once
+per delay rather than once per order. Hours are UTC hours and days are days
+of the current time zone, like the dates of the stats filters. Run
+``rebuild_order_rollups`` to build the rollups of existing orders.
+"""
+import datetime
+import logging
+from decimal import Decimal as D
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+from oscar.core.loading import get_model
+
+logger = logging.getLogger(__name__)
+
+HOUR = datetime.timedelta(hours=1)
+DAY = datetime.timedelta(days=1)
+
+HOURLY, DAILY = "hour", "day"
+
+
+def get_hour(value):
+    return value.astimezone(datetime.timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+def get_day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def lock(model, periods):
+    """
+    Wait for the other refreshes of the rollups of ``model`` in the
+    ``periods`` of this tenant to commit, until the end of the transaction.
+    """
+    prefix = f"{connection.schema_name}.{model._meta.db_table}"
+    with connection.cursor() as cursor:
+        # Always in the same order, so that overlapping refreshes can't
+        # deadlock
+        for period in sorted(periods):
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s))",
+                [f"{prefix}.{period.isoformat()}"],
+            )
+
+
+def refresh(model, period_field, truncate, start, end, periods):
+    Order = get_model("order", "Order")
+    Line = get_model("order", "Line")
+
+    rows = {}
+
+    def get_row(period, status, partner_id=None):
+        key = (period, status, partner_id)
+        if key not in rows:
+            rows[key] = model(
+                **{period_field: period}, status=status, partner_id=partner_id
+            )
+        return rows[key]
+
+    with transaction.atomic():
+        lock(model, periods)
+        orders = (
+            Order.objects.filter(date_placed__gte=start, date_placed__lt=end)
+            .annotate(period=truncate("date_placed"))
+            .order_by()
+            .values("period", "status")
+            .annotate(order_count=Count("id"), revenue=Sum("total_incl_tax"))
+        )
+        for values in orders:
+            row = get_row(values["period"], values["status"])
+            row.order_count = values["order_count"]
+            row.revenue = values["revenue"]
+
+        lines = (
+            Line.objects.filter(
+                order__date_placed__gte=start, order__date_placed__lt=end
+            )
+            .annotate(period=truncate("order__date_placed"))
+            .order_by()
+            .values("period", "order__status", "partner_id")
+            .annotate(
+                order_count=Count("order_id", distinct=True),
+                line_count=Count("id"),
+                revenue=Sum("line_price_incl_tax"),
+                discount=Sum(
+                    F("line_price_before_discounts_incl_tax")
+                    - F("line_price_incl_tax")
+                ),
+            )
+        )
+        for values in lines:
+            period, status = values["period"], values["order__status"]
+            row = get_row(period, status)
+            row.line_count += values["line_count"]
+            row.discount += values["discount"]
+            if values["partner_id"] is not None:
+                row = get_row(period, status, values["partner_id"])
+                row.order_count = values["order_count"]
+                row.line_count = values["line_count"]
+                row.revenue = values["revenue"]
+                row.discount = values["discount"]
+
+        model.objects.filter(**{f"{period_field}__in": periods}).delete()
+        model.objects.bulk_create(rows.values())
+
+
+def refresh_hours(start, end):
+    """
+    Rebuild the hourly rollups of the hours from ``start`` up to ``end``,
+    including the hours they fall in.
+    """
+    OrderHourlyRollup = get_model("order", "OrderHourlyRollup")
+
+    start = get_hour(start)
+    end = get_hour(end - datetime.timedelta.resolution) + HOUR
+    hours = [start + HOUR * i for i in range((end - start) // HOUR)]
+    refresh(
+        OrderHourlyRollup,
+        "hour",
+        partial(Trunc, kind="hour", tzinfo=datetime.timezone.utc),
+        start,
+        end,
+        hours,
+    )
+
+
+def refresh_days(first_day, last_day):
+    """
+    Rebuild the daily rollups of the days from ``first_day`` to ``last_day``.
+    """
+    OrderDailyRollup = get_model("order", "OrderDailyRollup")
+
+    days = [first_day + DAY * i for i in range((last_day - first_day).days + 1)]
+    refresh(
+        OrderDailyRollup,
+        "day",
+        TruncDate,
+        get_day_start(first_day),
+        get_day_start(last_day + DAY),
+        days,
+    )
+
+
+def rebuild(first_day, last_day):
+    """
+    Rebuild the hourly and daily rollups of the days from ``first_day`` to
+    ``last_day``.
+    """
+    refresh_days(first_day, last_day)
+    refresh_hours(get_day_start(first_day), get_day_start(last_day + DAY))
+
+
+def get_cache():
+    return caches[getattr(settings, "ORDER_ROLLUP_CACHE", "default")]
+
+
+def get_refresh_key(kind, period):
+    return f"order_rollups:{connection.schema_name}:{kind}:{period}"
+
+
+def refresh_period(kind, period):
+    """
+    Refresh the rollups of the ``period`` of ``kind`` given in ISO format,
+    which changes that commit from now on queue again.
+    """
+    get_cache().delete(get_refresh_key(kind, period))
+    if kind == HOURLY:
+        hour = datetime.datetime.fromisoformat(period)
+        refresh_hours(hour, hour + HOUR)
+    else:
+        day = datetime.date.fromisoformat(period)
+        refresh_days(day, day)
+
+
+def queue_refresh(date_placed):
+    """
+    Queue a refresh of the hour and day of an order placed at
+    ``date_placed``, unless one is waiting already.
+    """
+    from ecommerce.core.celery.tasks.order import refresh_order_rollups
+
+    delay = getattr(settings, "ORDER_ROLLUP_REFRESH_DELAY", 60)
+    periods = (
+        (HOURLY, get_hour(date_placed).isoformat()),
+        (DAILY, timezone.localdate(date_placed).isoformat()),
+    )
+    for kind, period in periods:
+        key = get_refresh_key(kind, period)
+        # The key outlives the delay in case the task is late, the refresh
+        # deletes it when it starts
+        if not get_cache().add(key, True, timeout=delay * 10):
+            continue
+        try:
+            refresh_order_rollups.apply_async((kind, period), countdown=delay)
+        except Exception:
+            logger.exception("Could not queue refresh of order rollups, refresh now")
+            refresh_period(kind, period)
+
+
+def schedule_refresh(date_placed):
+    """
+    Refresh the hour and day of an order placed at ``date_placed`` once the
+    current transaction commits.
+    """
+    transaction.on_commit(partial(queue_refresh, date_placed))
+
+
+def filter_rollups(rollups, partner_ids=None):
+    """
+    Return the rollups of the partners ``partner_ids``, or of the whole shop
+    when it is None.
+    """
+    if partner_ids is None:
+        return rollups.filter(partner=None)
+    return rollups.filter(partner_id__in=partner_ids)
+
+
+def get_totals(rollups):
+    totals = rollups.aggregate(
+        total_orders=Sum("order_count"),
+        total_lines=Sum("line_count"),
+        total_revenue=Sum("revenue"),
+        total_discount=Sum("discount"),
+    )
+    return {
+        "total_orders": totals["total_orders"] or 0,
+        "total_lines": totals["total_lines"] or 0,
+        "total_revenue": totals["total_revenue"] or D("0.00"),
+        "total_discount": totals["total_discount"] or D("0.00"),
+    }
+
+
+def get_status_breakdown(rollups):
+    return (
+        rollups.order_by("status")
+        .values("status")
+        .annotate(freq=Sum("order_count"))
+        .filter(freq__gt=0)
+    )
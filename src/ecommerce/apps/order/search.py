@@ -0,0 +1,176 @@
+"""
+Search documents of orders.
+
+The order dashboard searches orders by number, customer, product title,
+UPC, partner SKU and voucher code. Rather than joining the users, addresses,
+lines and discounts of all orders, every order has a ``search_document``
+tsvector with a GIN index. Its lexemes are stored verbatim (lowercased, but
+not stemmed) and prefixed with what they are, e.g. ``title:shirt`` or
+``sku:abc-1``, so that a search is a single index lookup which can still
+match a given field exactly or by prefix.
+
+Documents are written when an order is placed and updated when its
+addresses or customer change (see ``receivers.py``). The documents of the
+orders placed before were built by a data migration; orders without a
+document don't show up in searches, run ``update_order_search_documents``
+to build the missing ones.
+"""
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import F, Func, Lookup, Prefetch, Value
+from oscar.core.loading import get_model
+
+NUMBER, CUSTOMER, TITLE, UPC, SKU, VOUCHER = (
+    "number",
+    "customer",
+    "title",
+    "upc",
+    "sku",
+    "voucher",
+)
+
+BATCH_SIZE = 1000
+
+
+class Matches(Lookup):
+    """
+    ``document @@ query``, where the query is in the ``tsquery`` syntax and
+    taken as is, unlike ``to_tsquery`` which would split up the lexemes.
+    """
+
+    lookup_name = "matches"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} @@ ({rhs})::tsquery", (*lhs_params, *rhs_params)
+
+
+def get_lexeme(kind, value):
+    return f"{kind}:{value.strip().lower()}"
+
+
+def get_lexemes(order):
+    lexemes = {get_lexeme(NUMBER, order.number)}
+    for customer in (order.user, order.billing_address, order.shipping_address):
+        if customer is not None:
+            for name in (customer.first_name, customer.last_name):
+                lexemes.update(get_lexeme(CUSTOMER, word) for word in name.split())
+    for email in (order.user.email if order.user else "", order.guest_email):
+        lexemes.add(get_lexeme(CUSTOMER, email))
+    for line in order.lines.all():
+        lexemes.update(get_lexeme(TITLE, word) for word in line.title.split())
+        lexemes.add(get_lexeme(UPC, line.upc or ""))
+        lexemes.add(get_lexeme(SKU, line.partner_sku))
+    for discount in order.discounts.all():
+        lexemes.add(get_lexeme(VOUCHER, discount.voucher_code))
+    # Leave out the empty values
+    return sorted(lexeme for lexeme in lexemes if not lexeme.endswith(":"))
+
+
+def get_document(order):
+    return Func(
+        Value(get_lexemes(order), output_field=ArrayField(models.TextField())),
+        function="array_to_tsvector",
+        output_field=SearchVectorField(),
+    )
+
+
+def update_documents(order_ids, apps=None):
+    """
+    Write the search documents of the given orders. Data migrations pass
+    their ``apps`` to write them with the historical models.
+    """
+    get = get_model if apps is None else apps.get_model
+    Order = get("order", "Order")
+    Line = get("order", "Line")
+    OrderDiscount = get("order", "OrderDiscount")
+
+    order_ids = list(order_ids)
+    for start in range(0, len(order_ids), BATCH_SIZE):
+        orders = (
+            Order.objects.filter(pk__in=order_ids[start : start + BATCH_SIZE])
+            .select_related("user", "billing_address", "shipping_address")
+            .prefetch_related(
+                Prefetch(
+                    "lines",
+                    queryset=Line.objects.only(
+                        "order_id", "title", "upc", "partner_sku"
+                    ),
+                ),
+                Prefetch(
+                    "discounts",
+                    queryset=OrderDiscount.objects.exclude(voucher_code="").only(
+                        "order_id", "voucher_code"
+                    ),
+                ),
+            )
+            .order_by()
+        )
+        Order.objects.bulk_update(
+            [Order(pk=order.pk, search_document=get_document(order)) for order in orders],
+            ["search_document"],
+        )
+
+
+class ScheduledUpdate:
+    """
+    Update of the search documents of orders, run when the transaction it
+    was scheduled in commits.
+    """
+
+    def __init__(self, order_ids):
+        self.order_ids = set(order_ids)
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        update_documents(self.order_ids)
+
+
+def schedule_update(order_ids):
+    """
+    Update the search documents of the given orders once the current
+    transaction commits.
+
+    The orders are added to the update already scheduled in the transaction,
+    if any, so that e.g. saving every line of an order writes its document
+    once.
+    """
+    order_ids = set(order_ids)
+    if not order_ids:
+        return
+    # Updates scheduled in savepoints that were rolled back are gone from the
+    # callbacks, so they can't be extended by mistake
+    for __, func, __ in transaction.get_connection().run_on_commit:
+        if isinstance(func, ScheduledUpdate) and not func.done:
+            func.order_ids.update(order_ids)
+            return
+    transaction.on_commit(ScheduledUpdate(order_ids))
+
+
+def get_term(kind, value, prefix=False):
+    """
+    Return a ``tsquery`` matching the lexeme ``value`` of ``kind``, or the
+    lexemes starting with it when ``prefix`` is set.
+    """
+    lexeme = get_lexeme(kind, value).replace("\\", "\\\\").replace("'", "''")
+    return f"'{lexeme}'" + (":*" if prefix else "")
+
+
+def get_words_term(kind, value):
+    """
+    Return a ``tsquery`` matching documents with lexemes of ``kind`` starting
+    with each of the words of ``value``.
+    """
+    return " & ".join(get_term(kind, word, prefix=True) for word in value.split())
+
+
+def filter_orders(queryset, terms):
+    """
+    Return the orders of ``queryset`` whose search document matches all of
+    ``terms``.
+    """
+    query = " & ".join(f"({term})" for term in terms)
+    return queryset.filter(Matches(F("search_document"), Value(query)))
@@ -1,4 +1,5 @@
 from decimal import Decimal as D
+from unittest import mock
 
 from oscar.apps.order import exceptions
 
@@ -298,3 +299,116 @@ class TestTotalCalculation(TestCase):
             self.handler.calculate_payment_event_subtotal(
                 self.settled, self.order.lines.all(), [4]
             )
+
+
+class TestBulkEvents(TestCase):
+    def setUp(self):
+        for model, pipeline in (
+            (models.Order, {"A": ("B",), "B": ("C",), "C": ()}),
+            (models.Line, {"a": ("b",), "b": ()}),
+        ):
+            patcher = mock.patch.object(model, "pipeline", pipeline)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(models.Order, "cascade", {"B": "b"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.orders = []
+        for status in ("A", "A", "B"):
+            basket = factories.create_basket(empty=True)
+            add_product(basket, D("10.00"), 2)
+            add_product(basket, D("5.00"), 1)
+            order = factories.create_order(basket=basket, status=status)
+            order.lines.update(status="a")
+            self.orders.append(order)
+        self.handler = EventHandler()
+        self.shipped = models.ShippingEventType.objects.create(name="Shipped")
+
+    def test_changes_order_statuses(self):
+        changed, invalid = self.handler.handle_bulk_order_status_change(
+            self.orders, "B", note_msg="%(old_status)s to %(new_status)s"
+        )
+
+        self.assertEqual(changed, [(self.orders[0], "A"), (self.orders[1], "A")])
+        self.assertEqual(invalid, [])
+        self.assertEqual(
+            list(
+                models.Order.objects.filter(pk__in=[o.pk for o in self.orders])
+                .order_by("pk")
+                .values_list("status", flat=True)
+            ),
+            ["B", "B", "B"],
+        )
+        self.assertEqual(
+            set(
+                models.Line.objects.filter(order__in=self.orders[:2]).values_list(
+                    "status", flat=True
+                )
+            ),
+            {"b"},
+        )
+        self.assertEqual(
+            list(self.orders[2].lines.values_list("status", flat=True)), ["a", "a"]
+        )
+        for order in self.orders[:2]:
+            self.assertEqual(
+                list(order.status_changes.values_list("old_status", "new_status")),
+                [("A", "B")],
+            )
+            self.assertEqual(
+                list(order.notes.values_list("message", "note_type")),
+                [("A to B", models.OrderNote.SYSTEM)],
+            )
+
+    def test_skips_invalid_transitions(self):
+        changed, invalid = self.handler.handle_bulk_order_status_change(
+            self.orders, "C"
+        )
+
+        self.assertEqual(changed, [(self.orders[2], "B")])
+        self.assertEqual(invalid, self.orders[:2])
+        self.assertEqual(models.Order.objects.filter(status="C").count(), 1)
+
+    def test_uses_current_order_status(self):
+        models.Order.objects.filter(pk=self.orders[0].pk).update(status="B")
+
+        changed, invalid = self.handler.handle_bulk_order_status_change(
+            self.orders, "B"
+        )
+
+        self.assertEqual(changed, [(self.orders[1], "A")])
+        self.assertEqual(self.orders[0].status_changes.count(), 0)
+
+    def test_creates_shipping_events_for_remaining_quantities(self):
+        first = self.orders[0]
+        lines = list(first.lines.order_by("pk"))
+        self.handler.handle_shipping_event(first, self.shipped, lines, [2, 1])
+        self.handler.handle_shipping_event(
+            self.orders[1], self.shipped, self.orders[1].lines.order_by("pk")[:1], [1]
+        )
+
+        events = self.handler.handle_bulk_shipping_event(
+            self.orders, self.shipped, reference="run 1"
+        )
+
+        self.assertEqual(
+            [event.order_id for event in events], [o.pk for o in self.orders[1:]]
+        )
+        self.assertEqual(
+            list(
+                events[0]
+                .line_quantities.order_by("line")
+                .values_list("quantity", flat=True)
+            ),
+            [1, 1],
+        )
+        self.assertEqual(events[1].line_quantities.count(), 2)
+        self.assertEqual(events[1].notes, "run 1")
+        for order in self.orders:
+            self.assertTrue(
+                all(
+                    line.has_shipping_event_occurred(self.shipped)
+                    for line in order.lines.all()
+                )
+            )
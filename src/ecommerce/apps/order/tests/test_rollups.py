@@ -0,0 +1,161 @@
+from decimal import Decimal as D
+from io import StringIO
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.core.management import call_command
+from django.utils import timezone
+from oscar.apps.order.signals import order_placed
+from oscar.core.loading import get_model
+
+from ecommerce.apps.order import rollups
+from ecommerce.apps.order.processing import EventHandler
+from ecommerce.core.celery.tasks.order import refresh_order_rollups
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+Order = get_model("order", "Order")
+OrderDailyRollup = get_model("order", "OrderDailyRollup")
+OrderHourlyRollup = get_model("order", "OrderHourlyRollup")
+
+
+class TestOrderRollups(TestCase):
+    def setUp(self):
+        # Other tests change the pipeline
+        patcher = mock.patch.object(Order, "pipeline", {"Pending": ("Shipped",)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        rollups.get_cache().clear()
+        patcher = mock.patch.object(refresh_order_rollups, "apply_async")
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.product = factories.create_product(
+            partner_name="Partner 1", price=D("5.00"), num_in_stock=100
+        )
+        self.other_product = factories.create_product(
+            partner_name="Partner 2", price=D("10.00"), num_in_stock=100
+        )
+        self.partner = self.product.stockrecords.get().partner
+        self.other_partner = self.other_product.stockrecords.get().partner
+        self.orders = [
+            self.create_order(self.product, self.other_product),
+            self.create_order(self.other_product),
+        ]
+        self.today = timezone.localdate()
+
+    def create_order(self, *products):
+        basket = factories.create_basket(empty=True)
+        for product in products:
+            basket.add_product(product)
+        return factories.create_order(basket=basket, status="Pending")
+
+    def run_queued_refreshes(self):
+        for call in self.apply_async.call_args_list:
+            refresh_order_rollups(*call.args[0])
+        self.apply_async.reset_mock()
+
+    def get_rows(self, model, **filters):
+        return {
+            (row.partner_id, row.status): (
+                row.order_count,
+                row.line_count,
+                row.revenue,
+            )
+            for row in model.objects.filter(**filters)
+        }
+
+    def test_rebuild(self):
+        rollups.rebuild(self.today, self.today)
+
+        expected = {
+            (None, "Pending"): (2, 3, sum(o.total_incl_tax for o in self.orders)),
+            (self.partner.pk, "Pending"): (1, 1, D("5.00")),
+            (self.other_partner.pk, "Pending"): (2, 2, D("20.00")),
+        }
+        self.assertEqual(self.get_rows(OrderDailyRollup, day=self.today), expected)
+        self.assertEqual(self.get_rows(OrderHourlyRollup), expected)
+        daily = OrderDailyRollup.objects.filter(partner=self.partner)
+        self.assertEqual(
+            rollups.get_totals(daily),
+            {
+                "total_orders": 1,
+                "total_lines": 1,
+                "total_revenue": D("5.00"),
+                "total_discount": D("0.00"),
+            },
+        )
+
+    def test_rebuild_replaces_rows(self):
+        rollups.rebuild(self.today, self.today)
+        rollups.rebuild(self.today, self.today)
+
+        self.assertEqual(OrderDailyRollup.objects.count(), 3)
+        self.assertEqual(OrderHourlyRollup.objects.count(), 3)
+
+    def test_status_changes_refresh_rollups_once(self):
+        rollups.rebuild(self.today, self.today)
+
+        handler = EventHandler()
+        with mock.patch.object(rollups, "refresh", wraps=rollups.refresh) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                handler.handle_bulk_order_status_change(self.orders, "Shipped")
+            self.run_queued_refreshes()
+
+        # Once for the hour and once for the day of the orders
+        self.assertEqual(refresh.call_count, 2)
+        daily = OrderDailyRollup.objects.filter(partner=None)
+        self.assertEqual(
+            list(rollups.get_status_breakdown(daily)),
+            [{"status": "Shipped", "freq": 2}],
+        )
+
+    def test_placed_orders_are_rolled_up(self):
+        order = self.create_order(self.product)
+        with self.captureOnCommitCallbacks(execute=True):
+            order_placed.send(sender=self, order=order, user=None)
+        self.run_queued_refreshes()
+
+        self.assertEqual(
+            self.get_rows(OrderDailyRollup, partner=self.partner),
+            {(self.partner.pk, "Pending"): (2, 2, D("10.00"))},
+        )
+
+    def test_refresh_is_queued_again_once_it_started(self):
+        for __ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                rollups.schedule_refresh(self.orders[0].date_placed)
+            self.assertEqual(self.apply_async.call_count, 2)
+            self.run_queued_refreshes()
+
+    def test_refreshes_now_when_queueing_fails(self):
+        self.apply_async.side_effect = OSError("Broker is down")
+        order = self.create_order(self.product)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order_placed.send(sender=self, order=order, user=None)
+
+        self.assertEqual(
+            self.get_rows(OrderHourlyRollup, partner=self.partner),
+            {(self.partner.pk, "Pending"): (2, 2, D("10.00"))},
+        )
+
+    def test_failed_refreshes_are_retried(self):
+        with mock.patch.object(
+            rollups, "refresh_days", side_effect=OSError("Database is down")
+        ), mock.patch.object(
+            refresh_order_rollups, "retry", side_effect=Retry
+        ) as retry, self.assertRaises(Retry):
+            refresh_order_rollups(rollups.DAILY, self.today.isoformat())
+
+        self.assertIsInstance(retry.call_args.kwargs["exc"], OSError)
+
+    def test_rebuild_command(self):
+        call_command("rebuild_order_rollups", stdout=StringIO())
+
+        self.assertEqual(
+            rollups.get_totals(OrderDailyRollup.objects.filter(partner=None))[
+                "total_orders"
+            ],
+            2,
+        )
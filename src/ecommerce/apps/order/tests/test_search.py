@@ -0,0 +1,120 @@
+from decimal import Decimal as D
+from importlib import import_module
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from oscar.core.loading import get_model
+
+from ecommerce.apps.order import search
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+Order = get_model("order", "Order")
+
+
+class TestOrderSearch(TestCase):
+    def setUp(self):
+        self.user = factories.UserFactory(
+            first_name="Sun", last_name="Tzu", email="sun@example.com"
+        )
+        basket = factories.create_basket(empty=True)
+        product = factories.create_product(
+            title="The Art of War",
+            upc="UPC-1",
+            partner_sku="SKU-1",
+            price=D("10"),
+            num_in_stock=10,
+        )
+        basket.add_product(product)
+        self.order = factories.create_order(
+            number="100042", basket=basket, user=self.user
+        )
+        self.other = factories.create_order(
+            number="200042", shipping_address=factories.ShippingAddressFactory()
+        )
+
+    def search(self, *terms):
+        return list(search.filter_orders(Order.objects.all(), terms))
+
+    def test_placed_orders_have_documents(self):
+        terms = [
+            search.get_term(search.NUMBER, "1000", prefix=True),
+            search.get_words_term(search.CUSTOMER, "sun tz"),
+            search.get_term(search.CUSTOMER, "SUN@example.com"),
+            search.get_words_term(search.TITLE, "art war"),
+            search.get_term(search.UPC, "upc-1"),
+            search.get_term(search.SKU, "sku-1"),
+        ]
+        for term in terms:
+            with self.subTest(term=term):
+                self.assertEqual(self.search(term), [self.order])
+
+    def test_terms_are_combined(self):
+        self.assertEqual(
+            self.search(
+                search.get_term(search.SKU, "sku-1"),
+                search.get_term(search.NUMBER, "200042"),
+            ),
+            [],
+        )
+        # Exact terms don't match prefixes
+        self.assertEqual(self.search(search.get_term(search.SKU, "sku")), [])
+
+    def test_quotes_are_escaped(self):
+        term = search.get_words_term(search.TITLE, "o'brien\\")
+        self.assertEqual(self.search(term), [])
+
+    def test_documents_follow_customer_changes(self):
+        self.user.last_name = "Wu"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        address = self.other.shipping_address
+        address.first_name = "Sun"
+        with self.captureOnCommitCallbacks(execute=True):
+            address.save()
+
+        self.assertEqual(
+            self.search(search.get_words_term(search.CUSTOMER, "wu")), [self.order]
+        )
+        self.assertEqual(
+            set(self.search(search.get_words_term(search.CUSTOMER, "sun"))),
+            {self.order, self.other},
+        )
+
+    def test_backfill_command(self):
+        Order.objects.update(search_document=None)
+
+        call_command("update_order_search_documents", batch_size=1, verbosity=0)
+
+        self.assertFalse(Order.objects.filter(search_document__isnull=True).exists())
+        self.assertEqual(
+            self.search(search.get_term(search.NUMBER, "200042")), [self.other]
+        )
+
+    def test_updates_are_combined_per_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for order in (self.order, self.other):
+                for line in order.lines.all():
+                    line.save()
+                    line.save()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(callbacks[0].order_ids, {self.order.pk, self.other.pk})
+
+    def test_migration_builds_missing_documents(self):
+        migration = import_module(
+            "ecommerce.apps.order.migrations.0007_backfill_order_search_document"
+        )
+        apps = (
+            MigrationLoader(connection)
+            .project_state(("order", "0007_backfill_order_search_document"))
+            .apps
+        )
+        Order.objects.filter(pk=self.other.pk).update(search_document=None)
+
+        migration.build_search_documents(apps, None)
+
+        self.assertEqual(
+            self.search(search.get_term(search.NUMBER, "200042")), [self.other]
+        )
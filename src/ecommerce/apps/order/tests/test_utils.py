@@ -0,0 +1,97 @@
+from decimal import Decimal as D
+from unittest import mock
+
+from django.db.models.signals import post_save
+from django.test import override_settings
+from oscar.apps.order import exceptions
+from oscar.core.loading import get_model
+
+from ecommerce.apps.order.models import Line, LinePrice, Order
+from ecommerce.apps.order.utils import OrderCreator
+from ecommerce.test.factories import (
+    create_basket,
+    create_order,
+    create_product,
+    create_stockrecord,
+)
+from ecommerce.test.testcases import TestCase
+
+StockRecord = get_model("partner", "StockRecord")
+
+
+class TestBulkOrderPlacement(TestCase):
+    def setUp(self):
+        self.basket = create_basket(empty=True)
+        self.stockrecords = []
+        for index in range(3):
+            product = create_product(title=f"Product {index}")
+            self.stockrecords.append(
+                create_stockrecord(product, num_in_stock=10, price=D("10.00"))
+            )
+            self.basket.add_product(product, quantity=index + 1)
+
+    def test_creates_lines_and_prices(self):
+        order = create_order(basket=self.basket)
+
+        self.assertEqual(order.lines.count(), 3)
+        self.assertEqual(
+            sorted(order.lines.values_list("quantity", flat=True)), [1, 2, 3]
+        )
+        self.assertEqual(LinePrice.objects.filter(order=order).count(), 3)
+
+    def test_allocates_stock(self):
+        create_order(basket=self.basket)
+
+        self.assertEqual(
+            [
+                StockRecord.objects.get(pk=stockrecord.pk).num_allocated
+                for stockrecord in self.stockrecords
+            ],
+            [1, 2, 3],
+        )
+
+    @override_settings(STOCK_ALLOCATION_STRICT=True)
+    def test_fails_when_stock_runs_out(self):
+        StockRecord.objects.filter(pk=self.stockrecords[2].pk).update(num_in_stock=2)
+
+        with self.assertRaises(exceptions.UnableToPlaceOrder):
+            create_order(basket=self.basket)
+
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(
+            StockRecord.objects.filter(
+                pk__in=[stockrecord.pk for stockrecord in self.stockrecords],
+                num_allocated__gt=0,
+            ).exists()
+        )
+
+    def test_sends_save_signals(self):
+        receiver = mock.Mock()
+        post_save.connect(receiver, sender=Line)
+        self.addCleanup(post_save.disconnect, receiver, sender=Line)
+
+        create_order(basket=self.basket)
+
+        self.assertEqual(receiver.call_count, 3)
+        self.assertTrue(
+            all(call.kwargs["created"] for call in receiver.call_args_list)
+        )
+
+    def test_uses_per_line_hooks_when_overridden(self):
+        class CustomOrderCreator(OrderCreator):
+            def create_line_models(self, order, basket_line, extra_line_fields=None):
+                return super().create_line_models(
+                    order, basket_line, {"partner_name": "Custom"}
+                )
+
+        self.assertTrue(OrderCreator().can_bulk_create_lines())
+        self.assertFalse(CustomOrderCreator().can_bulk_create_lines())
+
+        with mock.patch(
+            "ecommerce.test.factories.OrderCreator", CustomOrderCreator
+        ):
+            order = create_order(basket=self.basket)
+
+        self.assertEqual(
+            set(order.lines.values_list("partner_name", flat=True)), {"Custom"}
+        )
@@ -1,21 +1,74 @@
 from decimal import Decimal as D
+from functools import partial
 
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.db import transaction
+from django.db import router, transaction
+from django.db.models import (
+    Case,
+    F,
+    Q,
+    Value,
+    When,
+    prefetch_related_objects,
+    signals,
+)
 from django.utils.translation import gettext_lazy as _
 from oscar.apps.order import exceptions
 from oscar.apps.order.signals import order_placed
+from oscar.core.loading import get_class
 
+from ecommerce.apps.basket.snapshot import basket_snapshots
 from ecommerce.apps.communication.models import CommunicationEventType
 from ecommerce.apps.communication.utils import Dispatcher
+from ecommerce.apps.offer.models import ConditionalOffer
+from ecommerce.apps.order import search
 from ecommerce.apps.order.models import (
     CommunicationEvent,
     Line,
+    LineAttribute,
+    LinePrice,
     Order,
     OrderDiscount,
     Surcharge,
 )
+from ecommerce.apps.partner import allocation, reservations
+from ecommerce.apps.partner.exceptions import InsufficientStock
+from ecommerce.apps.voucher.models import Voucher
+
+Applicator = get_class("offer.applicator", "Applicator")
+
+# Hooks that work on a single line. When a subclass overrides one of them,
+# lines are placed one by one so that the override keeps being called.
+PER_LINE_HOOKS = (
+    "create_line_models",
+    "create_line_price_models",
+    "create_line_attributes",
+    "update_stock_records",
+)
+
+
+def bulk_create_with_signals(model, instances):
+    """
+    ``bulk_create`` the instances, sending the ``pre_save`` and ``post_save``
+    signals that saving them one by one would send.
+    """
+    using = router.db_for_write(model)
+    for instance in instances:
+        signals.pre_save.send(
+            sender=model, instance=instance, raw=False, using=using, update_fields=None
+        )
+    model._default_manager.bulk_create(instances)
+    for instance in instances:
+        signals.post_save.send(
+            sender=model,
+            instance=instance,
+            created=True,
+            raw=False,
+            using=using,
+            update_fields=None,
+        )
+    return instances
 
 
 class OrderNumberGenerator(object):
@@ -59,6 +112,8 @@ class OrderCreator(object):
         """
         if basket.is_empty:
             raise ValueError(_("Empty baskets cannot be submitted"))
+        # The discounts recorded on the order must not come from a snapshot
+        basket_snapshots.refresh(basket, user, request, Applicator())
         if not order_number:
             generator = OrderNumberGenerator()
             order_number = generator.order_number(basket)
@@ -86,9 +141,15 @@ class OrderCreator(object):
                 request,
                 **kwargs,
             )
-            for line in basket.all_lines():
-                self.create_line_models(order, line)
-                self.update_stock_records(line)
+            if self.can_bulk_create_lines():
+                self.bulk_create_line_models(order, basket.all_lines())
+                self.bulk_update_stock_records(basket.all_lines())
+            else:
+                for line in basket.all_lines():
+                    self.create_line_models(order, line)
+                    self.update_stock_records(line)
+            # The stock is allocated now, so the basket's reservation can go
+            transaction.on_commit(partial(reservations.release, basket.pk))
 
             for voucher in basket.vouchers.select_for_update():
                 if not voucher.is_active():  # basket ignores inactive vouchers
@@ -98,7 +159,10 @@ class OrderCreator(object):
                     if not available_to_user:
                         raise ValueError(msg)
 
+            process_async = getattr(settings, "ORDER_PROCESSING_ASYNC", False)
+
             # Record any discounts associated with this order
+            applications = []
             for application in basket.offer_applications:
                 # Trigger any deferred benefits from offers and capture the
                 # resulting message
@@ -116,16 +180,41 @@ class OrderCreator(object):
                     # OfferDiscount instance.
                     application["discount"] = shipping_discount
                 self.create_discount_model(order, application)
-                self.record_discount(application)
+                applications.append(application)
 
+            self.record_offer_applications(applications)
+            if not process_async:
+                for application in applications:
+                    self.record_discount(application)
+
+            # Voucher usage limits are enforced with the applications, so
+            # they are recorded with the order
             for voucher in basket.vouchers.all():
                 self.record_voucher_usage(order, voucher, user)
 
-        # Send signal for analytics to pick up
-        order_placed.send(sender=self, order=order, user=user)
+            if process_async:
+                self.queue_order_processing(order)
+
+            search.update_documents([order.pk])
+
+        if not process_async:
+            # Send signal for analytics to pick up
+            order_placed.send(sender=self, order=order, user=user)
 
         return order
 
+    def queue_order_processing(self, order):
+        """
+        Leave recording the discounts and sending ``order_placed`` to the
+        workers, once the order is committed.
+        """
+        from ecommerce.core.celery.tasks.order import (
+            ORDER_PLACED_STEPS,
+            queue_order_processing,
+        )
+
+        queue_order_processing(order, ORDER_PLACED_STEPS)
+
     def create_order_model(
         self,
         user,
@@ -178,6 +267,16 @@ class OrderCreator(object):
                 )
         return order
 
+    def can_bulk_create_lines(self):
+        """
+        Whether the lines can be placed with bulk queries, which is the case
+        unless a subclass customises one of the per-line hooks.
+        """
+        return all(
+            getattr(type(self), name) is getattr(OrderCreator, name)
+            for name in PER_LINE_HOOKS
+        )
+
     def create_line_models(self, order, basket_line, extra_line_fields=None):
         """
         Create the batch line model.
@@ -185,6 +284,69 @@ class OrderCreator(object):
         You can set extra fields by passing a dictionary as the
         extra_line_fields value
         """
+        line_data = self.get_line_data(order, basket_line, extra_line_fields)
+        order_line = Line._default_manager.create(**line_data)
+        self.create_line_price_models(order, order_line, basket_line)
+        self.create_line_attributes(order, order_line, basket_line)
+        self.create_additional_line_models(order, order_line, basket_line)
+
+        return order_line
+
+    def bulk_create_line_models(self, order, basket_lines):
+        """
+        Create the lines of the order, with their prices and attributes, with
+        a query per model instead of several queries per line.
+        """
+        basket_lines = list(basket_lines)
+        prefetch_related_objects(
+            basket_lines,
+            "stockrecord__partner",
+            "product__product_class",
+            "product__parent__product_class",
+            "attributes__option",
+        )
+        order_lines = bulk_create_with_signals(
+            Line,
+            [
+                Line(**self.get_line_data(order, basket_line))
+                for basket_line in basket_lines
+            ],
+        )
+
+        prices, attributes = [], []
+        for order_line, basket_line in zip(order_lines, basket_lines):
+            for price_incl_tax, price_excl_tax, quantity in (
+                basket_line.get_price_breakdown()
+            ):
+                prices.append(
+                    LinePrice(
+                        order=order,
+                        line=order_line,
+                        quantity=quantity,
+                        price_incl_tax=price_incl_tax,
+                        price_excl_tax=price_excl_tax,
+                    )
+                )
+            attributes.extend(
+                LineAttribute(
+                    line=order_line,
+                    option=attr.option,
+                    type=attr.option.code,
+                    value=attr.value,
+                )
+                for attr in basket_line.attributes.all()
+            )
+        bulk_create_with_signals(LinePrice, prices)
+        bulk_create_with_signals(LineAttribute, attributes)
+
+        for order_line, basket_line in zip(order_lines, basket_lines):
+            self.create_additional_line_models(order, order_line, basket_line)
+        return order_lines
+
+    def get_line_data(self, order, basket_line, extra_line_fields=None):
+        """
+        Return the field values of the order line of ``basket_line``.
+        """
         product = basket_line.product
         stockrecord = basket_line.stockrecord
         if not stockrecord:
@@ -220,20 +382,31 @@ class OrderCreator(object):
             extra_line_fields["status"] = getattr(settings, "OSCAR_INITIAL_LINE_STATUS")
         if extra_line_fields:
             line_data |= extra_line_fields
-
-        order_line = Line._default_manager.create(**line_data)
-        self.create_line_price_models(order, order_line, basket_line)
-        self.create_line_attributes(order, order_line, basket_line)
-        self.create_additional_line_models(order, order_line, basket_line)
-
-        return order_line
+        return line_data
 
     def update_stock_records(self, line):
         """
         Update any relevant stock records for this order line
         """
-        if line.product.get_product_class().track_stock:
-            line.stockrecord.allocate(line.quantity)
+        self.allocate_stock([(line.stockrecord, line.quantity)])
+
+    def bulk_update_stock_records(self, lines):
+        """
+        Allocate the stock of all lines together, see ``partner.allocation``.
+        """
+        lines = list(lines)
+        prefetch_related_objects(
+            lines,
+            "stockrecord__product__product_class",
+            "stockrecord__product__parent__product_class",
+        )
+        self.allocate_stock([(line.stockrecord, line.quantity) for line in lines])
+
+    def allocate_stock(self, adjustments):
+        try:
+            allocation.allocate(adjustments)
+        except InsufficientStock as e:
+            raise exceptions.UnableToPlaceOrder(str(e)) from e
 
     def create_additional_line_models(self, order, order_line, basket_line):
         """
@@ -289,11 +462,78 @@ class OrderCreator(object):
             order_discount.voucher_code = voucher.code
         order_discount.save()
 
+    def record_offer_applications(self, applications):
+        """
+        Add the applications of the order to its offers, within the order
+        transaction so that offers with ``max_global_applications`` can't be
+        redeemed beyond it, however late the rest of the usage is recorded
+        (see ``record_discount``).
+        """
+        for application in sorted(applications, key=lambda a: a["offer"].pk):
+            offer, freq = application["offer"], application["freq"]
+            offers = ConditionalOffer._default_manager.filter(pk=offer.pk)
+            values = {"num_applications": F("num_applications") + freq}
+            if not offer.max_global_applications:
+                offers.update(**values)
+                continue
+
+            # Number of applications the offer can have before this order
+            limit = F("max_global_applications") - freq
+            # Mark the offer as consumed, as ConditionalOffer.save does
+            values["status"] = Case(
+                When(
+                    Q(status=ConditionalOffer.OPEN, num_applications__gte=limit),
+                    then=Value(ConditionalOffer.CONSUMED),
+                ),
+                default=F("status"),
+            )
+            if not offers.filter(num_applications__lte=limit).update(**values):
+                raise exceptions.UnableToPlaceOrder(
+                    _("The offer '%s' is no longer available") % offer.name
+                )
+            if offers.filter(status=ConditionalOffer.CONSUMED).exists():
+                # Saving the offer would have invalidated the snapshots
+                transaction.on_commit(basket_snapshots.invalidate_offers)
+
     def record_discount(self, discount):
-        discount["offer"].record_usage(discount)
+        """
+        Add a discount to the totals of its offer and voucher. Unlike
+        ``ConditionalOffer.record_usage``, the offer isn't saved, as its
+        applications are recorded with the order already.
+        """
+        ConditionalOffer._default_manager.filter(pk=discount["offer"].pk).update(
+            total_discount=F("total_discount") + discount["discount"],
+            num_orders=F("num_orders") + 1,
+        )
         if "voucher" in discount and discount["voucher"]:
             discount["voucher"].record_discount(discount)
 
+    def record_order_discounts(self, order):
+        """
+        Record the discounts of a placed order against their offers and
+        vouchers, like ``place_order`` does with the offer applications of the
+        basket.
+        """
+        discounts = list(order.discounts.all())
+        offers = ConditionalOffer._default_manager.in_bulk(
+            [discount.offer_id for discount in discounts]
+        )
+        vouchers = Voucher._default_manager.in_bulk(
+            [discount.voucher_id for discount in discounts if discount.voucher_id]
+        )
+        for discount in discounts:
+            if discount.offer_id not in offers:
+                # The offer was deleted since
+                continue
+            self.record_discount(
+                {
+                    "offer": offers[discount.offer_id],
+                    "voucher": vouchers.get(discount.voucher_id),
+                    "freq": discount.frequency,
+                    "discount": discount.amount,
+                }
+            )
+
     def record_voucher_usage(self, order, voucher, user):
         """
         Updates the models that care about this voucher.
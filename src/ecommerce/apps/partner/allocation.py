@@ -0,0 +1,189 @@
+"""
+Stock allocation engine.
+
+Oscar allocates, consumes and cancels stock one stock record at a time
+(``StockRecord.allocate`` and friends), locking the rows in whatever order
+the lines of the order are in. When a popular product sells out, concurrent
+checkouts queue on its row and two orders sharing products can deadlock.
+
+The functions of this module adjust the stock records of several lines at
+once:
+
+* the quantities of every stock record are summed and the records are
+  updated in the order of their primary key, so that concurrent
+  transactions always lock rows in the same order;
+* with ``STOCK_ALLOCATION_STRICT`` (the default), an allocation is a
+  conditional ``UPDATE ... WHERE num_in_stock >= num_allocated + quantity``,
+  so stock can't be oversold and no row needs to be locked beforehand. When a record
+  doesn't have enough stock, ``InsufficientStock`` is raised and the
+  adjustments of the other records are rolled back;
+* with ``STOCK_ALLOCATION_BATCHED``, the records are locked with a single
+  ``SELECT ... FOR UPDATE`` (ordered by primary key), checked and updated
+  with a single ``UPDATE``, which saves queries for orders with many lines.
+
+Consuming an allocation always checks the stock, as Oscar does. The
+``pre_save`` and ``post_save`` signals are sent for every adjusted stock
+record once the stock of all of them has been checked, so an adjustment that
+fails doesn't send any.
+"""
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce, Least
+from oscar.core.loading import get_model
+
+from ecommerce.apps.partner.exceptions import InsufficientStock
+
+
+def num_allocated():
+    return Coalesce(F("num_allocated"), 0)
+
+
+def allocate(adjustments, strict=None, batched=None):
+    """
+    Allocate stock for ``adjustments``, an iterable of (stock record,
+    quantity) pairs.
+    """
+    if strict is None:
+        strict = getattr(settings, "STOCK_ALLOCATION_STRICT", True)
+
+    def has_stock(quantity):
+        return Q(num_in_stock__gte=num_allocated() + quantity)
+
+    adjust(
+        adjustments,
+        lambda quantity: {"num_allocated": num_allocated() + quantity},
+        condition=has_stock if strict else None,
+        batched=batched,
+    )
+
+
+def consume(adjustments, batched=None):
+    """
+    Consume the allocations of ``adjustments``, removing the quantities from
+    the stock.
+    """
+    adjust(
+        adjustments,
+        lambda quantity: {
+            "num_allocated": num_allocated() - quantity,
+            "num_in_stock": Coalesce(F("num_in_stock"), 0) - quantity,
+        },
+        condition=lambda quantity: Q(
+            num_allocated__gte=quantity, num_in_stock__gte=quantity
+        ),
+        batched=batched,
+    )
+
+
+def cancel(adjustments, batched=None):
+    """
+    Release the allocations of ``adjustments``.
+    """
+    adjust(
+        adjustments,
+        lambda quantity: {
+            "num_allocated": num_allocated() - Least(num_allocated(), quantity)
+        },
+        batched=batched,
+    )
+
+
+def get_quantities(adjustments):
+    """
+    Sum the quantities per stock record, leaving out the records that don't
+    track stock. Return dicts of stock record id -> quantity and stock record
+    id -> instances.
+    """
+    quantities, stockrecords = {}, {}
+    for stockrecord, quantity in adjustments:
+        if stockrecord is None or not stockrecord.can_track_allocations:
+            continue
+        quantities[stockrecord.pk] = quantities.get(stockrecord.pk, 0) + quantity
+        stockrecords.setdefault(stockrecord.pk, []).append(stockrecord)
+    return quantities, stockrecords
+
+
+def adjust(adjustments, get_values, condition=None, batched=None):
+    """
+    Update the stock records of ``adjustments`` with the field values
+    ``get_values(quantity)`` returns, if they match ``condition(quantity)``.
+    """
+    StockRecord = get_model("partner", "StockRecord")
+
+    if batched is None:
+        batched = getattr(settings, "STOCK_ALLOCATION_BATCHED", False)
+    quantities, stockrecords = get_quantities(adjustments)
+    if not quantities:
+        return
+
+    record_ids = sorted(quantities)
+    with transaction.atomic():
+        if batched and len(record_ids) > 1:
+            adjust_batch(quantities, stockrecords, get_values, condition)
+        else:
+            for record_id in record_ids:
+                queryset = StockRecord.objects.filter(pk=record_id)
+                if condition is not None:
+                    queryset = queryset.filter(condition(quantities[record_id]))
+                if not queryset.update(**get_values(quantities[record_id])):
+                    raise InsufficientStock([stockrecords[record_id][0]])
+
+        for record_id in record_ids:
+            stockrecords[record_id][0].pre_save_signal()
+
+    # Bring the instances up to date, as refresh_from_db would
+    fields = list(get_values(0))
+    for values in StockRecord.objects.filter(pk__in=record_ids).values("pk", *fields):
+        for stockrecord in stockrecords[values["pk"]]:
+            for field in fields:
+                setattr(stockrecord, field, values[field])
+
+    for record_id in record_ids:
+        stockrecords[record_id][0].post_save_signal()
+
+
+def adjust_batch(quantities, stockrecords, get_values, condition=None):
+    StockRecord = get_model("partner", "StockRecord")
+
+    queryset = StockRecord.objects.filter(pk__in=quantities)
+    if condition is None:
+        matching = Value(True)
+    else:
+        matching = Case(
+            When(
+                reduce(
+                    or_,
+                    [
+                        Q(pk=record_id) & condition(quantity)
+                        for record_id, quantity in quantities.items()
+                    ],
+                ),
+                then=Value(True),
+            ),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+    locked = dict(
+        queryset.order_by("pk")
+        .select_for_update()
+        .annotate(matching=matching)
+        .values_list("pk", "matching")
+    )
+    failed = [record_id for record_id in quantities if not locked.get(record_id)]
+    if failed:
+        raise InsufficientStock([stockrecords[record_id][0] for record_id in failed])
+
+    values = {}
+    for record_id, quantity in quantities.items():
+        for field, value in get_values(quantity).items():
+            values.setdefault(field, []).append(When(pk=record_id, then=value))
+    queryset.update(
+        **{
+            field: Case(*whens, output_field=IntegerField())
+            for field, whens in values.items()
+        }
+    )
@@ -0,0 +1,15 @@
+from django.utils.translation import gettext_lazy as _
+from oscar.apps.partner.exceptions import InvalidStockAdjustment
+
+
+class InsufficientStock(InvalidStockAdjustment):
+    """
+    Raised when stock records don't have enough stock for an adjustment.
+    """
+
+    def __init__(self, stockrecords):
+        self.stockrecords = stockrecords
+        super().__init__(
+            _("Not enough stock for %(skus)s")
+            % {"skus": ", ".join(record.partner_sku for record in stockrecords)}
+        )
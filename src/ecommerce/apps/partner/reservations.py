@@ -0,0 +1,167 @@
+"""
+Time-limited stock reservations.
+
+Stock is only allocated when an order is placed, so without reservations
+every customer of a sold out product can reach the payment step. Once a
+basket reaches the payment step, its quantities are reserved for
+``STOCK_RESERVATION_TIMEOUT`` seconds. The stock reserved by other baskets
+is left out of the availability of products (see ``StockRequired``) and
+placing the order turns the reservation into an allocation.
+
+Reservations are counters in ``STOCK_RESERVATION_CACHE`` (Redis in
+production), updated with the cache's atomic ``incr``/``decr``. To expire
+without a cleanup job, the counters of a stock record are split in time
+slots of a tenth of the timeout: a reservation increments the counter of
+the current slot, which expires a timeout after the end of the slot, and
+the reserved quantity of a stock record is the sum of its live slots. A
+reservation that would exceed the stock of ``StockRecord`` is undone and
+``InsufficientStock`` is raised.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import prefetch_related_objects
+from oscar.core.loading import get_model
+
+from ecommerce.apps.partner import allocation
+from ecommerce.apps.partner.exceptions import InsufficientStock
+
+# Number of counters a reservation timeout is split in
+SLOTS = 10
+
+
+def get_timeout():
+    return getattr(settings, "STOCK_RESERVATION_TIMEOUT", 0)
+
+
+def is_enabled():
+    return get_timeout() > 0
+
+
+def get_cache():
+    return caches[getattr(settings, "STOCK_RESERVATION_CACHE", "default")]
+
+
+def get_current_slot():
+    return int(time.time() * SLOTS // get_timeout())
+
+
+def get_expiry(slot):
+    """
+    Return the number of seconds the reservations of ``slot`` last for.
+    """
+    timeout = get_timeout()
+    return max(math.ceil((slot + 1) * timeout / SLOTS + timeout - time.time()), 1)
+
+
+def get_counter_key(record_id, slot):
+    return f"stock-reservation:{connection.schema_name}:{record_id}:{slot}"
+
+
+def get_basket_key(basket_id):
+    return f"stock-reservation:{connection.schema_name}:basket:{basket_id}"
+
+
+def get_reserved(record_ids, exclude_basket_id=None):
+    """
+    Return a dict of stock record id -> quantity reserved by baskets, other
+    than the basket ``exclude_basket_id``.
+    """
+    if not is_enabled():
+        return {record_id: 0 for record_id in record_ids}
+
+    cache = get_cache()
+    current = get_current_slot()
+    keys = {
+        get_counter_key(record_id, slot): record_id
+        for record_id in record_ids
+        for slot in range(current - SLOTS, current + 1)
+    }
+    reserved = dict.fromkeys(record_ids, 0)
+    for key, quantity in cache.get_many(list(keys)).items():
+        reserved[keys[key]] += quantity
+
+    if exclude_basket_id is not None:
+        hold = cache.get(get_basket_key(exclude_basket_id))
+        if hold is not None:
+            for record_id, quantity in hold["quantities"].items():
+                if record_id in reserved:
+                    reserved[record_id] -= quantity
+    return reserved
+
+
+def reserve(basket):
+    """
+    Reserve the stock of the lines of ``basket``, replacing the previous
+    reservation of the basket.
+    """
+    StockRecord = get_model("partner", "StockRecord")
+
+    if not is_enabled():
+        return
+    release(basket.pk)
+
+    lines = list(basket.all_lines())
+    prefetch_related_objects(
+        lines,
+        "stockrecord__product__product_class",
+        "stockrecord__product__parent__product_class",
+    )
+    quantities, stockrecords = allocation.get_quantities(
+        (line.stockrecord, line.quantity) for line in lines
+    )
+    if not quantities:
+        return
+    available = {
+        record_id: (num_in_stock or 0) - (num_allocated or 0)
+        for record_id, num_in_stock, num_allocated in StockRecord.objects.filter(
+            pk__in=quantities
+        ).values_list("pk", "num_in_stock", "num_allocated")
+    }
+
+    cache = get_cache()
+    slot = get_current_slot()
+    expiry = get_expiry(slot)
+    reserved = []
+    try:
+        for record_id in sorted(quantities):
+            key = get_counter_key(record_id, slot)
+            cache.add(key, 0, expiry)
+            cache.incr(key, quantities[record_id])
+            reserved.append(record_id)
+            if get_reserved([record_id])[record_id] > available.get(record_id, 0):
+                raise InsufficientStock([stockrecords[record_id][0]])
+    except InsufficientStock:
+        for record_id in reserved:
+            decrement(get_counter_key(record_id, slot), quantities[record_id])
+        raise
+    cache.set(
+        get_basket_key(basket.pk), {"slot": slot, "quantities": quantities}, expiry
+    )
+
+
+def release(basket_id):
+    """
+    Cancel the reservation of a basket, if it has one.
+    """
+    if not is_enabled():
+        return
+    cache = get_cache()
+    key = get_basket_key(basket_id)
+    hold = cache.get(key)
+    if hold is None:
+        return
+    for record_id, quantity in hold["quantities"].items():
+        decrement(get_counter_key(record_id, hold["slot"]), quantity)
+    cache.delete(key)
+
+
+def decrement(key, quantity):
+    try:
+        get_cache().decr(key, quantity)
+    except ValueError:
+        # The counter expired in the meantime
+        pass
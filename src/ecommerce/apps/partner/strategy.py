@@ -1,7 +1,10 @@
 from collections import namedtuple
 from decimal import Decimal as D
 
-from oscar.core.loading import get_class
+from django.db.models import Prefetch, prefetch_related_objects
+from oscar.core.loading import get_class, get_model
+
+from ecommerce.apps.partner import reservations
 
 Unavailable = get_class("partner.availability", "Unavailable")
 Available = get_class("partner.availability", "Available")
@@ -13,6 +16,9 @@ TaxInclusiveFixedPrice = get_class("partner.prices", "TaxInclusiveFixedPrice")
 # A container for policies
 PurchaseInfo = namedtuple("PurchaseInfo", ["price", "availability", "stockrecord"])
 
+# Attribute the public children of a parent product are prefetched to
+PUBLIC_CHILDREN_ATTR = "_strategy_public_children"
+
 
 class Selector(object):
     """
@@ -89,6 +95,19 @@ class Base(object):
             "information."
         )
 
+    def fetch_for_products(self, products):
+        """
+        Given several products, return a dict of product -> ``PurchaseInfo``.
+        """
+        return {product: self.fetch_for_product(product) for product in products}
+
+    def fetch_for_parents(self, products):
+        """
+        Given several parent products, return a dict of product ->
+        ``PurchaseInfo``.
+        """
+        return {product: self.fetch_for_parent(product) for product in products}
+
     def fetch_for_line(self, line, stockrecord=None):
         """
         Given a basket line instance, fetch a ``PurchaseInfo`` instance.
@@ -137,6 +156,47 @@ class Structured(Base):
             stockrecord=None,
         )
 
+    def fetch_for_products(self, products):
+        """
+        Return a dict of product -> ``PurchaseInfo``, loading the
+        stockrecords and product classes of all products in a fixed number of
+        queries.
+        """
+        products = list(products)
+        self.prefetch_for_products(products)
+        return super().fetch_for_products(products)
+
+    def fetch_for_parents(self, products):
+        """
+        Return a dict of parent product -> ``PurchaseInfo``, loading the
+        public children of all products and their stockrecords in a fixed
+        number of queries.
+        """
+        products = list(products)
+        self.prefetch_for_parents(products)
+        return super().fetch_for_parents(products)
+
+    def prefetch_for_products(self, products):
+        """
+        Prefetch what the policies need so that ``fetch_for_product`` doesn't
+        query the database for each product.
+        """
+        prefetch_related_objects(
+            products, "stockrecords", "product_class", "parent__product_class"
+        )
+
+    def prefetch_for_parents(self, products):
+        Product = get_model("catalogue", "Product")
+        prefetch_related_objects(
+            products,
+            "product_class",
+            Prefetch(
+                "children",
+                queryset=Product.objects.public().prefetch_related("stockrecords"),
+                to_attr=PUBLIC_CHILDREN_ATTR,
+            ),
+        )
+
     def select_stockrecord(self, product):
         """
         Select the appropriate stockrecord
@@ -150,7 +210,10 @@ class Structured(Base):
         Select appropriate stock record for all children of a product
         """
         records = []
-        for child in product.children.public():
+        children = getattr(product, PUBLIC_CHILDREN_ATTR, None)
+        if children is None:
+            children = product.children.public()
+        for child in children:
             # Use tuples of (child product, stockrecord)
             records.append((child, self.select_stockrecord(child)))
         return records
@@ -207,18 +270,96 @@ class StockRequired(object):
     available (if stock is being tracked).
     """
 
-    def availability_policy(self, product, stockrecord):
+    # Stock reserved by any basket, per stock record id, loaded for all the
+    # products of fetch_for_products and fetch_for_parents at once
+    _reserved = None
+
+    def fetch_for_products(self, products):
+        try:
+            return super().fetch_for_products(products)
+        finally:
+            self._reserved = None
+
+    def fetch_for_parents(self, products):
+        try:
+            return super().fetch_for_parents(products)
+        finally:
+            self._reserved = None
+
+    def prefetch_for_products(self, products):
+        super().prefetch_for_products(products)
+        self.prefetch_reserved(
+            [self.select_stockrecord(product) for product in products]
+        )
+
+    def prefetch_for_parents(self, products):
+        super().prefetch_for_parents(products)
+        self.prefetch_reserved(
+            [
+                stockrecord
+                for product in products
+                for __, stockrecord in self.select_children_stockrecords(product)
+            ]
+        )
+
+    def prefetch_reserved(self, stockrecords):
+        """
+        Load the stock reserved for all of ``stockrecords`` with a single
+        lookup, instead of one per product.
+        """
+        self._reserved = reservations.get_reserved(
+            {stockrecord.pk for stockrecord in stockrecords if stockrecord}
+        )
+
+    def fetch_for_line(self, line, stockrecord=None):
+        # The stock reserved for the line's own basket is available to it
+        product = line.product
+        stockrecord = self.select_stockrecord(product)
+        return PurchaseInfo(
+            price=self.pricing_policy(product, stockrecord),
+            availability=self.availability_policy(
+                product, stockrecord, basket_id=line.basket_id
+            ),
+            stockrecord=stockrecord,
+        )
+
+    def fetch_for_parent(self, product, basket_id=None):
+        children_stock = self.select_children_stockrecords(product)
+        return PurchaseInfo(
+            price=self.parent_pricing_policy(product, children_stock),
+            availability=self.parent_availability_policy(
+                product, children_stock, basket_id=basket_id
+            ),
+            stockrecord=None,
+        )
+
+    def availability_policy(self, product, stockrecord, basket_id=None):
         if not stockrecord:
             return Unavailable()
         if not product.get_product_class().track_stock:
             return Available()
         else:
-            return StockRequiredAvailability(stockrecord.net_stock_level)
+            return StockRequiredAvailability(
+                self.get_stock_level(stockrecord, basket_id)
+            )
 
-    def parent_availability_policy(self, product, children_stock):
+    def get_stock_level(self, stockrecord, basket_id=None):
+        """
+        Return the net stock level of ``stockrecord``, less the stock
+        reserved by baskets other than ``basket_id`` (see
+        ``partner.reservations``).
+        """
+        if basket_id is None and self._reserved is not None:
+            reserved = self._reserved.get(stockrecord.pk)
+            if reserved is not None:
+                return stockrecord.net_stock_level - reserved
+        reserved = reservations.get_reserved([stockrecord.pk], basket_id)
+        return stockrecord.net_stock_level - reserved[stockrecord.pk]
+
+    def parent_availability_policy(self, product, children_stock, basket_id=None):
         # A parent product is available if one of its children is
         for child, stockrecord in children_stock:
-            policy = self.availability_policy(child, stockrecord)
+            policy = self.availability_policy(child, stockrecord, basket_id=basket_id)
             if policy.is_available_to_buy:
                 return Available()
         return Unavailable()
@@ -0,0 +1,210 @@
+"""
+Benchmark of the stock allocation engine.
+
+Allocates the stock of a few products from many threads at once, in every
+allocation mode, and checks that none of it is oversold. The products are
+created in the test tenant and committed, so that the threads (which have
+their own connections) see them, and deleted afterwards.
+
+The module isn't collected by the normal test run. Run it explicitly, in a
+single process::
+
+    pytest ecommerce/apps/partner/tests/bench_stock_allocation.py -n 0
+
+The modes are set with ``STOCK_BENCHMARK_MODES`` (comma separated, all of
+them by default), the size of the run with ``STOCK_BENCHMARK_WORKERS``,
+``STOCK_BENCHMARK_ORDERS``, ``STOCK_BENCHMARK_LINES``,
+``STOCK_BENCHMARK_PRODUCTS`` and ``STOCK_BENCHMARK_STOCK``, and the results
+are written to ``STOCK_BENCHMARK_OUTPUT`` (``stock-benchmark.json`` by
+default).
+"""
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DatabaseError, connection, transaction
+from oscar.core.loading import get_model
+
+from ecommerce.apps.partner import allocation
+from ecommerce.apps.partner.exceptions import InsufficientStock
+from ecommerce.test.benchmark import BenchmarkRecorder
+from ecommerce.test.testcases import TestCase
+
+Partner = get_model("partner", "Partner")
+Product = get_model("catalogue", "Product")
+ProductClass = get_model("catalogue", "ProductClass")
+StockRecord = get_model("partner", "StockRecord")
+
+# Per stock record, like StockRecord.allocate, in the order of the lines
+OSCAR = "oscar"
+UNCHECKED = "unchecked"
+STRICT = "strict"
+BATCHED = "batched"
+MODES = [OSCAR, UNCHECKED, STRICT, BATCHED]
+
+ALLOCATED, SOLD_OUT, FAILED = "allocated", "sold out", "failed"
+
+
+def get_setting(name, default):
+    return int(os.environ.get(name) or default)
+
+
+class StockAllocationBenchmark(TestCase):
+    modes = (os.environ.get("STOCK_BENCHMARK_MODES") or ",".join(MODES)).split(",")
+    workers = get_setting("STOCK_BENCHMARK_WORKERS", 32)
+    orders = get_setting("STOCK_BENCHMARK_ORDERS", 1000)
+    lines = get_setting("STOCK_BENCHMARK_LINES", 3)
+    products = get_setting("STOCK_BENCHMARK_PRODUCTS", 5)
+    stock = get_setting("STOCK_BENCHMARK_STOCK", 200)
+    output = os.environ.get("STOCK_BENCHMARK_OUTPUT", "stock-benchmark.json")
+
+    def setUp(self):
+        self.recorder = BenchmarkRecorder("stock-allocation")
+
+    def run_committed(self, func, *args):
+        """
+        Run ``func`` on a connection of its own, outside of the transaction
+        of the test.
+        """
+        tenant = connection.tenant
+
+        def run():
+            connection.set_tenant(tenant)
+            try:
+                return func(*args)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(run).result()
+
+    def test_stock_allocation(self):
+        self.assertLessEqual(self.lines, self.products)
+        for mode in self.modes:
+            with self.subTest(mode=mode):
+                record_ids = self.run_committed(self.create_stockrecords)
+                try:
+                    outcomes, durations = self.place_orders(mode, record_ids)
+                    result = self.run_committed(
+                        self.verify, mode, record_ids, outcomes, durations
+                    )
+                finally:
+                    self.run_committed(self.delete_stockrecords, record_ids)
+
+                if mode not in (OSCAR, UNCHECKED):
+                    self.assertEqual(result["oversold"], 0)
+                    self.assertEqual(result["mismatched"], 0)
+        self.recorder.write(self.output)
+
+    def create_stockrecords(self):
+        product_class = ProductClass.objects.create(
+            name="Stock allocation benchmark", track_stock=True
+        )
+        partner = Partner.objects.create(name="Stock allocation benchmark")
+        record_ids = []
+        for index in range(self.products):
+            product = Product.objects.create(
+                product_class=product_class, title=f"Benchmark product {index}"
+            )
+            record_ids.append(
+                StockRecord.objects.create(
+                    product=product,
+                    partner=partner,
+                    partner_sku=f"stock-allocation-benchmark-{index}",
+                    num_in_stock=self.stock,
+                    num_allocated=0,
+                ).pk
+            )
+        return record_ids
+
+    def delete_stockrecords(self, record_ids):
+        stockrecords = StockRecord.objects.filter(pk__in=record_ids)
+        product_class_ids = set(
+            stockrecords.values_list("product__product_class", flat=True)
+        )
+        partner_ids = set(stockrecords.values_list("partner", flat=True))
+        Product.objects.filter(stockrecords__in=record_ids).delete()
+        ProductClass.objects.filter(pk__in=product_class_ids).delete()
+        Partner.objects.filter(pk__in=partner_ids).delete()
+
+    def place_orders(self, mode, record_ids):
+        tenant = connection.tenant
+
+        def place_order(index):
+            # Every thread has its own connection
+            connection.set_tenant(tenant)
+            # Lines come in any order, so that a lock order can't be relied on
+            stockrecords = list(
+                StockRecord.objects.select_related("product__product_class").filter(
+                    pk__in=random.sample(record_ids, self.lines)
+                )
+            )
+            random.shuffle(stockrecords)
+
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    self.allocate(mode, stockrecords)
+                outcome = ALLOCATED, [record.pk for record in stockrecords]
+            except InsufficientStock:
+                outcome = SOLD_OUT, []
+            except DatabaseError:
+                # Deadlocks
+                outcome = FAILED, []
+            finally:
+                duration = time.perf_counter() - started
+                connection.close()
+            return outcome, duration
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(place_order, range(self.orders)))
+        return [outcome for outcome, __ in results], [
+            duration for __, duration in results
+        ]
+
+    def allocate(self, mode, stockrecords):
+        if mode == OSCAR:
+            for stockrecord in stockrecords:
+                stockrecord.allocate(1)
+        else:
+            allocation.allocate(
+                [(stockrecord, 1) for stockrecord in stockrecords],
+                strict=mode != UNCHECKED,
+                batched=mode == BATCHED,
+            )
+
+    def verify(self, mode, record_ids, outcomes, durations):
+        statuses = Counter(status for status, __ in outcomes)
+        expected = Counter()
+        for status, allocated_ids in outcomes:
+            for record_id in allocated_ids:
+                expected[record_id] += 1
+
+        oversold = mismatched = 0
+        for record_id, num_in_stock, num_allocated in StockRecord.objects.filter(
+            pk__in=record_ids
+        ).values_list("pk", "num_in_stock", "num_allocated"):
+            oversold += num_allocated > num_in_stock
+            mismatched += num_allocated != expected[record_id]
+
+        result = self.recorder.record(
+            "allocate",
+            durations,
+            mode=mode,
+            workers=self.workers,
+            lines=self.lines,
+            products=self.products,
+        )
+        result.update(
+            {
+                "orders": len(outcomes),
+                "allocated": statuses[ALLOCATED],
+                "sold_out": statuses[SOLD_OUT],
+                "failed": statuses[FAILED],
+                "oversold": oversold,
+                "mismatched": mismatched,
+            }
+        )
+        return result
@@ -0,0 +1,136 @@
+from decimal import Decimal as D
+from unittest import mock
+
+from django.db import connection
+from django.db.models.signals import post_save, pre_save
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from oscar.core.loading import get_model
+
+from ecommerce.apps.partner import allocation
+from ecommerce.apps.partner.exceptions import InsufficientStock
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+StockRecord = get_model("partner", "StockRecord")
+
+
+class TestAllocation(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = factories.create_stockrecord(
+            factories.create_product(), price=D("10.00"), num_in_stock=10
+        )
+        self.second = factories.create_stockrecord(
+            factories.create_product(), price=D("10.00"), num_in_stock=3
+        )
+
+    def get_allocated(self):
+        return [
+            StockRecord.objects.get(pk=record.pk).num_allocated
+            for record in (self.first, self.second)
+        ]
+
+    def test_sums_quantities_per_stockrecord(self):
+        allocation.allocate([(self.first, 2), (self.second, 1), (self.first, 3)])
+
+        self.assertEqual(self.get_allocated(), [5, 1])
+        self.assertEqual(self.first.num_allocated, 5)
+
+    def test_allocates_beyond_stock_unless_strict(self):
+        allocation.allocate([(self.second, 5)], strict=False)
+
+        self.assertEqual(self.get_allocated(), [None, 5])
+
+    def test_strict_allocation_fails_without_stock(self):
+        for batched in (False, True):
+            with self.subTest(batched=batched):
+                with self.assertRaises(InsufficientStock) as context:
+                    allocation.allocate(
+                        [(self.first, 2), (self.second, 4)],
+                        strict=True,
+                        batched=batched,
+                    )
+
+                self.assertEqual(context.exception.stockrecords, [self.second])
+                self.assertEqual(self.get_allocated(), [None, None])
+
+    def test_strict_allocation_counts_allocated_stock(self):
+        allocation.allocate([(self.second, 2)], strict=True)
+
+        with self.assertRaises(InsufficientStock):
+            allocation.allocate([(self.second, 2)], strict=True)
+        allocation.allocate([(self.second, 1)], strict=True)
+        self.assertEqual(self.get_allocated(), [None, 3])
+
+    @override_settings(STOCK_ALLOCATION_STRICT=True, STOCK_ALLOCATION_BATCHED=True)
+    def test_batched_allocation(self):
+        with CaptureQueriesContext(connection) as context:
+            allocation.allocate([(self.first, 2), (self.second, 3)])
+
+        updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "partner_stockrecord"')
+        ]
+        self.assertEqual(len(updates), 1)
+
+        self.assertEqual(self.get_allocated(), [2, 3])
+        self.assertEqual(self.second.num_allocated, 3)
+
+    def test_skips_products_that_dont_track_stock(self):
+        product_class = self.first.product.get_product_class()
+        product_class.track_stock = False
+        product_class.save()
+
+        allocation.allocate([(self.first, 20), (None, 1)], strict=True)
+
+        self.assertEqual(self.get_allocated(), [None, None])
+
+    def test_sends_save_signals(self):
+        receiver = mock.Mock()
+        post_save.connect(receiver, sender=StockRecord)
+        self.addCleanup(post_save.disconnect, receiver, sender=StockRecord)
+
+        allocation.allocate([(self.first, 1), (self.second, 1), (self.first, 1)])
+
+        self.assertEqual(
+            [call.kwargs["instance"] for call in receiver.call_args_list],
+            [self.first, self.second],
+        )
+
+    def test_failed_allocation_sends_no_signals(self):
+        receiver = mock.Mock()
+        pre_save.connect(receiver, sender=StockRecord)
+        self.addCleanup(pre_save.disconnect, receiver, sender=StockRecord)
+
+        for batched in (False, True):
+            with self.subTest(batched=batched):
+                with self.assertRaises(InsufficientStock):
+                    allocation.allocate(
+                        [(self.first, 1), (self.second, 4)], batched=batched
+                    )
+
+                receiver.assert_not_called()
+
+    def test_consume(self):
+        allocation.allocate([(self.first, 5), (self.second, 2)])
+        allocation.consume([(self.first, 3), (self.second, 2)], batched=True)
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.num_allocated, self.first.num_in_stock), (2, 7))
+        self.assertEqual((self.second.num_allocated, self.second.num_in_stock), (0, 1))
+
+    def test_consume_fails_without_allocation(self):
+        allocation.allocate([(self.first, 1)])
+
+        with self.assertRaises(InsufficientStock):
+            allocation.consume([(self.first, 1), (self.second, 1)])
+        self.assertEqual(self.get_allocated(), [1, None])
+
+    def test_cancel(self):
+        allocation.allocate([(self.first, 5), (self.second, 2)])
+        allocation.cancel([(self.first, 4), (self.second, 3)])
+
+        self.assertEqual(self.get_allocated(), [1, 0])
@@ -0,0 +1,159 @@
+import time
+from decimal import Decimal as D
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from oscar.core.loading import get_model
+
+from ecommerce.apps.checkout.exceptions import FailedPreCondition
+from ecommerce.apps.checkout.session import CheckoutSessionMixin
+from ecommerce.apps.partner import reservations, strategy
+from ecommerce.apps.partner.exceptions import InsufficientStock
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+StockRecord = get_model("partner", "StockRecord")
+
+
+class TestReservations(TestCase):
+    def setUp(self):
+        super().setUp()
+        settings = override_settings(
+            STOCK_RESERVATION_TIMEOUT=600, STOCK_RESERVATION_CACHE="default"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(cache.clear)
+
+        self.product = factories.create_product()
+        self.stockrecord = factories.create_stockrecord(
+            self.product, price=D("10.00"), num_in_stock=5
+        )
+        self.basket = self.create_basket(3)
+        self.other_basket = self.create_basket(2)
+
+    def create_basket(self, quantity):
+        basket = factories.create_basket(empty=True)
+        basket.add_product(self.product, quantity)
+        return basket
+
+    def get_reserved(self, basket_id=None):
+        return reservations.get_reserved([self.stockrecord.pk], basket_id)[
+            self.stockrecord.pk
+        ]
+
+    def get_stock_level(self, basket):
+        line = basket.all_lines()[0]
+        return strategy.Default().fetch_for_line(line).availability.num_available
+
+    def test_reservation_holds_stock_for_other_baskets(self):
+        reservations.reserve(self.basket)
+
+        self.assertEqual(self.get_reserved(), 3)
+        self.assertEqual(self.get_stock_level(self.basket), 5)
+        self.assertEqual(self.get_stock_level(self.other_basket), 2)
+        self.assertEqual(
+            strategy.Default()
+            .fetch_for_product(self.product)
+            .availability.num_available,
+            2,
+        )
+
+    def test_batch_fetches_look_reservations_up_once(self):
+        reservations.reserve(self.basket)
+        other = factories.create_product(price=D("10.00"), num_in_stock=4)
+        parent = factories.create_product(structure="parent")
+        factories.create_product(parent=parent, price=D("10.00"), num_in_stock=3)
+
+        with mock.patch.object(
+            reservations, "get_reserved", wraps=reservations.get_reserved
+        ) as get_reserved:
+            infos = strategy.Default().fetch_for_products([self.product, other])
+            strategy.Default().fetch_for_parents([parent])
+
+        self.assertEqual(get_reserved.call_count, 2)
+        self.assertEqual(infos[self.product].availability.num_available, 2)
+        self.assertEqual(infos[other].availability.num_available, 4)
+
+    def test_parent_availability_excludes_own_basket(self):
+        parent = factories.create_product(structure="parent")
+        child = factories.create_product(
+            parent=parent, price=D("10.00"), num_in_stock=3
+        )
+        basket = factories.create_basket(empty=True)
+        basket.add_product(child, 3)
+        reservations.reserve(basket)
+        children_stock = [(child, child.stockrecords.get())]
+
+        self.assertFalse(
+            strategy.Default()
+            .parent_availability_policy(parent, children_stock)
+            .is_available_to_buy
+        )
+        self.assertTrue(
+            strategy.Default()
+            .parent_availability_policy(parent, children_stock, basket_id=basket.pk)
+            .is_available_to_buy
+        )
+
+    def test_reserving_again_replaces_reservation(self):
+        reservations.reserve(self.basket)
+        reservations.reserve(self.basket)
+
+        self.assertEqual(self.get_reserved(), 3)
+        self.assertEqual(self.get_reserved(self.basket.pk), 0)
+
+    def test_fails_when_stock_is_reserved(self):
+        reservations.reserve(self.basket)
+
+        with self.assertRaises(InsufficientStock):
+            reservations.reserve(self.create_basket(3))
+        self.assertEqual(self.get_reserved(), 3)
+
+    def test_counts_allocated_stock(self):
+        StockRecord.objects.filter(pk=self.stockrecord.pk).update(num_allocated=3)
+
+        with self.assertRaises(InsufficientStock):
+            reservations.reserve(self.basket)
+        reservations.reserve(self.other_basket)
+
+    def test_release(self):
+        reservations.reserve(self.basket)
+        reservations.release(self.basket.pk)
+
+        self.assertEqual(self.get_reserved(), 0)
+
+    def test_reservations_expire(self):
+        reservations.reserve(self.basket)
+        later = time.time() + 2 * 600
+
+        with mock.patch("time.time", return_value=later):
+            self.assertEqual(self.get_reserved(), 0)
+
+    def test_placing_order_releases_reservation(self):
+        reservations.reserve(self.basket)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            factories.create_order(basket=self.basket)
+
+        self.assertEqual(self.get_reserved(), 0)
+        self.assertEqual(
+            StockRecord.objects.get(pk=self.stockrecord.pk).num_allocated, 3
+        )
+
+    def test_checkout_reserves_stock(self):
+        request = mock.Mock(basket=self.other_basket)
+        CheckoutSessionMixin().check_basket_stock_is_reserved(request)
+
+        request.basket = self.create_basket(4)
+        with self.assertRaises(FailedPreCondition) as context:
+            CheckoutSessionMixin().check_basket_stock_is_reserved(request)
+        self.assertEqual(len(context.exception.messages), 1)
+
+    @override_settings(STOCK_RESERVATION_TIMEOUT=0)
+    def test_disabled(self):
+        reservations.reserve(self.basket)
+        reservations.reserve(self.other_basket)
+
+        self.assertEqual(self.get_reserved(), 0)
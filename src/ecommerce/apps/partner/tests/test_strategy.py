@@ -0,0 +1,79 @@
+from decimal import Decimal as D
+
+from oscar.core.loading import get_model
+
+from ecommerce.apps.partner import strategy
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+Product = get_model("catalogue", "Product")
+
+
+class TH(strategy.TH):
+    pass
+
+
+class TestBatchPurchaseInfo(TestCase):
+    def setUp(self):
+        self.products = [
+            factories.create_product(price=D("10.00"), num_in_stock=index)
+            for index in range(3)
+        ]
+        self.products.append(factories.create_product())
+        self.parents = []
+        for __ in range(2):
+            parent = factories.create_product(structure="parent")
+            for price in (D("5.00"), D("7.00")):
+                factories.create_product(parent=parent, price=price, num_in_stock=3)
+            self.parents.append(parent)
+
+    def assertSamePurchaseInfo(self, batch, single):
+        self.assertEqual(batch.stockrecord, single.stockrecord)
+        self.assertEqual(type(batch.price), type(single.price))
+        self.assertEqual(batch.price.exists, single.price.exists)
+        if single.price.exists:
+            self.assertEqual(batch.price.excl_tax, single.price.excl_tax)
+            self.assertEqual(batch.price.is_tax_known, single.price.is_tax_known)
+        self.assertEqual(
+            batch.availability.is_available_to_buy,
+            single.availability.is_available_to_buy,
+        )
+
+    def test_fetch_for_products_matches_single_fetch(self):
+        for strategy_class in (strategy.Default, strategy.UK, TH):
+            with self.subTest(strategy_class.__name__):
+                products = Product.objects.filter(
+                    pk__in=[product.pk for product in self.products]
+                )
+                infos = strategy_class().fetch_for_products(products)
+
+                self.assertEqual(len(infos), len(self.products))
+                for product in self.products:
+                    self.assertSamePurchaseInfo(
+                        infos[product], strategy_class().fetch_for_product(product)
+                    )
+
+    def test_fetch_for_parents_matches_single_fetch(self):
+        for strategy_class in (strategy.Default, strategy.UK, TH):
+            with self.subTest(strategy_class.__name__):
+                parents = Product.objects.filter(
+                    pk__in=[parent.pk for parent in self.parents]
+                )
+                infos = strategy_class().fetch_for_parents(parents)
+
+                for parent in self.parents:
+                    self.assertSamePurchaseInfo(
+                        infos[parent], strategy_class().fetch_for_parent(parent)
+                    )
+
+    def test_fetch_for_products_uses_fixed_number_of_queries(self):
+        products = Product.objects.filter(
+            pk__in=[product.pk for product in self.products]
+        )
+        with self.assertNumQueries(3):
+            strategy.Default().fetch_for_products(products)
+
+    def test_fetch_for_parents_uses_fixed_number_of_queries(self):
+        parents = Product.objects.filter(pk__in=[parent.pk for parent in self.parents])
+        with self.assertNumQueries(4):
+            strategy.Default().fetch_for_parents(parents)
@@ -0,0 +1,17 @@
+import pytest
+from django.test import override_settings
+
+
+@pytest.fixture(scope="session", autouse=True)
+def local_shared_caches():
+    """
+    Keep the caches that are shared between servers in production local to
+    the test process, so that tests never see each other's entries.
+    """
+    with override_settings(
+        BASKET_SNAPSHOT_CACHE="default",
+        ORDER_ROLLUP_CACHE="default",
+        STOCK_RESERVATION_CACHE="default",
+        TENANT_FAN_OUT_CACHE="default",
+    ):
+        yield
@@ -1,18 +1,76 @@
 import functools
+import time
+import uuid
 
+from celery.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
 from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import caches
 from django.db import connection
-from django_tenants.utils import get_tenant_model, tenant_context
+from django_tenants.utils import (
+    get_public_schema_name,
+    get_tenant_model,
+    schema_context,
+    tenant_context,
+)
 
 from ecommerce.core.celery.celery import app
 
 logger = get_task_logger(__name__)
 
+TENANT_SUCCESS, TENANT_FAILED, TENANT_TIMEOUT = "success", "failed", "timeout"
+
+# Seconds a fanned-out tenant subtask gets after its soft time limit before
+# the worker kills it.
+TENANT_HARD_TIME_LIMIT_GRACE = 30
+
+# Seconds the outcomes of the lanes of a fanned-out task are kept for
+TENANT_FAN_OUT_TIMEOUT = 24 * 60 * 60
+
+
+def get_tenant_schema_names():
+    return list(
+        get_tenant_model()
+        .objects.exclude(schema_name=get_public_schema_name())
+        .values_list("schema_name", flat=True)
+    )
+
+
+def tenant_aware_periodic_task(
+    func=None, *, fan_out=False, max_concurrency=None, tenant_time_limit=None
+):
+    """
+    Run ``func`` once for every non-public tenant.
+
+    By default the tenants are processed one after another by the task that
+    was called. With ``fan_out=True`` one subtask is sent per tenant instead:
+    at most ``max_concurrency`` of them run at the same time (see
+    ``send_tenant_lanes``), each one gets ``tenant_time_limit`` seconds and
+    the outcome of all tenants is collected by ``summarize_tenant_results``.
+
+    Usage::
+
+        @app.task
+        @tenant_aware_periodic_task(fan_out=True, max_concurrency=10)
+        def nightly_job():
+            ...
+    """
+    if func is None:
+        return functools.partial(
+            tenant_aware_periodic_task,
+            fan_out=fan_out,
+            max_concurrency=max_concurrency,
+            tenant_time_limit=tenant_time_limit,
+        )
+
+    if fan_out:
+        return fan_out_tenant_task(func, max_concurrency, tenant_time_limit)
 
-def tenant_aware_periodic_task(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        for tenant in get_tenant_model().objects.exclude(schema_name="public"):
+        for tenant in get_tenant_model().objects.exclude(
+            schema_name=get_public_schema_name()
+        ):
             with tenant_context(tenant):
                 try:
                     func(*args, **kwargs)
@@ -22,6 +80,188 @@ def tenant_aware_periodic_task(func):
     return wrapper
 
 
+def fan_out_tenant_task(func, max_concurrency=None, tenant_time_limit=None):
+    """
+    Register a task that runs ``func`` for a single tenant and return a
+    function that sends it for every non-public tenant.
+    """
+    task_name = f"{func.__module__}.{func.__name__}_for_tenant"
+
+    @app.task(name=task_name)
+    def run_for_tenant(schema_name, *args, **kwargs):
+        started = time.monotonic()
+        outcome = {
+            "schema_name": schema_name,
+            "status": TENANT_SUCCESS,
+            "result": None,
+            "error": None,
+        }
+        try:
+            tenant = get_tenant_model().objects.get(schema_name=schema_name)
+            with tenant_context(tenant):
+                outcome["result"] = func(*args, **kwargs)
+        except SoftTimeLimitExceeded:
+            logger.error(f"{func} periodic task timed out on {schema_name}")
+            outcome["status"] = TENANT_TIMEOUT
+            outcome["error"] = f"Exceeded {tenant_time_limit} seconds"
+        except Exception as error:
+            logger.exception(f"{func} periodic task error on {schema_name}")
+            outcome["status"] = TENANT_FAILED
+            outcome["error"] = repr(error)
+        outcome["duration"] = time.monotonic() - started
+        return outcome
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        send_tenant_lanes(
+            task_name,
+            get_tenant_schema_names(),
+            list(args),
+            kwargs,
+            max_concurrency,
+            tenant_time_limit,
+        )
+
+    wrapper.tenant_task = run_for_tenant
+    return wrapper
+
+
+def get_fan_out_cache():
+    return caches[getattr(settings, "TENANT_FAN_OUT_CACHE", "default")]
+
+
+def send_tenant_lanes(
+    task_name, schema_names, args, kwargs, max_concurrency, tenant_time_limit
+):
+    """
+    Split the tenants in at most ``max_concurrency`` lanes and start them.
+
+    Every lane sends its next tenant as soon as the previous one is done, so
+    a slow tenant only holds up the tenants of its own lane. The outcomes of
+    a lane travel along with it and the last lane to finish summarises them
+    all, see ``finish_tenant_lane``.
+    """
+    if not schema_names:
+        return summarize_tenant_results([], task_name)
+
+    lane_count = min(max_concurrency or len(schema_names), len(schema_names))
+    fan_out = {
+        "id": uuid.uuid4().hex,
+        "task_name": task_name,
+        "lanes": lane_count,
+        "args": args,
+        "kwargs": kwargs,
+        "time_limit": tenant_time_limit,
+    }
+    with schema_context(get_public_schema_name()):
+        get_fan_out_cache().set(
+            f"tenant-fan-out:{fan_out['id']}", 0, TENANT_FAN_OUT_TIMEOUT
+        )
+    for lane in range(lane_count):
+        send_next_tenant(fan_out, lane, schema_names[lane::lane_count], [])
+
+
+def send_next_tenant(fan_out, lane, pending, outcomes):
+    if not pending:
+        return finish_tenant_lane(fan_out, lane, outcomes)
+
+    schema_name, pending = pending[0], pending[1:]
+    options = {}
+    if fan_out["time_limit"]:
+        options = {
+            "soft_time_limit": fan_out["time_limit"],
+            "time_limit": fan_out["time_limit"] + TENANT_HARD_TIME_LIMIT_GRACE,
+        }
+    app.signature(
+        fan_out["task_name"],
+        args=[schema_name, *fan_out["args"]],
+        kwargs=fan_out["kwargs"],
+        **options,
+    ).apply_async(
+        link=continue_tenant_lane.s(fan_out, lane, pending, outcomes),
+        link_error=continue_tenant_lane_after_error.s(
+            fan_out, lane, schema_name, pending, outcomes
+        ),
+    )
+
+
+@app.task
+def continue_tenant_lane(outcome, fan_out, lane, pending, outcomes):
+    return send_next_tenant(fan_out, lane, pending, [*outcomes, outcome])
+
+
+@app.task
+def continue_tenant_lane_after_error(
+    request, exc, traceback, fan_out, lane, schema_name, pending, outcomes
+):
+    """
+    Record a tenant whose task didn't return, e.g. because the worker killed
+    it after its hard time limit, and carry on with the rest of the lane.
+    """
+    logger.error(f"{fan_out['task_name']} was killed on {schema_name}: {exc!r}")
+    outcome = {
+        "schema_name": schema_name,
+        "status": TENANT_FAILED,
+        "result": None,
+        "error": repr(exc),
+        "duration": 0,
+    }
+    if isinstance(exc, TimeLimitExceeded):
+        outcome["status"] = TENANT_TIMEOUT
+        # Without a tenant time limit the task ran into the worker's one
+        if fan_out["time_limit"]:
+            outcome["duration"] = fan_out["time_limit"] + TENANT_HARD_TIME_LIMIT_GRACE
+        else:
+            outcome["duration"] = app.conf.task_time_limit or 0
+    return send_next_tenant(fan_out, lane, pending, [*outcomes, outcome])
+
+
+def finish_tenant_lane(fan_out, lane, outcomes):
+    """
+    Store the outcomes of a finished lane and summarise the outcomes of all
+    lanes once it is the last one.
+    """
+    cache = get_fan_out_cache()
+    key = f"tenant-fan-out:{fan_out['id']}"
+    with schema_context(get_public_schema_name()):
+        cache.set(f"{key}:{lane}", outcomes, TENANT_FAN_OUT_TIMEOUT)
+        if cache.incr(key) < fan_out["lanes"]:
+            return None
+        lanes = cache.get_many([f"{key}:{index}" for index in range(fan_out["lanes"])])
+        cache.delete_many([key, *lanes])
+    results = [outcome for outcomes in lanes.values() for outcome in outcomes]
+    return summarize_tenant_results(results, fan_out["task_name"])
+
+
+@app.task
+def summarize_tenant_results(results, task_name):
+    """
+    Aggregate the outcome of a fanned-out periodic task.
+    """
+    failures = [outcome for outcome in results if outcome["status"] != TENANT_SUCCESS]
+    durations = [outcome["duration"] for outcome in results]
+    summary = {
+        "task": task_name,
+        "total": len(results),
+        "succeeded": len(results) - len(failures),
+        "failed": len(failures),
+        "failures": {
+            outcome["schema_name"]: f"{outcome['status']}: {outcome['error']}"
+            for outcome in failures
+        },
+        "slowest_duration": max(durations, default=0),
+        "total_duration": sum(durations),
+    }
+    if failures:
+        logger.error(
+            f"{task_name} failed on {len(failures)} of {len(results)} tenants: "
+            f"{summary['failures']}"
+        )
+    else:
+        logger.info(f"{task_name} succeeded on all {len(results)} tenants")
+    return summary
+
+
 @app.task
 @tenant_aware_periodic_task
 def test_tenant_ware_periodic_test():
@@ -1,26 +1,266 @@
+"""
+Work done in the background once an order is placed.
+
+Placing an order only writes the order; the rest of the work is split in
+steps that are sent to the workers once the order is committed, see
+``queue_order_processing``. Every step has an ``OrderProcessingStep`` row
+tracking its status, so that a step runs once per order however many
+times its task is delivered, and failed steps are retried.
+
+The bulk actions and CSV exports of the order dashboard also run here when
+many orders are selected, reporting their progress in the state of their
+task.
+"""
+from collections import Counter
+from datetime import timedelta
+from functools import partial
 from smtplib import SMTPException
 
 from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from oscar.apps.order.signals import order_placed
 
-from ecommerce.apps.order.models import Order
-from ecommerce.apps.order.utils import OrderDispatcher
+from ecommerce.apps.order import exports, rollups
+from ecommerce.apps.order.models import Order, OrderProcessingStep, ShippingEventType
+from ecommerce.apps.order.processing import EventHandler
+from ecommerce.apps.order.utils import OrderCreator, OrderDispatcher
+from ecommerce.apps.users.models import User
 from ecommerce.core.celery.celery import app
+from ecommerce.core.celery.tasks import tenant_aware_periodic_task
+from ecommerce.core.storages.private import get_private_name
 
 logger = get_task_logger(__name__)
 
+RECORD_DISCOUNTS = "record_discounts"
+SEND_ORDER_PLACED_SIGNAL = "send_order_placed_signal"
+SEND_CONFIRMATION_MESSAGE = "send_confirmation_message"
+
+# Steps that OrderCreator.place_order leaves to the workers
+ORDER_PLACED_STEPS = (RECORD_DISCOUNTS, SEND_ORDER_PLACED_SIGNAL)
+
+
+def record_discounts(order):
+    OrderCreator().record_order_discounts(order)
+
+
+def send_order_placed_signal(order):
+    # Send signal for analytics to pick up
+    order_placed.send(sender=OrderCreator, order=order, user=order.user)
+
+
+def send_order_confirmation(order):
+    extra_context = {
+        'user': order.user,
+        'order': order,
+        'lines': list(order.lines.all())
+    }
+    OrderDispatcher(logger=logger).send_order_placed_email_for_user(order, extra_context)
+
+
+STEPS = {
+    RECORD_DISCOUNTS: record_discounts,
+    SEND_ORDER_PLACED_SIGNAL: send_order_placed_signal,
+    SEND_CONFIRMATION_MESSAGE: send_order_confirmation,
+}
+
 
-@app.task(bind=True, max_retries=0)
+def queue_order_processing(order, names):
+    """
+    Create the steps ``names`` of ``order`` and send them to the workers once
+    the current transaction commits.
+    """
+    OrderProcessingStep.objects.bulk_create(
+        [OrderProcessingStep(order=order, name=name) for name in names],
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(partial(send_order_steps, order.number, names))
+
+
+def send_order_steps(order_number, names):
+    for name in names:
+        try:
+            process_order_step.delay(order_number, name)
+        except Exception:
+            # The order is committed already, retry_order_processing sends
+            # the step again later
+            logger.exception(
+                "Order #{}: could not queue processing step {}".format(order_number, name)
+            )
+
+
+def run_order_step(order_number, name):
+    """
+    Run the step ``name`` of an order unless it completed already and return
+    whether it ran.
+
+    The step row stays locked while the step runs, so a duplicate task waits
+    for it and then skips it. Steps that only write to the database commit
+    together with their status.
+    """
+    order = Order.objects.get(number=order_number)
+    # Tasks may be sent for steps that weren't queued with the order
+    OrderProcessingStep.objects.bulk_create(
+        [OrderProcessingStep(order=order, name=name)], ignore_conflicts=True
+    )
+    error = None
+    with transaction.atomic():
+        step = OrderProcessingStep.objects.select_for_update().get(
+            order=order, name=name
+        )
+        if step.status == OrderProcessingStep.COMPLETE:
+            return False
+        step.attempts += 1
+        try:
+            with transaction.atomic():
+                STEPS[name](order)
+        except Exception as e:
+            error = e
+            step.status = OrderProcessingStep.FAILED
+            step.error = repr(e)
+        else:
+            step.status = OrderProcessingStep.COMPLETE
+            step.error = ""
+        step.save()
+    if error is not None:
+        raise error
+    return True
+
+
+@app.task(bind=True, max_retries=5)
+def process_order_step(self, order_number, name):
+    logger.info("Process step {} of order_number: {}".format(name, order_number))
+    try:
+        run_order_step(order_number, name)
+    except Exception as error:
+        logger.exception(
+            "Process step {} of order_number: {}, Error: {}".format(name, order_number, error))
+        raise self.retry(exc=error, countdown=60 * 2 ** self.request.retries)
+
+
+@app.task(bind=True, max_retries=3)
 def send_confirmation_message(self, order_number):
     logger.info("Create order confirmation email for order_number: {}".format(order_number))
     try:
-        order = Order.objects.get(number=order_number)
-        extra_context = {
-            'user': order.user,
-            'order': order,
-            'lines': list(order.lines.all())
-        }
-        OrderDispatcher(logger=logger).send_order_placed_email_for_user(order, extra_context)
+        run_order_step(order_number, SEND_CONFIRMATION_MESSAGE)
     except SMTPException as error:
         logger.exception(
             "Create order confirmation email for order_number: {}, Error: {}".format(order_number, error))
         self.retry(countdown=60 ** self.request.retries)
+
+
+@app.task
+@tenant_aware_periodic_task
+def retry_order_processing():
+    """
+    Send the steps again that are still pending a while after they were
+    queued, e.g. because the broker was down when the order was placed, and
+    the failed steps whose task gave up retrying, until they were attempted
+    ``ORDER_PROCESSING_MAX_ATTEMPTS`` times.
+    """
+    retry_after = getattr(settings, "ORDER_PROCESSING_RETRY_AFTER", 600)
+    max_attempts = getattr(settings, "ORDER_PROCESSING_MAX_ATTEMPTS", 10)
+    steps = OrderProcessingStep.objects.filter(
+        Q(status=OrderProcessingStep.PENDING)
+        | Q(status=OrderProcessingStep.FAILED, attempts__lt=max_attempts),
+        date_updated__lt=timezone.now() - timedelta(seconds=retry_after),
+    ).values_list("order__number", "name")
+    for order_number, name in steps:
+        send_order_steps(order_number, [name])
+
+
+@app.task(bind=True, max_retries=5, ignore_result=True)
+def refresh_order_rollups(self, kind, period):
+    """
+    Refresh the order rollups of a period, see ``rollups.queue_refresh``.
+    """
+    try:
+        rollups.refresh_period(kind, period)
+    except Exception as error:
+        logger.exception(
+            "Refresh order rollups of {} {}, Error: {}".format(kind, period, error)
+        )
+        raise self.retry(exc=error, countdown=60 * 2 ** self.request.retries)
+
+
+# State of the bulk order tasks while they run, its info is the progress
+PROGRESS = "PROGRESS"
+
+
+def run_in_chunks(task, user_id, order_ids, handle):
+    """
+    Call ``handle`` with the orders of ``order_ids`` in chunks of
+    ``ORDER_BULK_ACTION_CHUNK_SIZE`` and report the progress as the state of
+    ``task``. ``handle`` returns the counts to add up for the chunk.
+
+    The progress records the user who asked for the action, only they may
+    follow it.
+    """
+    chunk_size = getattr(settings, "ORDER_BULK_ACTION_CHUNK_SIZE", 500)
+    progress = {"user_id": user_id, "done": 0, "total": len(order_ids)}
+    counts = Counter()
+    for start in range(0, len(order_ids), chunk_size):
+        chunk = order_ids[start:start + chunk_size]
+        counts.update(handle(Order.objects.filter(pk__in=chunk)))
+        progress = {
+            **counts,
+            "user_id": user_id,
+            "done": start + len(chunk),
+            "total": len(order_ids),
+        }
+        if not task.request.called_directly:
+            task.update_state(state=PROGRESS, meta=progress)
+    return progress
+
+
+@app.task(bind=True)
+def bulk_change_order_statuses(self, user_id, order_ids, new_status, note_msg=None):
+    handler = EventHandler(User.objects.filter(pk=user_id).first())
+
+    def handle(orders):
+        changed, invalid = handler.handle_bulk_order_status_change(
+            orders, new_status, note_msg=note_msg
+        )
+        return {"changed": len(changed), "invalid": len(invalid)}
+
+    return run_in_chunks(self, user_id, order_ids, handle)
+
+
+@app.task(bind=True)
+def bulk_create_shipping_events(self, user_id, order_ids, event_type_id, reference=""):
+    handler = EventHandler(User.objects.filter(pk=user_id).first())
+    event_type = ShippingEventType.objects.get(pk=event_type_id)
+
+    def handle(orders):
+        events = handler.handle_bulk_shipping_event(orders, event_type, reference)
+        return {"created": len(events)}
+
+    return run_in_chunks(self, user_id, order_ids, handle)
+
+
+@app.task(bind=True)
+def export_orders(self, user_id, order_ids):
+    """
+    Write the CSV export of the orders to the private storage, the name of
+    the file is the ``file`` of the result.
+    """
+    chunk_size = getattr(settings, "ORDER_BULK_ACTION_CHUNK_SIZE", 500)
+    progress = {"user_id": user_id, "done": 0, "total": len(order_ids)}
+
+    def iter_orders():
+        for start in range(0, len(order_ids), chunk_size):
+            chunk = order_ids[start:start + chunk_size]
+            yield from exports.iter_orders(
+                Order.objects.filter(pk__in=chunk).order_by("-date_placed")
+            )
+            progress["done"] = start + len(chunk)
+            if not self.request.called_directly:
+                self.update_state(state=PROGRESS, meta=progress)
+
+    name = get_private_name(
+        "order-exports", "orders-{:%Y%m%d-%H%M%S}.csv".format(timezone.now())
+    )
+    progress["file"] = exports.save_csv(name, exports.iter_rows(iter_orders()))
+    return progress
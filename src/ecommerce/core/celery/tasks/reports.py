@@ -0,0 +1,20 @@
+"""
+Dashboard reports generated in the background, see
+``ecommerce.apps.dashboard.reports.runs``.
+"""
+from celery.utils.log import get_task_logger
+
+from ecommerce.apps.analytics.models import ReportRun
+from ecommerce.apps.dashboard.reports import runs
+from ecommerce.core.celery.celery import app
+
+logger = get_task_logger(__name__)
+
+
+@app.task
+def generate_report(run_id):
+    run = ReportRun.objects.get(pk=run_id)
+    if run.status == ReportRun.COMPLETE:
+        return
+    logger.info("Generate report {} of run {}".format(run.report_type, run_id))
+    runs.run_report(run)
@@ -0,0 +1,259 @@
+from datetime import timedelta
+from decimal import Decimal as D
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.test import override_settings
+from django.utils import timezone
+from oscar.apps.order.exceptions import UnableToPlaceOrder
+from oscar.apps.order.signals import order_placed
+
+from ecommerce.apps.offer.applicator import Applicator
+from ecommerce.apps.offer.models import ConditionalOffer
+from ecommerce.apps.order import exports
+from ecommerce.apps.order.models import (
+    Order,
+    OrderProcessingStep,
+    ShippingEvent,
+    ShippingEventType,
+)
+from ecommerce.core.celery.celery import app
+from ecommerce.core.celery.tasks import order as tasks
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+
+class OrderProcessingTestCase(TestCase):
+    def setUp(self):
+        settings = override_settings(ORDER_PROCESSING_ASYNC=True)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = factories.UserFactory()
+        self.offer = factories.create_offer()
+        self.basket = factories.create_basket()
+        Applicator().apply_offers(self.basket, [self.offer])
+        self.receiver = mock.Mock()
+        order_placed.connect(self.receiver)
+        self.addCleanup(order_placed.disconnect, self.receiver)
+
+    def place_order(self):
+        with mock.patch.object(tasks.process_order_step, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                order = factories.create_order(basket=self.basket, user=self.user)
+        return order, delay
+
+    def get_status(self, order, name):
+        return OrderProcessingStep.objects.get(order=order, name=name).status
+
+    def test_placing_order_queues_steps_after_commit(self):
+        order, delay = self.place_order()
+
+        delay.assert_has_calls(
+            [mock.call(order.number, name) for name in tasks.ORDER_PLACED_STEPS]
+        )
+        self.assertEqual(
+            set(order.processing_steps.values_list("name", "status")),
+            {(name, OrderProcessingStep.PENDING) for name in tasks.ORDER_PLACED_STEPS},
+        )
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.num_orders, 0)
+        self.receiver.assert_not_called()
+
+    def test_steps_record_discounts_and_send_signal(self):
+        order, __ = self.place_order()
+
+        for name in tasks.ORDER_PLACED_STEPS:
+            self.assertTrue(tasks.run_order_step(order.number, name))
+
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.num_orders, 1)
+        self.assertEqual(self.offer.total_discount, order.total_discount_incl_tax)
+        self.assertGreater(self.offer.total_discount, D("0.00"))
+        self.assertEqual(self.receiver.call_args.kwargs["order"], order)
+        self.assertEqual(
+            self.get_status(order, tasks.RECORD_DISCOUNTS), OrderProcessingStep.COMPLETE
+        )
+
+    def test_steps_run_once(self):
+        order, __ = self.place_order()
+
+        self.assertTrue(tasks.run_order_step(order.number, tasks.RECORD_DISCOUNTS))
+        self.assertFalse(tasks.run_order_step(order.number, tasks.RECORD_DISCOUNTS))
+        tasks.send_confirmation_message(order.number)
+        tasks.send_confirmation_message(order.number)
+
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.num_orders, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_steps_are_recorded(self):
+        order, __ = self.place_order()
+        steps = {**tasks.STEPS, tasks.RECORD_DISCOUNTS: mock.Mock(side_effect=ValueError)}
+
+        with mock.patch.object(tasks, "STEPS", steps):
+            with self.assertRaises(ValueError):
+                tasks.run_order_step(order.number, tasks.RECORD_DISCOUNTS)
+        step = order.processing_steps.get(name=tasks.RECORD_DISCOUNTS)
+        self.assertEqual((step.status, step.attempts), (OrderProcessingStep.FAILED, 1))
+        self.assertIn("ValueError", step.error)
+
+        tasks.run_order_step(order.number, tasks.RECORD_DISCOUNTS)
+        step.refresh_from_db()
+        self.assertEqual((step.status, step.attempts), (OrderProcessingStep.COMPLETE, 2))
+
+    def test_pending_steps_are_sent_again(self):
+        order, __ = self.place_order()
+        order.processing_steps.filter(name=tasks.RECORD_DISCOUNTS).update(
+            date_updated=timezone.now() - timedelta(hours=1)
+        )
+        order.refresh_from_db()
+
+        with mock.patch.object(tasks.process_order_step, "delay") as delay:
+            tasks.retry_order_processing()
+
+        delay.assert_called_once_with(order.number, tasks.RECORD_DISCOUNTS)
+
+    def test_failed_steps_are_sent_again_until_max_attempts(self):
+        order, __ = self.place_order()
+        steps = order.processing_steps.filter(name=tasks.RECORD_DISCOUNTS)
+        steps.update(
+            status=OrderProcessingStep.FAILED,
+            attempts=9,
+            date_updated=timezone.now() - timedelta(hours=1),
+        )
+        order.processing_steps.exclude(name=tasks.RECORD_DISCOUNTS).update(
+            status=OrderProcessingStep.COMPLETE
+        )
+
+        with mock.patch.object(tasks.process_order_step, "delay") as delay:
+            tasks.retry_order_processing()
+            steps.update(attempts=10)
+            tasks.retry_order_processing()
+
+        delay.assert_called_once_with(str(order.number), tasks.RECORD_DISCOUNTS)
+
+    def test_retry_is_scheduled_periodically(self):
+        schedule = {
+            entry["task"]: entry["schedule"]
+            for entry in app.conf.beat_schedule.values()
+        }
+
+        self.assertIn(tasks.retry_order_processing.name, app.tasks)
+        self.assertLessEqual(
+            schedule[tasks.retry_order_processing.name],
+            settings.ORDER_PROCESSING_RETRY_AFTER,
+        )
+
+    def test_applications_are_recorded_with_order(self):
+        order, __ = self.place_order()
+
+        self.offer.refresh_from_db()
+        self.assertEqual((self.offer.num_applications, self.offer.num_orders), (1, 0))
+
+        tasks.run_order_step(order.number, tasks.RECORD_DISCOUNTS)
+        self.offer.refresh_from_db()
+        self.assertEqual((self.offer.num_applications, self.offer.num_orders), (1, 1))
+
+    def test_offers_are_not_redeemed_beyond_global_limit(self):
+        ConditionalOffer.objects.filter(pk=self.offer.pk).update(
+            max_global_applications=1
+        )
+        self.offer.refresh_from_db()
+        self.basket.reset_offer_applications()
+        Applicator().apply_offers(self.basket, [self.offer])
+        # Another order used the offer since it was applied to the basket
+        ConditionalOffer.objects.filter(pk=self.offer.pk).update(num_applications=1)
+
+        with self.assertRaises(UnableToPlaceOrder):
+            self.place_order()
+
+        self.assertFalse(Order.objects.exists())
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.num_applications, 1)
+
+    def test_reaching_global_limit_consumes_offer(self):
+        ConditionalOffer.objects.filter(pk=self.offer.pk).update(
+            max_global_applications=1
+        )
+        self.offer.refresh_from_db()
+        self.basket.reset_offer_applications()
+        Applicator().apply_offers(self.basket, [self.offer])
+
+        self.place_order()
+
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.num_applications, 1)
+        self.assertEqual(self.offer.status, ConditionalOffer.CONSUMED)
+
+    @override_settings(ORDER_PROCESSING_ASYNC=False)
+    def test_synchronous_processing(self):
+        order, delay = self.place_order()
+
+        delay.assert_not_called()
+        self.offer.refresh_from_db()
+        self.assertEqual((self.offer.num_applications, self.offer.num_orders), (1, 1))
+        self.assertEqual(self.receiver.call_count, 1)
+
+
+class BulkOrderTaskTestCase(TestCase):
+    def setUp(self):
+        # Other tests change the pipeline
+        patcher = mock.patch.object(
+            Order, "pipeline", {"Pending": ("Being processed",)}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.orders = [factories.create_order(status="Pending") for __ in range(3)]
+        self.shipped = ShippingEventType.objects.create(name="Shipped")
+
+    @override_settings(ORDER_BULK_ACTION_CHUNK_SIZE=2)
+    def test_changes_statuses_in_chunks(self):
+        with mock.patch.object(
+            tasks.bulk_change_order_statuses, "update_state"
+        ) as update_state:
+            result = tasks.bulk_change_order_statuses.apply(
+                args=(None, [order.pk for order in self.orders], "Being processed")
+            ).get()
+
+        self.assertEqual(
+            result,
+            {"changed": 3, "invalid": 0, "user_id": None, "done": 3, "total": 3},
+        )
+        self.assertEqual(
+            [call.kwargs["meta"]["done"] for call in update_state.call_args_list],
+            [2, 3],
+        )
+        self.assertEqual(
+            Order.objects.filter(status="Being processed").count(), 3
+        )
+
+    def test_creates_shipping_events(self):
+        result = tasks.bulk_create_shipping_events(
+            None, [order.pk for order in self.orders], self.shipped.pk, "run"
+        )
+
+        self.assertEqual(result["created"], 3)
+        self.assertEqual(
+            ShippingEvent.objects.filter(event_type=self.shipped, notes="run").count(),
+            3,
+        )
+
+    @override_settings(ORDER_BULK_ACTION_CHUNK_SIZE=2)
+    def test_exports_orders_to_storage(self):
+        order_ids = [order.pk for order in reversed(self.orders)]
+
+        with mock.patch.object(exports, "private_storage") as storage:
+            storage.save.side_effect = lambda name, content: (
+                name,
+                content.read().decode(),
+            )
+            result = tasks.export_orders(None, order_ids)
+
+        name, content = result["file"]
+        self.assertRegex(name, r"^order-exports/[0-9a-f]{32}/orders-[0-9-]+\.csv$")
+        self.assertEqual((result["done"], result["total"]), (3, 3))
+        self.assertEqual(
+            [line.split(",")[0] for line in content.splitlines()[1:]],
+            [str(order.number) for order in reversed(self.orders)],
+        )
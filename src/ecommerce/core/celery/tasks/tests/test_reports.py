@@ -0,0 +1,58 @@
+from unittest import mock
+
+from ecommerce.apps.analytics.models import ReportRun
+from ecommerce.apps.dashboard.reports import runs
+from ecommerce.core.celery.tasks import reports as tasks
+from ecommerce.test import factories
+from ecommerce.test.testcases import TestCase
+
+
+class GenerateReportTestCase(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(runs, "private_storage")
+        self.storage = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.files = {}
+        self.storage.save.side_effect = self.save
+
+    def save(self, name, content):
+        self.files[name] = content.read().decode()
+        return name
+
+    def test_writes_report_to_storage(self):
+        orders = [
+            factories.create_order(user=factories.UserFactory()) for __ in range(3)
+        ]
+        run = ReportRun.objects.create(report_type="order_report")
+
+        with mock.patch.object(runs, "CHUNK_SIZE", 2):
+            tasks.generate_report(run.pk)
+
+        run.refresh_from_db()
+        self.assertEqual((run.status, run.done, run.total), (ReportRun.COMPLETE, 3, 3))
+        self.assertRegex(run.file, r"^reports/[0-9a-f]{32}/order_report-[0-9-]+\.csv$")
+        self.assertEqual(
+            sorted(line.split(",")[0] for line in self.files[run.file].splitlines()[1:]),
+            sorted(str(order.number) for order in orders),
+        )
+
+    def test_runs_every_generator(self):
+        factories.create_order(user=factories.UserFactory())
+        for generator in runs.GeneratorRepository().get_report_generators():
+            run = ReportRun.objects.create(report_type=generator.code)
+
+            tasks.generate_report(run.pk)
+
+            run.refresh_from_db()
+            self.assertEqual(run.status, ReportRun.COMPLETE, generator.code)
+
+    def test_failed_runs_are_recorded(self):
+        run = ReportRun.objects.create(report_type="order_report")
+        self.storage.save.side_effect = OSError("Storage is down")
+
+        with self.assertRaises(OSError):
+            tasks.generate_report(run.pk)
+
+        run.refresh_from_db()
+        self.assertEqual(run.status, ReportRun.FAILED)
+        self.assertIn("Storage is down", run.error)
@@ -0,0 +1,157 @@
+from unittest import mock
+
+from celery.exceptions import TimeLimitExceeded
+from django.db import connection
+from django.test import override_settings
+
+from ecommerce.core.celery import tasks
+from ecommerce.core.celery.celery import app
+from ecommerce.core.celery.tasks import (
+    TENANT_FAILED,
+    TENANT_SUCCESS,
+    TENANT_TIMEOUT,
+    summarize_tenant_results,
+    tenant_aware_periodic_task,
+)
+from ecommerce.test.testcases import TestCase
+
+seen_schemas = []
+
+
+@tenant_aware_periodic_task(fan_out=True, max_concurrency=1)
+def record_schema(value):
+    seen_schemas.append(connection.schema_name)
+    return value
+
+
+@tenant_aware_periodic_task(fan_out=True, max_concurrency=2)
+def record_schema_in_lanes(value):
+    seen_schemas.append(connection.schema_name)
+    return value
+
+
+@tenant_aware_periodic_task(fan_out=True)
+def always_fail():
+    raise ValueError("boom")
+
+
+class TenantFanOutTestCase(TestCase):
+    def setUp(self):
+        seen_schemas.clear()
+        self._always_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        settings = override_settings(TENANT_FAN_OUT_CACHE="default")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def tearDown(self):
+        app.conf.task_always_eager = self._always_eager
+
+    def test_tenant_task_runs_inside_the_tenant_schema(self):
+        outcome = record_schema.tenant_task(self.tenant.schema_name, 42)
+
+        self.assertEqual(outcome["status"], TENANT_SUCCESS)
+        self.assertEqual(outcome["result"], 42)
+        self.assertEqual(seen_schemas, [self.tenant.schema_name])
+
+    def test_tenant_task_reports_failures(self):
+        outcome = always_fail.tenant_task(self.tenant.schema_name)
+
+        self.assertEqual(outcome["status"], TENANT_FAILED)
+        self.assertIn("boom", outcome["error"])
+
+    def test_fan_out_runs_for_every_tenant(self):
+        with mock.patch(
+            "ecommerce.core.celery.tasks.get_tenant_schema_names",
+            return_value=[self.tenant.schema_name, self.tenant.schema_name],
+        ):
+            record_schema(1)
+
+        self.assertEqual(seen_schemas, [self.tenant.schema_name] * 2)
+
+    def summarize_fan_out(self, task, schema_names):
+        with mock.patch.object(
+            tasks, "get_tenant_schema_names", return_value=schema_names
+        ), mock.patch.object(
+            tasks.summarize_tenant_results,
+            "run",
+            wraps=tasks.summarize_tenant_results.run,
+        ) as summarize:
+            task(1)
+        self.assertEqual(summarize.call_count, 1)
+        return summarize.call_args.args[0]
+
+    def test_lanes_summarise_every_tenant_once(self):
+        results = self.summarize_fan_out(
+            record_schema_in_lanes, [self.tenant.schema_name] * 5
+        )
+
+        self.assertEqual(len(seen_schemas), 5)
+        self.assertEqual(
+            [outcome["status"] for outcome in results], [TENANT_SUCCESS] * 5
+        )
+
+    def kill_tenant(self, time_limit):
+        fan_out = {
+            "id": "killed",
+            "task_name": record_schema_in_lanes.tenant_task.name,
+            "lanes": 1,
+            "args": [1],
+            "kwargs": {},
+            "time_limit": time_limit,
+        }
+        tasks.get_fan_out_cache().set("tenant-fan-out:killed", 0)
+
+        with mock.patch.object(
+            tasks.summarize_tenant_results,
+            "run",
+            wraps=tasks.summarize_tenant_results.run,
+        ) as summarize:
+            tasks.continue_tenant_lane_after_error(
+                mock.Mock(),
+                TimeLimitExceeded(90),
+                None,
+                fan_out,
+                0,
+                "killed_schema",
+                [self.tenant.schema_name],
+                [],
+            )
+
+        self.assertEqual(seen_schemas, [self.tenant.schema_name])
+        results = summarize.call_args.args[0]
+        self.assertEqual(
+            [(outcome["schema_name"], outcome["status"]) for outcome in results],
+            [
+                ("killed_schema", TENANT_TIMEOUT),
+                (self.tenant.schema_name, TENANT_SUCCESS),
+            ],
+        )
+        return results[0]
+
+    def test_lane_continues_after_killed_tenant(self):
+        outcome = self.kill_tenant(60)
+
+        self.assertEqual(outcome["duration"], 60 + tasks.TENANT_HARD_TIME_LIMIT_GRACE)
+
+    def test_lane_continues_after_tenant_killed_by_worker_time_limit(self):
+        self.addCleanup(setattr, app.conf, "task_time_limit", app.conf.task_time_limit)
+        app.conf.task_time_limit = 300
+
+        outcome = self.kill_tenant(None)
+
+        self.assertEqual(outcome["duration"], 300)
+
+    def test_summarize_tenant_results(self):
+        summary = summarize_tenant_results(
+            [
+                {"schema_name": "a", "status": TENANT_SUCCESS, "error": None, "duration": 1},
+                {"schema_name": "b", "status": TENANT_FAILED, "error": "boom", "duration": 3},
+            ],
+            "nightly",
+        )
+
+        self.assertEqual(summary["succeeded"], 1)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["failures"], {"b": "failed: boom"})
+        self.assertEqual(summary["slowest_duration"], 3)
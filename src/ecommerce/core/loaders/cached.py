@@ -0,0 +1,78 @@
+"""
+Wrapper class that takes a list of template loaders as an argument and caches
+the compiled templates of every tenant separately.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from django.template import engines
+from django.template.loaders.cached import Loader as BaseLoader
+
+DEFAULT_MAX_SIZE = 2000
+
+
+class TemplateCache(OrderedDict):
+    """
+    Thread-safe mapping that drops the least recently used entry once it holds
+    more than ``max_size`` entries.
+    """
+
+    def __init__(self, max_size):
+        super().__init__()
+        self.max_size = max_size
+        self.lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            return self[key]
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > self.max_size:
+                self.popitem(last=False)
+
+
+class Loader(BaseLoader):
+    """
+    Cached loader that keys compiled templates by (schema, template name).
+
+    Tenants can override any template through MULTITENANT_TEMPLATE_DIRS, so a
+    template compiled for one tenant must never be served to another one.
+    """
+
+    def __init__(self, engine, loaders, max_size=None):
+        super().__init__(engine, loaders)
+        if max_size is None:
+            max_size = getattr(settings, "TENANT_TEMPLATE_CACHE_SIZE", DEFAULT_MAX_SIZE)
+        self.get_template_cache = TemplateCache(max_size)
+
+    def cache_key(self, template_name, skip=None):
+        key = super().cache_key(template_name, skip)
+        return f"{connection.schema_name}:{key}"
+
+    def reset_tenant(self, schema_name):
+        """
+        Drop the compiled templates of a single tenant.
+        """
+        prefix = f"{schema_name}:"
+        with self.get_template_cache.lock:
+            for key in [key for key in self.get_template_cache if key.startswith(prefix)]:
+                del self.get_template_cache[key]
+
+
+def reset_tenant_templates(schema_name):
+    """
+    Drop the compiled templates of a tenant from every configured template
+    engine, e.g. after the tenant's template directory changed.
+    """
+    for engine in engines.all():
+        for loader in getattr(engine, "engine", engine).template_loaders:
+            if isinstance(loader, Loader):
+                loader.reset_tenant(schema_name)
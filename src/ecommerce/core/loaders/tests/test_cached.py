@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from django.db import connection
+from django.template import Engine
+from django.test import SimpleTestCase
+
+from ecommerce.core.loaders.cached import Loader
+
+
+class TenantCachedLoaderTestCase(SimpleTestCase):
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        for name in ("a.html", "b.html", "c.html"):
+            with open(os.path.join(self.template_dir, name), "w") as template_file:
+                template_file.write(name)
+        self.engine = Engine(
+            dirs=[self.template_dir],
+            loaders=[
+                (
+                    "ecommerce.core.loaders.cached.Loader",
+                    ["django.template.loaders.filesystem.Loader"],
+                    2,
+                )
+            ],
+        )
+        self.loader = self.engine.template_loaders[0]
+        self.addCleanup(connection.set_schema_to_public)
+
+    def get_template(self, schema_name, name="a.html"):
+        connection.set_schema(schema_name)
+        return self.engine.get_template(name)
+
+    def test_templates_are_compiled_once_per_tenant(self):
+        first = self.get_template("tenant_a")
+
+        self.assertIs(self.get_template("tenant_a"), first)
+        self.assertIsNot(self.get_template("tenant_b"), first)
+
+    def test_reset_tenant_only_drops_that_tenant(self):
+        first_a = self.get_template("tenant_a")
+        first_b = self.get_template("tenant_b")
+        self.loader.reset_tenant("tenant_a")
+
+        self.assertIsNot(self.get_template("tenant_a"), first_a)
+        self.assertIs(self.get_template("tenant_b"), first_b)
+
+    def test_cache_size_is_bounded(self):
+        for name in ("a.html", "b.html", "c.html"):
+            self.get_template("tenant_a", name)
+
+        self.assertEqual(len(self.loader.get_template_cache), 2)
+        self.assertNotIn("tenant_a:a.html", self.loader.get_template_cache)
@@ -0,0 +1,35 @@
+"""
+Storage of files only some users may download, such as order exports and
+reports.
+
+``private_storage`` is the storage of ``PRIVATE_FILE_STORAGE``. Its files
+are saved under names that can't be guessed, see ``get_private_name``, and
+the URLs it hands out are short-lived signed URLs.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.functional import LazyObject
+from django.utils.module_loading import import_string
+
+
+class PrivateStorage(LazyObject):
+    def _setup(self):
+        storage_class = getattr(settings, "PRIVATE_FILE_STORAGE", None)
+        if storage_class is None:
+            self._wrapped = default_storage
+        else:
+            self._wrapped = import_string(storage_class)()
+
+
+private_storage = PrivateStorage()
+
+
+def get_private_name(directory, filename):
+    """
+    Return the name of ``filename`` in ``directory`` under a random
+    directory of its own, so that the names of other files can't be
+    guessed from it.
+    """
+    return f"{directory}/{uuid.uuid4().hex}/{filename}"
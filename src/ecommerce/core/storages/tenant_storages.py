@@ -1,14 +1,43 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connection as db_connection
 from django.utils.functional import cached_property
 from django_tenants import utils
 from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+# boto3 resources are not thread safe, so every thread gets its own one. They
+# are shared by all storage instances of the thread that use the same
+# credentials and endpoint.
+_resources = threading.local()
+
+# Low level clients are thread safe and shared by the whole process
+_clients = {}
+_clients_lock = threading.Lock()
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_BATCH_WORKERS = 10
+
+# Cached signed URLs are dropped this many seconds before they expire, so a
+# URL handed out from the cache is always usable for at least that long.
+SIGNED_URL_EXPIRY_MARGIN = 60
 
 
 class TenantS3Storage(S3Boto3Storage):
     """
     Implementation that extends S3Boto3Storage for multi-tenant setups.
     Files are stored in S3 with a tenant-specific prefix derived from the schema name.
+
+    The tenant prefixes are computed once per schema, the S3 connection is
+    shared by every storage instance of the process and signed URLs can be
+    cached with ``AWS_S3_SIGNED_URL_CACHE_TIMEOUT``.
     """
 
     def __init__(self, *args, **kwargs):
@@ -26,6 +55,11 @@ class TenantS3Storage(S3Boto3Storage):
             if not hasattr(settings, setting):
                 raise ImproperlyConfigured(f"Missing required setting: {setting}")
 
+        # Tenant prefixes, keyed by schema name. Set up first because the
+        # parent classes already read ``location`` while initialising.
+        self._locations = {}
+        self._base_urls = {}
+
         # Set AWS configuration from settings
         self.bucket_name = settings.AWS_STORAGE_BUCKET_NAME
         self.region_name = settings.AWS_REGION_NAME
@@ -33,14 +67,101 @@ class TenantS3Storage(S3Boto3Storage):
         self.secret_key = settings.AWS_SECRET_ACCESS_KEY
         self.file_overwrite = getattr(settings, "AWS_S3_FILE_OVERWRITE", False)
         self.default_acl = getattr(settings, "AWS_DEFAULT_ACL", "public-read")
+        self.signed_url_cache_timeout = getattr(
+            settings, "AWS_S3_SIGNED_URL_CACHE_TIMEOUT", 0
+        )
+        self.batch_workers = getattr(
+            settings, "AWS_S3_BATCH_WORKERS", DEFAULT_BATCH_WORKERS
+        )
 
         super().__init__(*args, **kwargs)
 
+        # Let concurrent requests (e.g. from exists_many) reuse connections
+        self.config = self.config.merge(
+            Config(
+                max_pool_connections=getattr(
+                    settings,
+                    "AWS_S3_MAX_POOL_CONNECTIONS",
+                    DEFAULT_MAX_POOL_CONNECTIONS,
+                )
+            )
+        )
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._locations = {}
+        self._base_urls = {}
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("_locations", None)
+        state.pop("_base_urls", None)
+        return state
+
     def _clear_cached_properties(self, setting, **kwargs):
         """Reset setting-based property values."""
         super()._clear_cached_properties(setting, **kwargs)
         if setting == "MULTITENANT_RELATIVE_MEDIA_ROOT":
             self.__dict__.pop("relative_media_root", None)
+            self.__dict__.pop("relative_media_url", None)
+            self._locations.clear()
+            self._base_urls.clear()
+        elif setting == "MEDIA_URL":
+            self.__dict__.pop("relative_media_url", None)
+            self._base_urls.clear()
+
+    @property
+    def connection_key(self):
+        """
+        Identify the connections this storage can share with other instances.
+        """
+        return (
+            self.access_key,
+            self.secret_key,
+            self.security_token,
+            self.session_profile,
+            self.region_name,
+            self.endpoint_url,
+            self.use_ssl,
+            self.verify,
+        )
+
+    @property
+    def connection(self):
+        """
+        Return the S3 resource of the current thread, shared between storages.
+        """
+        resources = getattr(_resources, "resources", None)
+        if resources is None:
+            resources = _resources.resources = {}
+        resource = resources.get(self.connection_key)
+        if resource is None:
+            resource = resources[self.connection_key] = self._create_resource()
+        return resource
+
+    @property
+    def client(self):
+        """
+        Return the S3 client shared by all threads of the process.
+        """
+        key = self.connection_key
+        client = _clients.get(key)
+        if client is None:
+            with _clients_lock:
+                client = _clients.get(key)
+                if client is None:
+                    client = _clients[key] = self._create_resource().meta.client
+        return client
+
+    def _create_resource(self):
+        return self._create_session().resource(
+            "s3",
+            region_name=self.region_name,
+            use_ssl=self.use_ssl,
+            endpoint_url=self.endpoint_url,
+            config=self.config,
+            verify=self.verify,
+        )
 
     @cached_property
     def relative_media_root(self):
@@ -76,7 +197,13 @@ class TenantS3Storage(S3Boto3Storage):
         Get the tenant-specific prefix for S3 storage.
         Uses django-tenants' parse_tenant_config_path to inject tenant schema.
         """
-        return utils.parse_tenant_config_path(self.relative_media_root).strip("/")
+        schema_name = db_connection.schema_name
+        location = self._locations.get(schema_name)
+        if location is None:
+            location = self._locations[schema_name] = utils.parse_tenant_config_path(
+                self.relative_media_root
+            ).strip("/")
+        return location
 
     @property
     def location(self):
@@ -96,26 +223,27 @@ class TenantS3Storage(S3Boto3Storage):
             str: Normalized path with tenant prefix (e.g., 'tenant1/uploads/file.jpg')
         """
         clean_name = name.lstrip("/")
-        return f"{self.location}/{clean_name}" if self.location else clean_name
+        location = self.location
+        return f"{location}/{clean_name}" if location else clean_name
 
     @property
     def base_url(self):
         """
         Get the full base URL with tenant-specific prefix.
         """
-        relative_tenant_media_url = utils.parse_tenant_config_path(
-            self.relative_media_url
-        )
-
-        if self._base_url is None:
-            return relative_tenant_media_url
+        schema_name = db_connection.schema_name
+        base_url = self._base_urls.get(schema_name)
+        if base_url is not None:
+            return base_url
 
-        # Combine base_url with tenant-specific path
-        relative_tenant_media_url = (
-            "/".join(s.strip("/") for s in [self._base_url, relative_tenant_media_url])
-            + "/"
-        )
-        return relative_tenant_media_url
+        base_url = utils.parse_tenant_config_path(self.relative_media_url)
+        if getattr(self, "_base_url", None) is not None:
+            # Combine base_url with tenant-specific path
+            base_url = (
+                "/".join(s.strip("/") for s in [self._base_url, base_url]) + "/"
+            )
+        self._base_urls[schema_name] = base_url
+        return base_url
 
     def listdir(self, path):
         """
@@ -129,7 +257,121 @@ class TenantS3Storage(S3Boto3Storage):
             tuple: (dirs, files)
         """
         try:
-            full_path = self._normalize_name(path)
-            return super().listdir(full_path)
+            # The parent class adds the tenant prefix itself
+            return super().listdir(path)
         except Exception:  # S3 might raise various exceptions for missing prefixes
             return [], []  # Mimic TenantFileSystemStorage's forgiving behavior
+
+    def exists(self, name):
+        return self._exists(self._normalize_name(clean_name(name)))
+
+    def _exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as err:
+            if err.response["ResponseMetadata"]["HTTPStatusCode"] == 404:
+                return False
+            raise
+
+    def exists_many(self, names):
+        """
+        Check several files at once.
+
+        The HEAD requests are sent concurrently, at most
+        ``AWS_S3_BATCH_WORKERS`` at a time.
+
+        Returns:
+            dict: name -> bool
+        """
+        names = list(dict.fromkeys(names))
+        keys = [self._normalize_name(clean_name(name)) for name in names]
+        if len(keys) <= 1:
+            return {name: self._exists(key) for name, key in zip(names, keys)}
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.batch_workers, len(keys)))
+        ) as executor:
+            return dict(zip(names, executor.map(self._exists, keys)))
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        """
+        Return the URL of ``name``, reusing a cached signed URL when
+        ``AWS_S3_SIGNED_URL_CACHE_TIMEOUT`` is set.
+        """
+        if expire is None:
+            expire = self.querystring_expire
+        timeout = min(
+            self.signed_url_cache_timeout or 0, expire - SIGNED_URL_EXPIRY_MARGIN
+        )
+        if (
+            timeout <= 0
+            or not self.querystring_auth
+            or parameters
+            or http_method
+        ):
+            return super().url(name, parameters, expire, http_method)
+
+        cache_key = self.get_url_cache_key(name, expire)
+        url = cache.get(cache_key)
+        if url is None:
+            url = self._signed_url(name, expire)
+            cache.set(cache_key, url, timeout)
+        return url
+
+    def urls_many(self, names, expire=None):
+        """
+        Return the URLs of several files, fetching cached signed URLs in one
+        cache round trip.
+
+        Returns:
+            dict: name -> url
+        """
+        names = list(dict.fromkeys(names))
+        if expire is None:
+            expire = self.querystring_expire
+        timeout = min(
+            self.signed_url_cache_timeout or 0, expire - SIGNED_URL_EXPIRY_MARGIN
+        )
+        if timeout <= 0 or not self.querystring_auth:
+            return {name: self._signed_url(name, expire) for name in names}
+
+        cache_keys = {name: self.get_url_cache_key(name, expire) for name in names}
+        cached = cache.get_many(cache_keys.values())
+        urls, missing = {}, {}
+        for name, cache_key in cache_keys.items():
+            if cache_key in cached:
+                urls[name] = cached[cache_key]
+            else:
+                urls[name] = missing[cache_key] = self._signed_url(name, expire)
+        if missing:
+            cache.set_many(missing, timeout)
+        return urls
+
+    def _signed_url(self, name, expire):
+        return super().url(name, expire=expire)
+
+    def get_url_cache_key(self, name, expire):
+        key = self._normalize_name(clean_name(name))
+        digest = hashlib.md5(
+            f"{self.bucket_name}:{key}:{expire}".encode(), usedforsecurity=False
+        ).hexdigest()
+        return f"tenant_s3_url:{digest}"
+
+
+class PrivateTenantS3Storage(TenantS3Storage):
+    """
+    Tenant storage of files only some users may download, e.g. exports.
+
+    Files are written with the private ACL, whatever ``AWS_DEFAULT_ACL`` is,
+    and their URLs are signed and expire after ``PRIVATE_FILE_URL_EXPIRE``
+    seconds.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default_acl", "private")
+        kwargs.setdefault("querystring_auth", True)
+        kwargs.setdefault(
+            "querystring_expire", getattr(settings, "PRIVATE_FILE_URL_EXPIRE", 300)
+        )
+        super().__init__(*args, **kwargs)
@@ -0,0 +1,110 @@
+import boto3
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import override_settings
+from moto import mock_aws
+
+from ecommerce.core.storages.tenant_storages import (
+    PrivateTenantS3Storage,
+    TenantS3Storage,
+)
+from ecommerce.test.testcases import TestCase
+
+BUCKET = "ecommerce-test-media"
+
+
+class TestTenantS3Storage(TestCase):
+    def setUp(self):
+        # TestCase.setUpClass doesn't apply class level overrides
+        aws_settings = override_settings(
+            AWS_STORAGE_BUCKET_NAME=BUCKET,
+            AWS_REGION_NAME="us-east-1",
+            AWS_S3_REGION_NAME="us-east-1",
+            AWS_ACCESS_KEY_ID="testing",
+            AWS_SECRET_ACCESS_KEY="testing",
+            MULTITENANT_RELATIVE_MEDIA_ROOT="media/%s",
+        )
+        aws_settings.enable()
+        self.addCleanup(aws_settings.disable)
+        self.s3 = mock_aws()
+        self.s3.start()
+        self.addCleanup(self.s3.stop)
+        self.addCleanup(cache.clear)
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        self.storage = TenantS3Storage()
+
+    def test_location_is_tenant_specific(self):
+        self.assertEqual(
+            self.storage.location, f"media/{connection.schema_name}"
+        )
+        self.assertEqual(
+            self.storage._normalize_name("images/a.jpg"),
+            f"media/{connection.schema_name}/images/a.jpg",
+        )
+
+    def test_location_is_computed_once_per_schema(self):
+        self.storage.location
+        self.storage._locations[connection.schema_name] = "memoised"
+
+        self.assertEqual(self.storage.location, "memoised")
+
+    def test_save_exists_and_listdir(self):
+        self.storage.save("images/a.jpg", ContentFile(b"a"))
+
+        self.assertTrue(self.storage.exists("images/a.jpg"))
+        self.assertFalse(self.storage.exists("images/b.jpg"))
+        self.assertEqual(self.storage.listdir("images"), ([], ["a.jpg"]))
+        self.assertEqual(self.storage.listdir(""), (["images"], []))
+
+    def test_exists_many(self):
+        self.storage.save("images/a.jpg", ContentFile(b"a"))
+        self.storage.save("images/c.jpg", ContentFile(b"c"))
+
+        self.assertEqual(
+            self.storage.exists_many(["images/a.jpg", "images/b.jpg", "images/c.jpg"]),
+            {"images/a.jpg": True, "images/b.jpg": False, "images/c.jpg": True},
+        )
+
+    def test_connection_is_shared_between_storages(self):
+        other = TenantS3Storage()
+
+        self.assertIs(self.storage.connection, other.connection)
+        self.assertIs(self.storage.client, other.client)
+        self.assertEqual(self.storage.config.max_pool_connections, 50)
+
+    def test_urls_many_matches_url(self):
+        names = ["images/a.jpg", "images/b.jpg"]
+        urls = self.storage.urls_many(names)
+
+        self.assertEqual(list(urls), names)
+        for name in names:
+            self.assertIn(f"media/{connection.schema_name}/{name}", urls[name])
+
+    @override_settings(AWS_S3_SIGNED_URL_CACHE_TIMEOUT=600)
+    def test_signed_urls_are_cached(self):
+        storage = TenantS3Storage()
+        url = storage.url("images/a.jpg")
+
+        self.assertEqual(storage.url("images/a.jpg"), url)
+        self.assertEqual(storage.urls_many(["images/a.jpg"]), {"images/a.jpg": url})
+        self.assertIsNotNone(cache.get(storage.get_url_cache_key("images/a.jpg", 3600)))
+
+    @override_settings(AWS_S3_SIGNED_URL_CACHE_TIMEOUT=600)
+    def test_short_lived_urls_are_not_cached(self):
+        storage = TenantS3Storage()
+        storage.url("images/a.jpg", expire=30)
+
+        self.assertIsNone(cache.get(storage.get_url_cache_key("images/a.jpg", 30)))
+
+    @override_settings(AWS_DEFAULT_ACL="public-read", PRIVATE_FILE_URL_EXPIRE=120)
+    def test_private_files_are_not_public(self):
+        storage = PrivateTenantS3Storage()
+        storage.save("exports/a.csv", ContentFile(b"a"))
+
+        grants = boto3.client("s3", region_name="us-east-1").get_object_acl(
+            Bucket=BUCKET, Key=f"media/{connection.schema_name}/exports/a.csv"
+        )["Grants"]
+        self.assertFalse([grant for grant in grants if "URI" in grant["Grantee"]])
+        self.assertIn("Expires=", storage.url("exports/a.csv"))
+        self.assertEqual(storage.querystring_expire, 120)
@@ -3,6 +3,9 @@ from oscar.core.application import OscarConfig
 
 
 class TenantConfig(OscarConfig):
-    label = "Tenant"
+    label = "tenants"
     name = "ecommerce.core.tenants"
     verbose_name = _("Tenant")
+
+    def ready(self):
+        from ecommerce.core.tenants import receivers  # noqa
@@ -0,0 +1,119 @@
+"""
+In-process registry of resolved tenants.
+
+Resolving the tenant for a request costs one or two ``Client`` lookups. The
+registry keeps a detached snapshot of every tenant it has resolved, keyed by
+the hostname the middleware extracted from the request, so that repeated
+requests for the same hostname don't hit the database at all.
+
+Unknown hostnames are remembered too (a negative entry), which means bad or
+probing hostnames fall back to the public tenant without any query.
+
+Entries expire after ``TENANT_CACHE_TTL`` seconds, and at most
+``TENANT_CACHE_MAX_SIZE`` hostnames are kept: the least recently used ones
+are dropped first, so random hostnames can't grow the registry without
+bound. Saving or deleting a
+``Client`` or ``Domain`` invalidates the registry of the current process
+(see ``receivers.py``); other processes pick the change up once the TTL
+expires.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_SIZE = 1000
+
+# Marker stored for hostnames that don't match any tenant
+MISSING = object()
+
+
+class TenantCache:
+    def __init__(self, ttl=None, max_size=None):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "TENANT_CACHE_TTL", DEFAULT_TTL)
+
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return getattr(settings, "TENANT_CACHE_MAX_SIZE", DEFAULT_MAX_SIZE)
+
+    def get(self, hostname, loader):
+        """
+        Return a fresh copy of the tenant for ``hostname``.
+
+        ``loader`` is called with the hostname on a cache miss and must return
+        the tenant instance, or ``None`` if no tenant matches the hostname.
+        Returns ``None`` for a (possibly cached) miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(hostname)
+            if entry is not None:
+                self._entries.move_to_end(hostname)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            snapshot = entry[1]
+        else:
+            self.misses += 1
+            tenant = loader(hostname)
+            snapshot = MISSING if tenant is None else self.make_snapshot(tenant)
+            if self.ttl > 0:
+                with self._lock:
+                    self._entries[hostname] = (now + self.ttl, snapshot)
+                    self._entries.move_to_end(hostname)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+
+        if snapshot is MISSING:
+            return None
+        # Callers mutate the tenant (e.g. ``domain_url``), so never hand out
+        # the cached instance itself.
+        return copy.copy(snapshot)
+
+    def make_snapshot(self, tenant):
+        snapshot = copy.copy(tenant)
+        # Drop any related objects that were loaded with the tenant
+        snapshot._state.fields_cache = {}
+        snapshot._prefetched_objects_cache = {}
+        return snapshot
+
+    def invalidate(self, hostname=None):
+        """
+        Drop the entry for ``hostname``, or every entry if it isn't given.
+        """
+        with self._lock:
+            if hostname is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(hostname, None)
+
+    def invalidate_schema(self, schema_name):
+        """
+        Drop every entry that resolved to ``schema_name``, together with all
+        negative entries (the schema may be one of the unknown hostnames).
+        """
+        with self._lock:
+            for hostname, (__, snapshot) in list(self._entries.items()):
+                if snapshot is MISSING or snapshot.schema_name == schema_name:
+                    del self._entries[hostname]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+tenant_cache = TenantCache()
@@ -3,6 +3,8 @@ from django.http import HttpResponseBadRequest
 from django_tenants.middleware import TenantMainMiddleware as BaseTenantMiddleware
 from django_tenants.utils import get_public_schema_name, get_tenant_model
 
+from ecommerce.core.tenants.cache import tenant_cache
+
 
 class TenantMainMiddleware(BaseTenantMiddleware):
     """
@@ -31,21 +33,27 @@ class TenantMainMiddleware(BaseTenantMiddleware):
         return self.get_subdomain(request)
 
     def get_tenant(self, domain_model, hostname):
-        # Check if the hostname is public
+        """
+        Resolve the tenant through the in-process tenant cache, falling back to
+        the public tenant if the hostname doesn't match any schema.
+        """
 
-        if hostname == self.public_schema_name:
-            return domain_model.objects.get(schema_name=self.public_schema_name)
+        def loader(schema_name):
+            return self.load_tenant(domain_model, schema_name)
 
-        try:
-            return domain_model.objects.get(schema_name=hostname)
-        except domain_model.DoesNotExist:
+        tenant = tenant_cache.get(hostname, loader)
+        if tenant is None:
             # If tenant doesn't exist, fallback to public
-            return domain_model.objects.get(schema_name=self.public_schema_name)
+            tenant = tenant_cache.get(self.public_schema_name, loader)
+        return tenant
 
-    def process_request(self, request):
-        # Use the tenant associated with the request's domain.
+    def load_tenant(self, domain_model, schema_name):
+        # Tenants live in the public schema
         connection.set_schema_to_public()
+        return domain_model.objects.filter(schema_name=schema_name).first()
 
+    def process_request(self, request):
+        # Use the tenant associated with the request's domain.
         hostname = self.hostname_from_request(request)
         domain_model = get_tenant_model()
         tenant = self.get_tenant(domain_model, hostname)
@@ -1,5 +1,14 @@
-from django.db import models
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, models
+from django_tenants.clone import CloneSchema
 from django_tenants.models import DomainMixin, TenantMixin
+from django_tenants.postgresql_backend.base import _check_schema_name
+from django_tenants.utils import schema_exists
+
+
+def get_template_schema_name():
+    return getattr(settings, "TENANT_TEMPLATE_SCHEMA", None)
 
 
 class Client(TenantMixin):
@@ -11,9 +20,53 @@ class Client(TenantMixin):
     # default true, schema will be automatically created and synced when it is saved
     auto_create_schema = True
 
+    # clone new schemas from TENANT_TEMPLATE_SCHEMA (when it exists) instead of
+    # running every migration, see the refresh_tenant_template command
+    clone_from_template = True
+
     def __str__(self):
         return f"{self.name} - {self.schema_name}"
 
+    def create_schema(self, check_if_exists=False, sync_schema=True, verbosity=1):
+        template_schema = get_template_schema_name()
+        if not (
+            sync_schema
+            and self.clone_from_template
+            and template_schema
+            and schema_exists(template_schema)
+        ):
+            return super().create_schema(check_if_exists, sync_schema, verbosity)
+
+        _check_schema_name(self.schema_name)
+        if check_if_exists and schema_exists(self.schema_name):
+            return False
+
+        clone = CloneSchema()
+        # CloneSchema looks for its SQL function with a query that fails when
+        # it is missing, which would abort the transaction we may be in.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regproc('public.clone_schema')")
+            if cursor.fetchone()[0] is None:
+                clone._create_clone_schema_function()
+
+        # Copies tables, sequences and rows, including the recorded migrations
+        # and the seed data of the template.
+        clone.clone_schema(template_schema, self.schema_name)
+        # The clone function changes the search_path behind the backend's back
+        connection.search_path_set_schemas = None
+
+        # Apply whatever the template is missing if it wasn't refreshed after
+        # the latest deploy.
+        call_command(
+            "migrate_schemas",
+            tenant=True,
+            schema_name=self.schema_name,
+            interactive=False,
+            verbosity=verbosity,
+        )
+        connection.set_schema_to_public()
+        return True
+
 
 class Domain(DomainMixin):
     def __str__(self):
@@ -9,7 +9,7 @@ from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.utils.module_loading import import_string
 from django_tenants.postgresql_backend.introspection import \
     DatabaseSchemaIntrospection
-from django_tenants.utils import get_limit_set_calls, get_public_schema_name
+from django_tenants.utils import get_public_schema_name
 
 try:
     from django.db.backends.postgresql.psycopg_any import is_psycopg3
@@ -61,6 +61,11 @@ def _check_schema_name(name):
 class DatabaseWrapper(original_backend.DatabaseWrapper):
     """
     Adds the capability to manipulate the search_path using set_tenant and set_schema_name
+
+    The search_path in effect on the database connection is tracked in
+    search_path_set_schemas, so that "SET search_path" is only sent when the
+    schemas actually change. search_path_set_count and search_path_skip_count
+    count the statements sent and saved.
     """
     include_public_schema = True
     # Use a patched version of the DatabaseIntrospection that only returns the table list for the
@@ -68,6 +73,8 @@ class DatabaseWrapper(original_backend.DatabaseWrapper):
 
     def __init__(self, *args, **kwargs):
         self.search_path_set_schemas = None
+        self.search_path_set_count = 0
+        self.search_path_skip_count = 0
         self.tenant = None
         self.schema_name = None
         super().__init__(*args, **kwargs)
@@ -82,6 +89,20 @@ class DatabaseWrapper(original_backend.DatabaseWrapper):
         self.search_path_set_schemas = None
         super().close()
 
+    def init_connection_state(self):
+        # A new connection starts with the server's default search_path
+        self.search_path_set_schemas = None
+        super().init_connection_state()
+
+    def _rollback(self):
+        # SET is transactional, so a rollback can restore an older search_path
+        self.search_path_set_schemas = None
+        super()._rollback()
+
+    def _savepoint_rollback(self, sid):
+        self.search_path_set_schemas = None
+        super()._savepoint_rollback(sid)
+
     def set_tenant(self, tenant, include_public=True):
         """
         Main API method to current database schema,
@@ -95,8 +116,6 @@ class DatabaseWrapper(original_backend.DatabaseWrapper):
         if EXTRA_SET_TENANT_METHOD:
             EXTRA_SET_TENANT_METHOD(self, tenant)
 
-        self.search_path_set_schemas = None
-
         # Content type can no longer be cached as public and tenant schemas
         # have different models. If someone wants to change this, the cache
         # needs to be separated between public and shared schemas. If this
@@ -136,35 +155,37 @@ class DatabaseWrapper(original_backend.DatabaseWrapper):
     def _cursor(self, name=None):
         """
         Here it happens. We hope every Django db operation using PostgreSQL
-        must go through this to get the cursor handle. We change the path.
+        must go through this to get the cursor handle. We change the path,
+        unless the connection already uses the search_path we need.
         """
         cursor = super()._cursor(name=name) if name else super()._cursor()
-        # optionally limit the number of executions - under load, the execution
-        # of `set search_path` can be quite time consuming
-        if (not get_limit_set_calls()) or not self.search_path_set_schemas:
-            # Actual search_path modification for the cursor. Database will
-            # search schemata from left to right when looking for the object
-            # (table, index, sequence, etc.).
-            if not self.schema_name:
-                raise ImproperlyConfigured("Database schema not set. Did you forget "
-                                           "to call set_schema() or set_tenant()?")
-
-            search_paths = self._get_cursor_search_paths()
-
-            cursor_for_search_path = self.connection.cursor() if name else cursor
-            # In the event that an error already happened in this transaction and we are going
-            # to rollback we should just ignore database error when setting the search_path
-            # if the next instruction is not a rollback it will just fail also, so
-            # we do not have to worry that it's not the good one
-            try:
-                formatted_search_paths = [f"\'{s}\'" for s in search_paths]
-                cursor_for_search_path.execute('SET search_path = {0}'.format(','.join(formatted_search_paths)))
-            except (django.db.utils.DatabaseError, psycopg.InternalError):
-                self.search_path_set_schemas = None
-            else:
-                self.search_path_set_schemas = search_paths
-            if name:
-                cursor_for_search_path.close()
+        if not self.schema_name:
+            raise ImproperlyConfigured("Database schema not set. Did you forget "
+                                       "to call set_schema() or set_tenant()?")
+
+        search_paths = self._get_cursor_search_paths()
+        if search_paths == self.search_path_set_schemas:
+            self.search_path_skip_count += 1
+            return cursor
+
+        # Actual search_path modification for the cursor. Database will
+        # search schemata from left to right when looking for the object
+        # (table, index, sequence, etc.).
+        cursor_for_search_path = self.connection.cursor() if name else cursor
+        # In the event that an error already happened in this transaction and we are going
+        # to rollback we should just ignore database error when setting the search_path
+        # if the next instruction is not a rollback it will just fail also, so
+        # we do not have to worry that it's not the good one
+        try:
+            formatted_search_paths = [f"\'{s}\'" for s in search_paths]
+            cursor_for_search_path.execute('SET search_path = {0}'.format(','.join(formatted_search_paths)))
+        except (django.db.utils.DatabaseError, psycopg.InternalError):
+            self.search_path_set_schemas = None
+        else:
+            self.search_path_set_schemas = search_paths
+            self.search_path_set_count += 1
+        if name:
+            cursor_for_search_path.close()
         return cursor
 
     def _get_cursor_search_paths(self):
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ecommerce.core.tenants.cache import tenant_cache
+from ecommerce.core.tenants.models import Client, Domain
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_tenant_cache_for_client(sender, instance, **kwargs):
+    tenant_cache.invalidate_schema(instance.schema_name)
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_tenant_cache_for_domain(sender, instance, **kwargs):
+    # Domains are rarely changed, so don't bother working out which
+    # hostnames they map to.
+    tenant_cache.invalidate()
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.test import RequestFactory
+
+from ecommerce.core.tenants.cache import TenantCache, tenant_cache
+from ecommerce.core.tenants.middleware import TenantMainMiddleware
+from ecommerce.core.tenants.models import Client
+from ecommerce.test.testcases import TestCase
+
+
+class TestTenantCache(TestCase):
+    def setUp(self):
+        self.cache = TenantCache(ttl=60)
+        self.loader = mock.Mock(return_value=self.tenant)
+
+    def test_loads_tenant_once(self):
+        first = self.cache.get("fast_test", self.loader)
+        second = self.cache.get("fast_test", self.loader)
+
+        self.loader.assert_called_once_with("fast_test")
+        self.assertEqual(first.schema_name, self.tenant.schema_name)
+        self.assertEqual(second.pk, self.tenant.pk)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_returns_a_copy_of_the_snapshot(self):
+        first = self.cache.get("fast_test", self.loader)
+        first.domain_url = "changed"
+        second = self.cache.get("fast_test", self.loader)
+
+        self.assertIsNot(first, second)
+        self.assertNotEqual(second.domain_url, "changed")
+
+    def test_caches_unknown_hostnames(self):
+        loader = mock.Mock(return_value=None)
+
+        self.assertIsNone(self.cache.get("unknown", loader))
+        self.assertIsNone(self.cache.get("unknown", loader))
+        loader.assert_called_once_with("unknown")
+
+    def test_expired_entries_are_reloaded(self):
+        cache = TenantCache(ttl=0)
+        cache.get("fast_test", self.loader)
+        cache.get("fast_test", self.loader)
+
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_least_recently_used_entries_are_dropped(self):
+        cache = TenantCache(ttl=60, max_size=2)
+        unknown = mock.Mock(return_value=None)
+        cache.get("fast_test", self.loader)
+        cache.get("first.example.com", unknown)
+        cache.get("fast_test", self.loader)
+        cache.get("second.example.com", unknown)
+
+        self.assertEqual(len(cache), 2)
+        cache.get("fast_test", self.loader)
+        cache.get("first.example.com", unknown)
+        self.loader.assert_called_once_with("fast_test")
+        self.assertEqual(unknown.call_count, 3)
+
+    def test_invalidate_schema(self):
+        self.cache.get("fast_test", self.loader)
+        self.cache.get("unknown", mock.Mock(return_value=None))
+        self.cache.invalidate_schema(self.tenant.schema_name)
+
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestTenantMainMiddlewareCache(TestCase):
+    def setUp(self):
+        tenant_cache.invalidate()
+        self.middleware = TenantMainMiddleware(get_response=mock.Mock())
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        tenant_cache.invalidate()
+
+    def test_resolved_tenant_is_served_without_queries(self):
+        self.middleware.process_request(self.factory.get("/"))
+
+        request = self.factory.get("/")
+        with self.assertNumQueries(0):
+            self.middleware.process_request(request)
+        self.assertEqual(request.tenant.schema_name, self.tenant.schema_name)
+
+    def test_unknown_hostname_is_served_without_queries(self):
+        self.middleware.process_request(self.factory.get("/", HTTP_HOST="nope.example.com"))
+
+        request = self.factory.get("/", HTTP_HOST="nope.example.com")
+        with self.assertNumQueries(0):
+            self.middleware.process_request(request)
+        self.assertEqual(request.tenant.schema_name, "public")
+
+    def test_saving_a_client_invalidates_the_cache(self):
+        self.middleware.process_request(self.factory.get("/"))
+        self.assertEqual(len(tenant_cache), 1)
+
+        Client.objects.filter(pk=self.tenant.pk).first().save()
+        self.assertEqual(len(tenant_cache), 0)
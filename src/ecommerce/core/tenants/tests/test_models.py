@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from django_tenants.utils import schema_context, schema_exists
+from oscar.core.loading import get_model
+
+from ecommerce.core.tenants import models
+from ecommerce.core.tenants.models import Client
+from ecommerce.test.testcases import TestCase, ensure_tenant_template
+
+Country = get_model("address", "Country")
+
+
+class TestCreateSchema(TestCase):
+    schema_name = "cloned_test"
+
+    def setUp(self):
+        ensure_tenant_template()
+        connection.set_schema_to_public()
+        self.addCleanup(connection.set_tenant, self.tenant)
+
+    def get_contents(self, schema_name):
+        with schema_context(schema_name):
+            return (
+                set(MigrationRecorder(connection).applied_migrations()),
+                Country.objects.count(),
+            )
+
+    def test_clones_template_schema(self):
+        template_schema = models.get_template_schema_name()
+
+        with mock.patch.object(
+            models.CloneSchema, "clone_schema", autospec=True,
+            side_effect=models.CloneSchema.clone_schema,
+        ) as clone_schema:
+            Client(schema_name=self.schema_name, name=self.schema_name).save(
+                verbosity=0
+            )
+
+        clone_schema.assert_called_once_with(
+            mock.ANY, template_schema, self.schema_name
+        )
+        self.assertTrue(schema_exists(self.schema_name))
+        migrations, countries = self.get_contents(self.schema_name)
+        self.assertEqual((migrations, countries), self.get_contents(template_schema))
+        self.assertGreater(countries, 0)
+
+    def test_migrates_schema_without_template(self):
+        with mock.patch.object(
+            models, "get_template_schema_name", return_value=None
+        ), mock.patch.object(models.CloneSchema, "clone_schema") as clone_schema:
+            Client(schema_name=self.schema_name, name=self.schema_name).save(
+                verbosity=0
+            )
+
+        clone_schema.assert_not_called()
+        self.assertTrue(schema_exists(self.schema_name))
@@ -0,0 +1,41 @@
+from django.db import connection, transaction
+
+from ecommerce.core.tenants.models import Client
+from ecommerce.test.testcases import TestCase
+
+
+class TestSearchPathTracking(TestCase):
+    def setUp(self):
+        connection.set_tenant(self.tenant)
+        Client.objects.exists()
+        self.set_count = connection.search_path_set_count
+
+    def test_search_path_is_not_set_again_for_the_same_tenant(self):
+        Client.objects.exists()
+        Client.objects.exists()
+
+        self.assertEqual(connection.search_path_set_count, self.set_count)
+
+    def test_switching_back_and_forth_without_queries_is_free(self):
+        connection.set_schema_to_public()
+        connection.set_tenant(self.tenant)
+        Client.objects.exists()
+
+        self.assertEqual(connection.search_path_set_count, self.set_count)
+
+    def test_search_path_is_set_when_the_schema_changes(self):
+        connection.set_schema_to_public()
+        Client.objects.exists()
+        connection.set_tenant(self.tenant)
+        Client.objects.exists()
+
+        self.assertEqual(connection.search_path_set_count, self.set_count + 2)
+
+    def test_rollback_forgets_the_search_path(self):
+        with transaction.atomic():
+            connection.set_schema_to_public()
+            Client.objects.exists()
+            transaction.set_rollback(True)
+        connection.set_tenant(self.tenant)
+
+        self.assertIsNone(connection.search_path_set_schemas)
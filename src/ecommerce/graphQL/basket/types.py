@@ -2,6 +2,7 @@ import graphene
 from graphene_django import DjangoObjectType
 
 from ecommerce.apps.basket.models import Basket, Line, LineAttribute
+from ecommerce.apps.offer.applicator import get_upsell_messages
 
 
 # LineAttribute Type
@@ -31,6 +32,13 @@ class LineType(DjangoObjectType):
         )
 
 
+# Upsell message of an offer that is partially satisfied by a basket
+class UpsellMessageType(graphene.ObjectType):
+    message = graphene.String()
+    offer_id = graphene.ID()
+    offer_name = graphene.String()
+
+
 # First, create a type for Basket
 class BasketType(DjangoObjectType):
     class Meta:
@@ -51,6 +59,7 @@ class BasketType(DjangoObjectType):
             "is_empty",
             "can_be_edited",
             "currency",
+            "upsell_messages",
         )
 
     # Custom resolvers for computed properties
@@ -62,6 +71,7 @@ class BasketType(DjangoObjectType):
     is_empty = graphene.Boolean()
     can_be_edited = graphene.Boolean()
     currency = graphene.String()
+    upsell_messages = graphene.List(UpsellMessageType)
 
     def resolve_total_excl_tax(self, info):
         return self.total_excl_tax
@@ -86,3 +96,13 @@ class BasketType(DjangoObjectType):
 
     def resolve_currency(self, info):
         return self.currency
+
+    def resolve_upsell_messages(self, info):
+        return [
+            UpsellMessageType(
+                message=str(upsell["message"]),
+                offer_id=upsell["offer"].pk,
+                offer_name=upsell["offer"].name,
+            )
+            for upsell in get_upsell_messages(self, info.context)
+        ]
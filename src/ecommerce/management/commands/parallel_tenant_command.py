@@ -0,0 +1,268 @@
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django_tenants.utils import get_public_schema_name
+
+from ecommerce.core.tenants.models import Client
+
+SUCCESS, FAILED, SKIPPED, CANCELLED = "success", "failed", "skipped", "cancelled"
+
+
+def init_worker():
+    # Needed when the pool uses the "spawn" start method
+    django.setup()
+
+
+def run_for_schema(schema_name, command_name, command_args, log_dir, verbosity):
+    """
+    Run a management command inside one schema. Executed in a pool process.
+    """
+    started = time.monotonic()
+    if log_dir:
+        log = open(os.path.join(log_dir, f"{schema_name}.log"), "w")
+    else:
+        log = io.StringIO()
+
+    status, error = SUCCESS, None
+    try:
+        if command_name == "migrate":
+            # django-tenants replaces "migrate" with a command that migrates
+            # every schema, so target this schema explicitly.
+            call_command(
+                "migrate_schemas",
+                *command_args,
+                schema_name=schema_name,
+                tenant=True,
+                interactive=False,
+                verbosity=verbosity,
+                stdout=log,
+                stderr=log,
+            )
+        else:
+            connection.set_tenant(Client.objects.get(schema_name=schema_name))
+            call_command(
+                command_name, *command_args, verbosity=verbosity, stdout=log, stderr=log
+            )
+    except BaseException as exc:  # SystemExit is raised by argument errors
+        status, error = FAILED, repr(exc)
+        log.write(f"\n{error}\n")
+    finally:
+        output = "" if log_dir else log.getvalue()
+        log.close()
+        connection.close()
+
+    return {
+        "schema_name": schema_name,
+        "status": status,
+        "error": error,
+        "output": output,
+        "duration": time.monotonic() - started,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a command (e.g. migrate or init_countries) in every tenant schema, "
+        "using a pool of processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-p",
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of schemas processed at the same time",
+        )
+        parser.add_argument(
+            "-s",
+            "--schema",
+            action="append",
+            dest="schemas",
+            help="Only run in this schema (can be repeated)",
+        )
+        parser.add_argument(
+            "--log-dir",
+            help="Write the output of every schema to <log-dir>/<schema>.log",
+        )
+        parser.add_argument(
+            "--fail-fast",
+            action="store_true",
+            help="Stop scheduling schemas after the first failure",
+        )
+        parser.add_argument(
+            "--no-skip",
+            action="store_false",
+            dest="skip_migrated",
+            help="Run migrate even in schemas that have no unapplied migrations",
+        )
+        parser.add_argument("command_name", help="Command to run in every schema")
+        parser.add_argument(
+            "command_args",
+            nargs=argparse.REMAINDER,
+            help="Arguments passed on to the command",
+        )
+
+    def handle(self, *args, **options):
+        command_name = options["command_name"]
+        command_args = options["command_args"]
+        log_dir = options["log_dir"]
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+        schema_names = self.get_schema_names(options["schemas"])
+        results = []
+        if (
+            command_name == "migrate"
+            and options["skip_migrated"]
+            and not command_args
+        ):
+            pending = self.get_unmigrated_schema_names(schema_names)
+            results.extend(
+                {"schema_name": name, "status": SKIPPED, "duration": 0}
+                for name in schema_names
+                if name not in pending
+            )
+            schema_names = pending
+
+        started = time.monotonic()
+        results.extend(
+            self.run(
+                schema_names,
+                command_name,
+                command_args,
+                log_dir,
+                options["processes"],
+                options["fail_fast"],
+                options["verbosity"],
+            )
+        )
+        self.report(results, time.monotonic() - started)
+
+        failed = [result for result in results if result["status"] == FAILED]
+        if failed:
+            raise CommandError(
+                f"'{command_name}' failed in {len(failed)} schema(s): "
+                + ", ".join(result["schema_name"] for result in failed)
+            )
+
+    def get_schema_names(self, schemas):
+        queryset = Client.objects.exclude(schema_name=get_public_schema_name())
+        if schemas:
+            queryset = queryset.filter(schema_name__in=schemas)
+            missing = set(schemas) - set(queryset.values_list("schema_name", flat=True))
+            if missing:
+                raise CommandError(f"Unknown schema(s): {', '.join(sorted(missing))}")
+        return list(queryset.order_by("schema_name").values_list("schema_name", flat=True))
+
+    def get_unmigrated_schema_names(self, schema_names):
+        """
+        Return the schemas that have migrations left to apply.
+        """
+        graph = MigrationLoader(None, ignore_no_migrations=True).graph
+        required = set()
+        for target in graph.leaf_nodes():
+            required.update(graph.forwards_plan(target))
+
+        pending = []
+        try:
+            for schema_name in schema_names:
+                connection.set_schema(schema_name)
+                applied = set(MigrationRecorder(connection).applied_migrations())
+                if not required <= applied:
+                    pending.append(schema_name)
+        finally:
+            connection.set_schema_to_public()
+        return pending
+
+    def run(
+        self,
+        schema_names,
+        command_name,
+        command_args,
+        log_dir,
+        processes,
+        fail_fast,
+        verbosity,
+    ):
+        if not schema_names:
+            return []
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=max(1, processes), initializer=init_worker
+        ) as executor:
+            futures = {
+                executor.submit(
+                    run_for_schema,
+                    schema_name,
+                    command_name,
+                    command_args,
+                    log_dir,
+                    verbosity,
+                ): schema_name
+                for schema_name in schema_names
+            }
+            reported = set()
+            for future in as_completed(futures):
+                reported.add(future)
+                result = future.result()
+                results.append(result)
+                self.report_schema(result)
+                if result["status"] == FAILED and fail_fast:
+                    # Let the schemas that are running finish, and report them
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+            for future in futures:
+                if future not in reported and not future.cancelled():
+                    result = future.result()
+                    results.append(result)
+                    self.report_schema(result)
+
+        done = {result["schema_name"] for result in results}
+        results.extend(
+            {"schema_name": name, "status": CANCELLED, "duration": 0}
+            for name in schema_names
+            if name not in done
+        )
+        return results
+
+    def report_schema(self, result):
+        message = f"[{result['schema_name']}] {result['status']} in {result['duration']:.2f}s"
+        if result["status"] == SUCCESS:
+            self.stdout.write(self.style.SUCCESS(message))
+            return
+        self.stdout.write(self.style.ERROR(f"{message}: {result['error']}"))
+        if result["output"]:
+            self.stdout.write(result["output"])
+
+    def report(self, results, elapsed):
+        self.stdout.write("\nSchema timings:")
+        width = max((len(result["schema_name"]) for result in results), default=0)
+        for result in sorted(results, key=lambda result: -result["duration"]):
+            self.stdout.write(
+                f"  {result['schema_name']:<{width}}  {result['status']:<9}  "
+                f"{result['duration']:.2f}s"
+            )
+
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        cumulative = sum(result["duration"] for result in results)
+        self.stdout.write(
+            f"\n{len(results)} schema(s): {summary or 'nothing to do'}. "
+            f"Wall time {elapsed:.2f}s, cumulative {cumulative:.2f}s."
+        )
@@ -0,0 +1,51 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from django.utils import timezone
+from oscar.core.loading import get_model
+
+from ecommerce.apps.order import rollups
+
+Order = get_model("order", "Order")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the hourly and daily order rollups of the current tenant. Run "
+        "it for every tenant with: parallel_tenant_command rebuild_order_rollups"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date-from",
+            type=datetime.date.fromisoformat,
+            help="First day to rebuild (YYYY-MM-DD), defaults to the first order",
+        )
+        parser.add_argument(
+            "--date-to",
+            type=datetime.date.fromisoformat,
+            help="Last day to rebuild (YYYY-MM-DD), defaults to the last order",
+        )
+
+    def handle(self, *args, **options):
+        placed = Order.objects.aggregate(
+            first=Min("date_placed"), last=Max("date_placed")
+        )
+        if placed["first"] is None:
+            return
+        first_day = options["date_from"] or timezone.localdate(placed["first"])
+        last_day = options["date_to"] or timezone.localdate(placed["last"])
+
+        started = time.monotonic()
+        day = first_day
+        # A day at a time, to keep the transactions short
+        while day <= last_day:
+            rollups.rebuild(day, day)
+            day += rollups.DAY
+        if options["verbosity"] > 0:
+            self.stdout.write(
+                f"{first_day} to {last_day} rebuilt "
+                f"({time.monotonic() - started:.2f}s)"
+            )
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from oscar.core.loading import get_model
+
+from ecommerce.apps.offer import range_index
+
+Range = get_model("offer", "Range")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the range membership index of the current tenant. Run it for "
+        "every tenant with: parallel_tenant_command rebuild_range_index"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-r",
+            "--range",
+            action="append",
+            dest="ranges",
+            help="Only rebuild the range with this slug (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        ranges = Range.objects.order_by("pk")
+        if options["ranges"]:
+            ranges = ranges.filter(slug__in=options["ranges"])
+
+        for product_range in ranges:
+            started = time.monotonic()
+            range_index.rebuild_range(product_range)
+            if not range_index.is_indexable(product_range):
+                status = "not indexed"
+            else:
+                status = f"{product_range.memberships.count()} products"
+            if options["verbosity"] > 0:
+                self.stdout.write(
+                    f"{product_range.slug}: {status} "
+                    f"({time.monotonic() - started:.2f}s)"
+                )
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django_tenants.utils import schema_exists
+
+from ecommerce.core.tenants.models import get_template_schema_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update the template schema that new tenants are cloned from. "
+        "Run it after migrating the tenants so new tenants start up to date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recreate",
+            action="store_true",
+            help="Drop the template schema and build it from scratch",
+        )
+
+    def handle(self, *args, **options):
+        schema_name = get_template_schema_name()
+        if not schema_name:
+            raise CommandError("TENANT_TEMPLATE_SCHEMA is not set")
+        verbosity = options["verbosity"]
+
+        connection.set_schema_to_public()
+        with connection.cursor() as cursor:
+            if options["recreate"] and schema_exists(schema_name):
+                cursor.execute(f'DROP SCHEMA "{schema_name}" CASCADE')
+            if not schema_exists(schema_name):
+                cursor.execute(f'CREATE SCHEMA "{schema_name}"')
+
+        call_command(
+            "migrate_schemas",
+            tenant=True,
+            schema_name=schema_name,
+            interactive=False,
+            verbosity=verbosity,
+        )
+
+        connection.set_schema(schema_name)
+        try:
+            for command_name in getattr(settings, "TENANT_TEMPLATE_SEED_COMMANDS", []):
+                call_command(command_name, verbosity=verbosity, stdout=self.stdout)
+        finally:
+            connection.set_schema_to_public()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Template schema '{schema_name}' is up to date")
+        )
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from oscar.core.loading import get_model
+
+from ecommerce.apps.order import search
+
+Order = get_model("order", "Order")
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the search documents of the orders of the current tenant that "
+        "don't have one. Run it for every tenant with: "
+        "parallel_tenant_command update_order_search_documents"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild the documents of all orders",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=search.BATCH_SIZE,
+            help="Number of orders updated per query",
+        )
+
+    def handle(self, *args, **options):
+        orders = Order.objects.order_by("pk")
+        if not options["all"]:
+            orders = orders.filter(search_document__isnull=True)
+
+        started = time.monotonic()
+        updated = 0
+        last_id = 0
+        while True:
+            # Page on the primary key, updated orders drop out of the filter
+            order_ids = list(
+                orders.filter(pk__gt=last_id).values_list("pk", flat=True)[
+                    : options["batch_size"]
+                ]
+            )
+            if not order_ids:
+                break
+            search.update_documents(order_ids)
+            updated += len(order_ids)
+            last_id = order_ids[-1]
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{updated} orders updated")
+
+        if options["verbosity"] > 0:
+            self.stdout.write(
+                f"{updated} orders updated ({time.monotonic() - started:.2f}s)"
+            )
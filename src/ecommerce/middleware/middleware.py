@@ -11,6 +11,7 @@ from django.utils.translation import gettext_lazy as _
 from oscar.core.loading import get_class
 
 from ecommerce.apps.basket.models import Basket
+from ecommerce.apps.basket.snapshot import basket_snapshots
 from ecommerce.apps.partner.strategy import Selector
 from ecommerce.core.tenants.utils import IsPublicSchema
 
@@ -152,6 +153,7 @@ class BasketMiddleware:
             # Signed-in user: if they have a cookie basket too, it means
             # that they have just signed in and we need to merge their cookie
             # basket into their user basket, then delete the cookie.
+            baskets_to_merge = []
             try:
                 basket, __ = manager.get_or_create(owner=request.user)
             except Basket.MultipleObjectsReturned:
@@ -159,19 +161,20 @@ class BasketMiddleware:
                 # We merge them and create a fresh one
                 old_baskets = list(manager.filter(owner=request.user))
                 basket = old_baskets[0]
-                for other_basket in old_baskets[1:]:
-                    self.merge_baskets(basket, other_basket)
-                    num_baskets_merged += 1
+                baskets_to_merge.extend(old_baskets[1:])
 
             # Assign user onto basket to prevent further SQL queries when
             # basket.owner is accessed.
             basket.owner = request.user
 
             if cookie_basket:
-                self.merge_baskets(basket, cookie_basket)
-                num_baskets_merged += 1
+                baskets_to_merge.append(cookie_basket)
                 request.cookies_to_delete.append(cookie_key)
 
+            if baskets_to_merge:
+                self.merge_baskets(basket, *baskets_to_merge)
+                num_baskets_merged = len(baskets_to_merge)
+
         elif cookie_basket:
             # Anonymous user with a basket tied to the cookie
             basket = cookie_basket
@@ -195,13 +198,13 @@ class BasketMiddleware:
 
         return basket
 
-    def merge_baskets(self, master, slave):
+    def merge_baskets(self, master, *slaves):
         """
-        Merge one basket into another.
+        Merge baskets into another, in one transaction.
 
         This is its own method to allow it to be overridden
         """
-        master.merge(slave, add_quantities=False)
+        master.merge_many(slaves, add_quantities=False)
 
     def get_cookie_basket(self, cookie_key, request, manager):
         """
@@ -224,7 +227,9 @@ class BasketMiddleware:
 
     def apply_offers_to_basket(self, request, basket):
         if not basket.is_empty:
-            Applicator().apply(basket, request.user, request)
+            # Reuses the discounts of the previous request if neither the
+            # basket nor the offers changed since
+            basket_snapshots.apply(basket, request.user, request, Applicator())
 
     def get_basket_hash(self, basket_id):
         return Signer().sign(basket_id)
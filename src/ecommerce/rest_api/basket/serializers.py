@@ -1,12 +1,21 @@
 from rest_framework import serializers
 
 from ecommerce.apps.basket.models import Basket, Line
+from ecommerce.apps.offer.applicator import get_upsell_messages
 
 
 class BasketSerializer(serializers.ModelSerializer):
+    upsell_messages = serializers.SerializerMethodField()
+
     class Meta:
         model = Basket
-        fields = ['id', 'status', 'owner', 'lines']
+        fields = ['id', 'status', 'owner', 'lines', 'upsell_messages']
+
+    def get_upsell_messages(self, basket):
+        return [
+            {'message': str(upsell['message']), 'offer': upsell['offer'].pk}
+            for upsell in get_upsell_messages(basket, self.context['request'])
+        ]
 
 
 class LineSerializer(serializers.ModelSerializer):
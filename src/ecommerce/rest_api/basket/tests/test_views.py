@@ -21,3 +21,8 @@ class BasketViewSetTestCase(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["status"], self.basket.status)
+
+    def test_basket_includes_upsell_messages(self):
+        url = reverse("basket-detail", kwargs={"version": "v1", "pk": self.basket.id})
+        response = self.client.get(url)
+        self.assertEqual(response.data["upsell_messages"], [])
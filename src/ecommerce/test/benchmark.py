@@ -0,0 +1,135 @@
+"""
+Helpers to time code paths and record the results as JSON, so that runs of
+different commits can be compared with::
+
+    python -m ecommerce.test.benchmark before.json after.json
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def get_git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class BenchmarkRecorder:
+    """
+    Collect timings and query counts of named operations.
+
+    Usage::
+
+        recorder = BenchmarkRecorder("offers")
+        recorder.measure("apply", apply_offers, setup=reset, lines=10)
+        recorder.write("offers.json")
+    """
+
+    def __init__(self, suite, repeat=5):
+        self.suite = suite
+        self.repeat = repeat
+        self.results = []
+
+    def measure(self, operation, func, setup=None, repeat=None, **params):
+        """
+        Run ``func`` ``repeat`` times and record how long it took and how many
+        queries it ran. ``setup`` is called before every run and isn't
+        timed. ``params`` describe the scenario.
+        """
+        durations, queries = [], []
+        for __ in range(repeat or self.repeat):
+            if setup is not None:
+                setup()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                func()
+                durations.append(time.perf_counter() - started)
+            queries.append(len(context.captured_queries))
+
+        return self.record(operation, durations, queries, **params)
+
+    def record(self, operation, durations, queries=None, **params):
+        """
+        Record the timings of an operation measured by the caller, e.g. in
+        several threads.
+        """
+        result = {
+            "operation": operation,
+            "params": params,
+            "runs": len(durations),
+            "min": min(durations),
+            "median": statistics.median(durations),
+            "mean": statistics.mean(durations),
+            "max": max(durations),
+        }
+        if queries:
+            # The first run warms up caches, so report it separately
+            result["queries"] = min(queries)
+            result["queries_first_run"] = queries[0]
+        self.results.append(result)
+        return result
+
+    def as_dict(self):
+        return {
+            "suite": self.suite,
+            "revision": get_git_revision(),
+            "date": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "results": self.results,
+        }
+
+    def write(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as output:
+            json.dump(self.as_dict(), output, indent=2)
+
+
+def compare(before, after):
+    """
+    Return a line per operation and scenario of the ``after`` results, with
+    the change of the median time and query count since ``before``.
+    """
+
+    def key(result):
+        return (result["operation"], tuple(sorted(result["params"].items())))
+
+    previous = {key(result): result for result in before["results"]}
+    lines = []
+    for result in after["results"]:
+        params = ", ".join(f"{name}={value}" for name, value in key(result)[1])
+        line = f"{result['operation']} ({params}): {result['median'] * 1000:.2f}ms"
+        if "queries" in result:
+            line += f", {result['queries']} queries"
+        old = previous.get(key(result))
+        if old is not None:
+            line += f" [{(result['median'] / old['median'] - 1) * 100:+.1f}%"
+            if "queries" in result and "queries" in old:
+                line += f", {result['queries'] - old['queries']:+d} queries"
+            line += "]"
+        lines.append(line)
+    return lines
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1]) as before_file, open(sys.argv[2]) as after_file:
+        for line in compare(json.load(before_file), json.load(after_file)):
+            print(line)
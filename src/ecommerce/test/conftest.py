@@ -1,6 +1,8 @@
 import pytest
 from django.conf import settings
 
+from ecommerce.test.fixtures import tenant, tenant_schema  # noqa: F401
+
 
 @pytest.fixture(scope="session")
 def django_db_setup():
@@ -2,10 +2,16 @@ import pytest
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.contrib.sessions.backends.db import SessionStore
+from django.db import connection
 from django.test.client import RequestFactory as BaseRequestFactory
 from oscar.core.loading import get_model
 
 from ecommerce.apps.partner.strategy import Selector
+from ecommerce.core.tenants.models import Client, Domain
+from ecommerce.test.testcases import ensure_tenant_template
+
+TEST_SCHEMA_NAME = "fast_test"
+TEST_DOMAIN = "tenant.fast-test.com"
 
 
 @pytest.fixture()
@@ -14,6 +20,32 @@ def rf():
     return RequestFactory()
 
 
+@pytest.fixture(scope="session")
+def tenant(django_db_setup, django_db_blocker):
+    """
+    The test tenant, cloned from the template schema instead of being
+    migrated from scratch.
+    """
+    with django_db_blocker.unblock():
+        ensure_tenant_template()
+        tenant = Client.objects.filter(schema_name=TEST_SCHEMA_NAME).first()
+        if tenant is None:
+            tenant = Client(schema_name=TEST_SCHEMA_NAME, name=TEST_SCHEMA_NAME)
+            tenant.save(verbosity=0)
+            Domain.objects.create(tenant=tenant, domain=TEST_DOMAIN, is_primary=True)
+    return tenant
+
+
+@pytest.fixture()
+def tenant_schema(tenant, db):
+    """
+    Run the test inside the test tenant's schema.
+    """
+    connection.set_tenant(tenant)
+    yield tenant
+    connection.set_schema_to_public()
+
+
 class RequestFactory(BaseRequestFactory):
     Basket = get_model("basket", "basket")
     selector = Selector()
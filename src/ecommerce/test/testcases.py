@@ -10,7 +10,7 @@ from django.db import connection
 from django.urls import reverse
 from django.utils.http import urlencode
 from django_tenants.test.cases import FastTenantTestCase
-from django_tenants.utils import get_tenant_model
+from django_tenants.utils import get_tenant_model, schema_exists
 from django_webtest import WebTestMixin
 from oscar.core.compat import get_user_model
 from purl import URL
@@ -18,12 +18,34 @@ from rest_framework.test import APIClient
 
 from ecommerce.apps.catalogue.models import Category, Product
 from ecommerce.apps.dashboard.widgets import RelatedFieldWidgetWrapper
+from ecommerce.core.tenants.models import get_template_schema_name
 
 User = get_user_model()
 # from django.core.management import call_command
 
 
-class TestCase(FastTenantTestCase):
+def ensure_tenant_template():
+    """
+    Build the template schema new tenants are cloned from, unless it exists.
+    """
+    template_schema = get_template_schema_name()
+    if template_schema and not schema_exists(template_schema):
+        call_command("refresh_tenant_template", verbosity=0)
+
+
+class TemplateTenantMixin:
+    """
+    Clone the test tenant from the template schema instead of migrating it
+    from scratch when it doesn't exist yet.
+    """
+
+    @classmethod
+    def setup_test_tenant_and_domain(cls):
+        ensure_tenant_template()
+        super().setup_test_tenant_and_domain()
+
+
+class TestCase(TemplateTenantMixin, FastTenantTestCase):
     @classmethod
     def setUpClass(cls):
         cls.add_allowed_test_domain()
@@ -55,7 +77,7 @@ class TestCase(FastTenantTestCase):
                     raise
 
 
-class APITestCase(FastTenantTestCase):
+class APITestCase(TemplateTenantMixin, FastTenantTestCase):
     client_class = APIClient
 
 
@@ -73,7 +95,7 @@ def add_permissions(user, permissions):
         user.user_permissions.add(perm)
 
 
-class WebTestCase(WebTestMixin, FastTenantTestCase):
+class WebTestCase(WebTestMixin, TemplateTenantMixin, FastTenantTestCase):
     is_staff = False
     is_anonymous = False
     is_superuser = False
@@ -4,3 +4,12 @@ AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
 AWS_REGION_NAME = os.environ.get("AWS_REGION_NAME")
 AWS_STORAGE_BUCKET_NAME = os.environ.get("AWS_STORAGE_BUCKET_NAME")
+# Point at a local S3 stand-in (e.g. ``moto_server`` or MinIO) in development
+AWS_S3_ENDPOINT_URL = os.environ.get("AWS_S3_ENDPOINT_URL")
+AWS_S3_MAX_POOL_CONNECTIONS = 50
+# Seconds signed media URLs are cached for, 0 disables the cache
+AWS_S3_SIGNED_URL_CACHE_TIMEOUT = int(
+    os.environ.get("AWS_S3_SIGNED_URL_CACHE_TIMEOUT", 0)
+)
+# Seconds the signed URLs of private files (e.g. exports) are valid for
+PRIVATE_FILE_URL_EXPIRE = 300
@@ -8,5 +8,18 @@ CELERY_ACCEPT_CONTENT = {"application/json"}
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_SERIALIZER = "json"
 
+# Cache shared by the workers where the tenant lanes of fanned-out periodic
+# tasks leave their outcomes, see ecommerce.core.celery.tasks
+TENANT_FAN_OUT_CACHE = "redis"
+
 # BEAT SETTINGS
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# Periodic tasks, the database scheduler installs them when beat starts
+CELERY_BEAT_SCHEDULE = {
+    # Send the order processing steps again that are stuck, see
+    # ORDER_PROCESSING_RETRY_AFTER
+    "retry-order-processing": {
+        "task": "ecommerce.core.celery.tasks.order.retry_order_processing",
+        "schedule": 300,
+    },
+}
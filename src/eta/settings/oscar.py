@@ -17,6 +17,46 @@ OSCAR_BASKET_COOKIE_LIFETIME = 7 * 24 * 60 * 60
 OSCAR_BASKET_COOKIE_OPEN = "oscar_open_basket"
 OSCAR_BASKET_COOKIE_SECURE = False
 OSCAR_MAX_BASKET_QUANTITY_THRESHOLD = 10000
+# Seconds the offers applied to a basket are reused for, 0 disables it. The
+# cache has to be shared by all servers.
+BASKET_SNAPSHOT_TIMEOUT = 300
+BASKET_SNAPSHOT_CACHE = "redis"
+# Stock allocation, see ecommerce.apps.partner.allocation
+STOCK_ALLOCATION_STRICT = True
+STOCK_ALLOCATION_BATCHED = False
+# Seconds the stock of a basket is reserved for once it reaches the payment
+# step, 0 disables reservations. The cache has to be shared by all servers.
+STOCK_RESERVATION_TIMEOUT = 0
+STOCK_RESERVATION_CACHE = "redis"
+# Record the discounts and send order_placed from the workers once an order is
+# committed, see ecommerce.core.celery.tasks.order. Steps that are still
+# pending, or failed, after ORDER_PROCESSING_RETRY_AFTER seconds are sent again
+# by the retry_order_processing periodic task, until they were attempted
+# ORDER_PROCESSING_MAX_ATTEMPTS times.
+ORDER_PROCESSING_ASYNC = True
+ORDER_PROCESSING_RETRY_AFTER = 600
+ORDER_PROCESSING_MAX_ATTEMPTS = 10
+# Bulk actions of the order dashboard on more orders than this run in the
+# background, in chunks of ORDER_BULK_ACTION_CHUNK_SIZE orders
+ORDER_BULK_ACTION_ASYNC_THRESHOLD = 500
+ORDER_BULK_ACTION_CHUNK_SIZE = 500
+# CSV exports of more orders than this are written to storage in the
+# background instead of being streamed, None always streams them
+ORDER_EXPORT_ASYNC_THRESHOLD = 20000
+# The order rollups of a period are refreshed by a task this many seconds
+# after its orders change, once however many orders changed. The pending
+# refreshes are tracked in ORDER_ROLLUP_CACHE, shared by all servers.
+ORDER_ROLLUP_REFRESH_DELAY = 60
+ORDER_ROLLUP_CACHE = "redis"
+# Seconds the stats of the dashboard home page are cached for, per tenant and
+# partners of the user. 0 disables the cache.
+DASHBOARD_STATS_CACHE_TIMEOUT = 60
+DASHBOARD_STATS_CACHE = "default"
+# Seconds a report generated in the background is handed out again to the
+# same report over the same dates instead of being generated again. Runs that
+# made no progress for REPORT_RUN_STALE_AFTER seconds aren't handed out.
+REPORT_RUN_MAX_AGE = 3600
+REPORT_RUN_STALE_AFTER = 600
 
 # Recently-viewed products
 OSCAR_RECENTLY_VIEWED_COOKIE_LIFETIME = 7 * 24 * 60 * 60
@@ -25,6 +25,12 @@ DEFAULT_FILE_STORAGE = (
     if DEBUG
     else "ecommerce.core.storages.tenant_storages.TenantS3Storage"
 )
+# Storage of files only some users may download, e.g. exports and reports
+PRIVATE_FILE_STORAGE = (
+    "django.contrib.staticfiles.storage.FileSystemStorage"
+    if DEBUG
+    else "ecommerce.core.storages.tenant_storages.PrivateTenantS3Storage"
+)
 
 TEMPLATES = [
     {
@@ -34,9 +40,14 @@ TEMPLATES = [
         ],
         "OPTIONS": {
             "loaders": [
-                "ecommerce.core.loaders.filesystem.Loader",
-                "django.template.loaders.filesystem.Loader",
-                "django.template.loaders.app_directories.Loader",
+                (
+                    "ecommerce.core.loaders.cached.Loader",
+                    [
+                        "ecommerce.core.loaders.filesystem.Loader",
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
             ],
             "context_processors": [
                 "django.contrib.auth.context_processors.auth",
@@ -74,3 +85,5 @@ TEMPLATES = [
 ]
 
 MULTITENANT_TEMPLATE_DIRS = [f"{BASE_DIR}/ecommerce/tenants/%s/templates"]
+# Maximum number of compiled templates kept by the tenant cached loader
+TENANT_TEMPLATE_CACHE_SIZE = 2000
@@ -3,3 +3,14 @@ TENANT_DOMAIN_MODEL = "tenants.Domain"
 DATABASE_ROUTERS = ("ecommerce.core.tenants.routers.TenantSyncRouter",)
 PUBLIC_SCHEMA_URLCONF = "eta.urls_public"
 TENANT_SYNC_ROUTER = "ecommerce.core.tenants.routers.TenantSyncRouter"
+
+# Seconds a resolved tenant is kept in the in-process tenant cache
+TENANT_CACHE_TTL = 60
+# Hostnames kept in the in-process tenant cache, the least recently used are
+# dropped first
+TENANT_CACHE_MAX_SIZE = 1000
+
+# New tenants are cloned from this schema once it has been built with the
+# refresh_tenant_template command. The seed commands run in it on refresh.
+TENANT_TEMPLATE_SCHEMA = "tenant_template"
+TENANT_TEMPLATE_SEED_COMMANDS = ["init_countries"]